@@ -1,7 +1,10 @@
 import requests
+from collections import deque
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor
 from utils.logger import get_logger
 from utils.send_except_email import send_error_notification
-import time
+from api.rate_limiter import RateLimiter
 import json
 import urllib3
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
@@ -17,17 +20,26 @@ class APIClient:
         self.base_url = base_url
         self.token = token
         self.max_retries = max_retries
+        self.rate_limiter = RateLimiter()
         self.session = requests.Session()
         if token:
             # Handle both string token and dict with 'access_token' key
             access_token = token if isinstance(token, str) else token.get('access_token')
             self.session.headers.update({'Authorization': f"Bearer {access_token}"})
 
-    def _request_with_retry(self, method: str, url: str, **kwargs):
+    def _request_with_retry(self, method: str, url: str, slot=None, **kwargs):
+        """
+        Send the request, retrying 5xx/429/403 responses and network errors with backoff.
+        slot (optional context manager, e.g. a semaphore) is held around each HTTP call only,
+        never during the backoff sleeps, so a retrying request does not keep others waiting.
+        """
         for attempt in range(1, self.max_retries + 1):
             try:
                 logger.debug(f"{method.upper()} request to {url}, attempt {attempt}/{self.max_retries}")
-                response = self.session.request(method, url, **kwargs)      
+                self.rate_limiter.acquire()
+                with slot if slot is not None else nullcontext():
+                    response = self.session.request(method, url, **kwargs)
+                retry_after = self.rate_limiter.handle_response_status(response.status_code, response.headers)
                 if 200 <= response.status_code < 300:
                     if response.status_code == 204: 
                         return None
@@ -52,16 +64,15 @@ class APIClient:
                     # Don't retry 400-level errors (client errors), only 500+ (server errors) , 429 (rate limiting) and 403 (forbidden: it can be token related)
                     if 400 <= response.status_code < 500 and response.status_code not in [429, 403]:
                         raise RuntimeError(f"{method.upper()} request to {url} failed with client error {response.status_code}")
-                    
-                    
-                    time.sleep(2 ** attempt)
+
+                    self.rate_limiter.backoff(attempt, retry_after)
 
             except requests.exceptions.RequestException as e:
                 logger.error(f"{method.upper()} request to {url} failed: {e}")
                 if attempt == self.max_retries:
                     send_error_notification(f"{method.upper()} request to {url} failed after retries", str(e))
                     raise
-                time.sleep(2 ** attempt)
+                self.rate_limiter.backoff(attempt)
         
         raise RuntimeError(f"{method.upper()} request to {url} failed after {self.max_retries} attempts")
 
@@ -69,29 +80,78 @@ class APIClient:
         url = f"{self.base_url}{endpoint}"
         return self._request_with_retry("get", url, params=params, verify=False, proxies=self.proxies)
 
-    def post(self, endpoint: str, data: dict = None, json: dict = None, params: dict = None):
+    def post(self, endpoint: str, data: dict = None, json: dict = None, params: dict = None, slot=None):
         url = f"{self.base_url}{endpoint}"
-        return self._request_with_retry("post", url, data=data, json=json, params=params, verify=False, proxies=self.proxies)
+        return self._request_with_retry("post", url, slot=slot, data=data, json=json, params=params, verify=False, proxies=self.proxies)
+
+    def iter_pages(self, endpoint: str, params: dict = None):
+        """
+        Yield each page of results as it arrives, following SAP OData __next links.
+        """
+        next_url = f"{self.base_url}{endpoint}"
+        while next_url:
+            data = self._request_with_retry("get", next_url, params=params, verify=False, proxies=self.proxies)
+
+            yield data.get("d", {}).get("results", [])
+
+            # SAP pagination
+            next_url = data.get("d", {}).get("__next")
+            params = None
+
+    def iter_pages_partitioned(self, endpoint: str, params: dict = None, page_size: int = 1000, max_workers: int = 4):
+        """
+        Yield pages fetched concurrently with $skip/$top, in $skip order.
+        The first page is requested with $inlinecount=allpages to learn the total; without a
+        __count in the response the remaining pages are fetched by following __next links.
+        params must hold a $orderby on a unique key: without a stable order, concurrent $skip
+        pages may skip or repeat records.
+        """
+        url = f"{self.base_url}{endpoint}"
+        params = dict(params or {})
+        if not params.get("$orderby"):
+            raise ValueError(f"Partitioned fetch of {endpoint} requires a $orderby on a unique key")
+        params.update({"$inlinecount": "allpages", "$top": page_size, "$skip": 0})
+
+        first = self._request_with_retry("get", url, params=params, verify=False, proxies=self.proxies).get("d", {})
+        yield first.get("results", [])
+
+        total = first.get("__count")
+        if total is None:
+            logger.warning(f"No __count returned for {endpoint} - falling back to __next pagination")
+            next_url = first.get("__next")
+            while next_url:
+                data = self._request_with_retry("get", next_url, verify=False, proxies=self.proxies).get("d", {})
+                yield data.get("results", [])
+                next_url = data.get("__next")
+            return
+
+        skips = range(page_size, int(total), page_size)
+        logger.info(f"Fetching {total} records from {endpoint} in {len(skips) + 1} pages with {max_workers} workers")
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="fetch") as executor:
+            # Bounded look-ahead: at most 2 * max_workers pages are held before being yielded
+            pending = deque()
+            for skip in skips:
+                pending.append(executor.submit(
+                    self._request_with_retry, "get", url,
+                    params={**params, "$skip": skip, "$inlinecount": "none"},
+                    verify=False, proxies=self.proxies
+                ))
+                if len(pending) >= 2 * max_workers:
+                    yield pending.popleft().result().get("d", {}).get("results", [])
+            while pending:
+                yield pending.popleft().result().get("d", {}).get("results", [])
+
     def fetch_all(self, endpoint: str, params: dict = None) -> list:
         """
         Fetch all pages by following SAP OData __next links.(pagination)
         """
         try:
             all_results = []
-            next_url = f"{self.base_url}{endpoint}"
-
-            while next_url:
-                data = self._request_with_retry("get", next_url, params=params, verify=False, proxies=self.proxies)
-
-                page_results = data.get("d", {}).get("results", [])
+            for page_results in self.iter_pages(endpoint, params=params):
                 all_results.extend(page_results)
 
-                # SAP pagination
-                next_url = data.get("d", {}).get("__next")
-                params = None
-
             logger.info(f"Fetched total records: {len(all_results)}")
             return all_results
         except Exception as e:
             logger.error(f"Error fetching all pages from {endpoint}: {e}")
-            return []
\ No newline at end of file
+            return []
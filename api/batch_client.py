@@ -2,8 +2,8 @@
 import requests
 import uuid
 import re
-import time
 from utils.logger import get_logger
+from api.rate_limiter import RateLimiter
 
 logger = get_logger("batch_client")
 
@@ -23,6 +23,7 @@ class SAPBatchClient:
         self.session = requests.Session()
         self.session.headers.update({"Authorization": f"Bearer {token}"})
         self.max_retries = max_retries
+        self.rate_limiter = RateLimiter()
 
     @staticmethod
     def _generate_boundaries():
@@ -87,17 +88,20 @@ class SAPBatchClient:
             )
             headers = {"Content-Type": f"multipart/mixed; boundary={batch_boundary}"}
             url = f"{self.base_url}/$batch"
+            retry_after = None
 
             try:
                 logger.info(
                     f"Sending batch request to {url} with {len(pending_changesets)} changesets (Attempt {attempt + 1})"
                 )
+                self.rate_limiter.acquire()
                 response = self.session.post(url, headers=headers, data=batch_body, verify=False, proxies=self.proxies)
+                retry_after = self.rate_limiter.handle_response_status(response.status_code, response.headers)
                 response.raise_for_status()
             except requests.RequestException as e:
                 logger.error(f"Batch request failed on attempt {attempt + 1}: {e}")
                 attempt += 1
-                time.sleep(2**attempt)
+                self.rate_limiter.backoff(attempt, retry_after)
                 continue
 
             batch_results = self._parse_batch_response(response.text, batch_boundary)
@@ -115,7 +119,7 @@ class SAPBatchClient:
                     f"{len(pending_changesets)} changesets failed with server errors, retrying..."
                 )
                 attempt += 1
-                time.sleep(2**attempt)
+                self.rate_limiter.backoff(attempt)
             else:
                 break
 
@@ -0,0 +1,187 @@
+import random
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from threading import Lock
+from utils.logger import get_logger
+
+logger = get_logger("rate_limiter")
+
+
+class RateLimiter:
+    """
+    Process-wide token bucket shared by every SAP client (APIClient, UpsertClient, SAPBatchClient).
+
+    The refill rate adapts with AIMD: it grows additively while requests succeed and is
+    cut multiplicatively on 429/503. A Retry-After sent by SAP pauses every caller until it
+    expires, so threads do not back off independently and then stampede the tenant again.
+    """
+    _instance = None
+    _lock = Lock()
+    _initialized = False
+
+    INITIAL_RATE = 10.0  # requests per second
+    MIN_RATE = 0.5
+    MAX_RATE = 50.0
+    ADDITIVE_INCREASE = 0.5  # requests per second added per INCREASE_INTERVAL of successes
+    INCREASE_INTERVAL = 1.0
+    DECREASE_FACTOR = 0.5
+    DECREASE_COOLDOWN = 2.0  # a burst of 429s from the same window only halves the rate once
+    MAX_BACKOFF = 60.0
+    THROTTLE_STATUS_CODES = (429, 503)
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._lock:
+                # Double-check locking pattern
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        # Only initialize once
+        if not RateLimiter._initialized:
+            with RateLimiter._lock:
+                if not RateLimiter._initialized:
+                    logger.info("Initializing RateLimiter singleton")
+                    self._reset_state()
+                    RateLimiter._initialized = True
+
+    def _reset_state(self):
+        now = time.monotonic()
+        self._rate = self.INITIAL_RATE
+        self._tokens = self.INITIAL_RATE
+        self._last_refill = now
+        self._last_increase = now
+        self._last_decrease = 0.0
+        self._blocked_until = 0.0
+        self._requests = 0
+        self._throttled_count = 0
+        self._wait_seconds = 0.0
+
+    @classmethod
+    def reset_singleton(cls):
+        """Reset the singleton (useful for testing)."""
+        with cls._lock:
+            cls._instance = None
+            cls._initialized = False
+
+    def acquire(self):
+        """
+        Block until a request may be sent. Call it right before every HTTP request to SAP.
+        """
+        waited = 0.0
+        while True:
+            with RateLimiter._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self._blocked_until:
+                    delay = self._blocked_until - now
+                elif self._tokens >= 1:
+                    self._tokens -= 1
+                    self._requests += 1
+                    self._wait_seconds += waited
+                    return
+                else:
+                    delay = (1 - self._tokens) / self._rate
+            time.sleep(delay)
+            waited += delay
+
+    def _capacity(self) -> float:
+        # One second worth of requests at the current rate, but never less than the one token
+        # acquire() waits for (below 1 req/s the bucket would never fill up to it)
+        return max(1.0, self._rate)
+
+    def _refill(self, now: float):
+        self._tokens = min(self._capacity(), self._tokens + (now - self._last_refill) * self._rate)
+        self._last_refill = now
+
+    def on_success(self):
+        """Additive increase, at most once per INCREASE_INTERVAL."""
+        with RateLimiter._lock:
+            now = time.monotonic()
+            if now - self._last_increase >= self.INCREASE_INTERVAL:
+                self._refill(now)
+                self._rate = min(self.MAX_RATE, self._rate + self.ADDITIVE_INCREASE)
+                self._last_increase = now
+
+    def on_throttle(self, retry_after: float = None):
+        """
+        Multiplicative decrease after a 429/503. When SAP sent Retry-After, every caller
+        is paused until it expires.
+        """
+        with RateLimiter._lock:
+            now = time.monotonic()
+            self._throttled_count += 1
+            if now - self._last_decrease >= self.DECREASE_COOLDOWN:
+                self._rate = max(self.MIN_RATE, self._rate * self.DECREASE_FACTOR)
+                self._tokens = min(self._tokens, self._capacity())
+                self._last_decrease = now
+                self._last_increase = now
+                logger.warning(f"SAP throttled the request - lowering rate to {self._rate:.2f} req/s")
+            if retry_after:
+                self._blocked_until = max(self._blocked_until, now + retry_after)
+
+    def backoff(self, attempt: int, retry_after: float = None) -> float:
+        """
+        Sleep before a retry and return the delay. Retry-After wins when present, otherwise
+        exponential backoff (2 ** attempt, capped at MAX_BACKOFF) with equal jitter.
+        """
+        if retry_after:
+            delay = min(retry_after, self.MAX_BACKOFF)
+        else:
+            base = min(2 ** attempt, self.MAX_BACKOFF)
+            delay = base / 2 + random.uniform(0, base / 2)
+        time.sleep(delay)
+        with RateLimiter._lock:
+            self._wait_seconds += delay
+        return delay
+
+    def handle_response_status(self, status_code: int, headers=None) -> float:
+        """
+        Feed a response status into the limiter.
+
+        Returns:
+            The Retry-After delay in seconds for throttled responses (None when absent
+            or when the response was not throttled).
+        """
+        if status_code in self.THROTTLE_STATUS_CODES:
+            retry_after = self.parse_retry_after((headers or {}).get("Retry-After"))
+            self.on_throttle(retry_after)
+            return retry_after
+        if 200 <= status_code < 300:
+            self.on_success()
+        return None
+
+    @staticmethod
+    def parse_retry_after(value) -> float:
+        """
+        Parse a Retry-After header (delta-seconds or HTTP-date) into seconds.
+        """
+        if value is None:
+            return None
+        try:
+            return max(0.0, float(value))
+        except (TypeError, ValueError):
+            pass
+        try:
+            retry_at = parsedate_to_datetime(value)
+            if retry_at.tzinfo is None:
+                retry_at = retry_at.replace(tzinfo=timezone.utc)
+            return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+        except (TypeError, ValueError, IndexError):
+            logger.warning(f"Unparseable Retry-After header: {value}")
+            return None
+
+    def metrics(self) -> dict:
+        """
+        Current limiter state: rate (req/s), requests sent, throttled responses and
+        total seconds spent waiting (token waits + retry backoffs).
+        """
+        with RateLimiter._lock:
+            return {
+                "current_rate": round(self._rate, 2),
+                "requests": self._requests,
+                "throttled_count": self._throttled_count,
+                "wait_seconds": round(self._wait_seconds, 2),
+            }
@@ -1,7 +1,10 @@
 from utils.logger import get_logger
 from api.api_client import APIClient
+from api.rate_limiter import RateLimiter
+from config.sf_apis import max_concurrent_upsert_chunks
 
-import time
+from concurrent.futures import ThreadPoolExecutor
+from threading import BoundedSemaphore
 import json
 
 
@@ -10,10 +13,35 @@ logger = get_logger("upsert_client")
 
 class UpsertClient:
     MAX_CHUNK_SIZE = 800  # It has to be less than 1000 to be safe with SAP limits
+    MAX_IN_FLIGHT_REQUESTS = 8  # Shared by every UpsertClient to stay under the tenant rate limits
+    _in_flight = BoundedSemaphore(MAX_IN_FLIGHT_REQUESTS)
 
-    def __init__(self, api_client: APIClient, max_retries: int = 5):
+    def __init__(self, api_client: APIClient, max_retries: int = 5, max_concurrent_chunks: int = max_concurrent_upsert_chunks):
         self.api_client = api_client
         self.max_retries = max_retries
+        self.max_concurrent_chunks = max_concurrent_chunks
+        self.rate_limiter = RateLimiter()
+
+    @classmethod
+    def set_max_in_flight_requests(cls, limit: int):
+        """
+        Change the global limit of concurrent upsert requests (all clients, all entities).
+        Call it before dispatching upserts; requests already in flight keep their slot.
+        """
+        cls.MAX_IN_FLIGHT_REQUESTS = max(1, limit)
+        cls._in_flight = BoundedSemaphore(cls.MAX_IN_FLIGHT_REQUESTS)
+
+    def _post_upsert(self, payload, params: dict = None):
+        """
+        POST to the SAP SuccessFactors upsert endpoint. A global in-flight slot is held while
+        each HTTP request is on the wire; it is given back during the APIClient retry backoffs.
+        """
+        return self.api_client.post(
+            "/odata/v2/upsert?$format=json",
+            json=payload,
+            params=params,
+            slot=self._in_flight
+        )
 
     def upsert_entity_for_users(self, entity_name: str, user_payloads: dict):
         """
@@ -34,136 +62,187 @@ class UpsertClient:
                 payload_list.append(p)
                 user_index.append(user_id)
 
-        # Split into chunks to respect MAX_CHUNK_SIZE
-        for chunk_start in range(0, len(payload_list), self.MAX_CHUNK_SIZE):
-            chunk_payloads = payload_list[chunk_start:chunk_start + self.MAX_CHUNK_SIZE]
-            chunk_user_index = user_index[chunk_start:chunk_start + self.MAX_CHUNK_SIZE]
-
-            # Retry logic
-            for attempt in range(1, self.max_retries + 1):
-                try:
-                    # Use SAP SuccessFactors upsert endpoint with array payload
-                    params_ = None
-                    if entity_name == "EmpInitLoadJob":
-                        params_ = {
-                                     "purgeType": "full"
-                                }
-                    response = self.api_client.post(
-                        "/odata/v2/upsert?$format=json",
-                        json=chunk_payloads,
-                        params= params_ if params_ else None
-                    )
-                    # Check if all records have client errors (400-499) - if so, No retry
-                    records = response.get("d", [])
-                    if records:
-                        http_codes = [r.get("httpCode", 200) for r in records]
-                        all_client_errors = all(400 <= code < 500 for code in http_codes if code)
-                        #Retry 412 errors
-                        if any(code == 412 for code in http_codes):
-                                logger.warning(f"{entity_name} chunk got 412 – retrying attempt {attempt}")
-                                if attempt < self.max_retries:
-                                    time.sleep(2 ** attempt)
-                                    continue  # retry entire chunk
-                                else:
-                                    logger.error(f"{entity_name} chunk failed due to repeated 412 errors")
-                                    break
-                        #logging each payload with its response
-                        for r in records:
-                            idx = r.get("index")
-                            if idx is None or idx >= len(chunk_payloads):
-                                pretty_payload = "Unknown payload"
-                            else:
-                                payload_item = chunk_payloads[idx]
-                                try:
-                                    pretty_payload = json.dumps(payload_item, indent=2)
-                                except (TypeError, ValueError):
-                                    pretty_payload = str(payload_item)
-
-                            # Log payload
-                            logger.info(f"Upsert payload for {entity_name}:\n{pretty_payload}")
-
-                            # Log response
-                            logger.info(
-                                f"Upsert response for {entity_name}: "
-                                f"Status: {r.get('status')}, "
-                                f"Message: {r.get('message')}, "
-                                f"Key: {r.get('key')}, "
-                                f"HttpCode: {r.get('httpCode')}"
-                            )
-                        if all_client_errors:
-                            logger.info(f"{entity_name} chunk - all records have client errors (400-499), not retrying")
-                            break
-                    
-                    break
-                except RuntimeError as e:
-                    # No retry on client errors (400-499)
-                    if "client error" in str(e):
-                        logger.error(f"{entity_name} chunk failed with client error: {e}")
-                        for user_id in set(chunk_user_index):
-                            results[user_id] = {
-                                "entity": entity_name,
-                                "status": "FAILED",
-                                "message": str(e)
+        chunk_groups = self._chunk_by_user(payload_list, user_index)
+        chunk_count = sum(len(group) for group in chunk_groups)
+
+        if self.max_concurrent_chunks <= 1 or len(chunk_groups) <= 1:
+            chunk_results = [
+                self._upsert_chunk(entity_name, chunk_payloads, chunk_user_index)
+                for group in chunk_groups
+                for chunk_payloads, chunk_user_index in group
+            ]
+        else:
+            workers = min(self.max_concurrent_chunks, len(chunk_groups))
+            logger.info(f"{entity_name}: dispatching {chunk_count} chunks with {workers} workers")
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"upsert-{entity_name}") as executor:
+                group_results = list(executor.map(
+                    lambda group: [self._upsert_chunk(entity_name, *chunk) for chunk in group], chunk_groups
+                ))
+            chunk_results = [chunk_result for group in group_results for chunk_result in group]
+
+        # Merge in chunk order so a user spanning two chunks keeps the last chunk's status
+        for chunk_result in chunk_results:
+            results.update(chunk_result)
+
+        logger.info(f"{entity_name} upsert done - rate limiter metrics: {self.rate_limiter.metrics()}")
+        return results
+    
+    def _chunk_by_user(self, payload_list: list, user_index: list) -> list:
+        """
+        Split the records into chunks of at most MAX_CHUNK_SIZE without splitting a user's
+        records (SAP processes multi-record entities such as EmpInitLoadJob with purgeType=full
+        per user, so concurrent chunks must not share a user).
+        A user with more than MAX_CHUNK_SIZE records is split over consecutive chunks, kept
+        in one group so that they are sent one after the other.
+
+        Returns:
+            List of chunk groups (each a list of (payloads, user_index) chunks). Groups share
+            no user and can be sent concurrently; the chunks of a group are sent in order.
+        """
+        # Records of each user, in first-seen order
+        records_by_user = {}
+        for payload, user_id in zip(payload_list, user_index):
+            records_by_user.setdefault(user_id, []).append(payload)
+
+        groups = []
+        chunk_payloads, chunk_user_index = [], []
+        for user_id, records in records_by_user.items():
+            if len(chunk_payloads) + len(records) > self.MAX_CHUNK_SIZE and chunk_payloads:
+                groups.append([(chunk_payloads, chunk_user_index)])
+                chunk_payloads, chunk_user_index = [], []
+            if len(records) > self.MAX_CHUNK_SIZE:
+                parts = [records[start:start + self.MAX_CHUNK_SIZE] for start in range(0, len(records), self.MAX_CHUNK_SIZE)]
+                groups.append([(part, [user_id] * len(part)) for part in parts])
+                continue
+            chunk_payloads.extend(records)
+            chunk_user_index.extend([user_id] * len(records))
+        if chunk_payloads:
+            groups.append([(chunk_payloads, chunk_user_index)])
+        return groups
+
+    def _upsert_chunk(self, entity_name: str, chunk_payloads: list, chunk_user_index: list) -> dict:
+        """
+        Upsert a single chunk (with retries) and map the SAP response back to users.
+        """
+        results = {}
+        response = {}
+
+        # Retry logic
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                # Use SAP SuccessFactors upsert endpoint with array payload
+                params_ = None
+                if entity_name == "EmpInitLoadJob":
+                    params_ = {
+                                 "purgeType": "full"
                             }
-                        break  # No retry
-                    logger.warning(f"{entity_name} chunk failed attempt {attempt}: {e}")
-                    if attempt < self.max_retries:
-                        time.sleep(2 ** attempt)
-                except Exception as e:
-                    logger.warning(f"{entity_name} chunk failed attempt {attempt}: {e}")
-                    if attempt < self.max_retries:
-                        time.sleep(2 ** attempt)
-            else:
-                # Max retries exceeded for this chunk
-                for user_id in set(chunk_user_index):
-                    results[user_id] = {
-                        "entity": entity_name,
-                        "status": "FAILED",
-                        "message": "Max retries exceeded"
-                    }
-                continue  # Next chunk
-
-            # Map response to users - SAP returns status per record
-            records = response.get("d", [])
-            for r in records:
-                idx = r.get("index")
-                if idx is None or idx >= len(chunk_user_index):
-                    continue  # safety
-                user_id = chunk_user_index[idx]
-
-                # Check status from SAP response
-                sap_status = r.get("status", "").upper()
-                if sap_status == "OK":
-                    status = "SUCCESS"
-                elif sap_status == "ERROR":
-                    status = "FAILED"
-                elif "Warning" in r.get("message", ""):
-                    status = "WARNING"
-                else:
-                    status = "SUCCESS"  # default if no error
+                response = self._post_upsert(chunk_payloads, params=params_ if params_ else None)
+                # Check if all records have client errors (400-499) - if so, No retry
+                records = response.get("d", [])
+                if records:
+                    http_codes = [r.get("httpCode", 200) for r in records]
+                    all_client_errors = all(400 <= code < 500 for code in http_codes if code)
+                    #Retry 412 errors
+                    if any(code == 412 for code in http_codes):
+                            logger.warning(f"{entity_name} chunk got 412 – retrying attempt {attempt}")
+                            if attempt < self.max_retries:
+                                self.rate_limiter.backoff(attempt)
+                                continue  # retry entire chunk
+                            else:
+                                logger.error(f"{entity_name} chunk failed due to repeated 412 errors")
+                                break
+                    #logging each payload with its response
+                    for r in records:
+                        idx = r.get("index")
+                        if idx is None or idx >= len(chunk_payloads):
+                            pretty_payload = "Unknown payload"
+                        else:
+                            payload_item = chunk_payloads[idx]
+                            try:
+                                pretty_payload = json.dumps(payload_item, indent=2)
+                            except (TypeError, ValueError):
+                                pretty_payload = str(payload_item)
 
+                        # Log payload
+                        logger.info(f"Upsert payload for {entity_name}:\n{pretty_payload}")
+
+                        # Log response
+                        logger.info(
+                            f"Upsert response for {entity_name}: "
+                            f"Status: {r.get('status')}, "
+                            f"Message: {r.get('message')}, "
+                            f"Key: {r.get('key')}, "
+                            f"HttpCode: {r.get('httpCode')}"
+                        )
+                    if all_client_errors:
+                        logger.info(f"{entity_name} chunk - all records have client errors (400-499), not retrying")
+                        break
+                
+                break
+            except RuntimeError as e:
+                # No retry on client errors (400-499)
+                if "client error" in str(e):
+                    logger.error(f"{entity_name} chunk failed with client error: {e}")
+                    for user_id in set(chunk_user_index):
+                        results[user_id] = {
+                            "entity": entity_name,
+                            "status": "FAILED",
+                            "message": str(e)
+                        }
+                    break  # No retry
+                logger.warning(f"{entity_name} chunk failed attempt {attempt}: {e}")
+                if attempt < self.max_retries:
+                    self.rate_limiter.backoff(attempt)
+            except Exception as e:
+                logger.warning(f"{entity_name} chunk failed attempt {attempt}: {e}")
+                if attempt < self.max_retries:
+                    self.rate_limiter.backoff(attempt)
+        else:
+            # Max retries exceeded for this chunk
+            for user_id in set(chunk_user_index):
                 results[user_id] = {
                     "entity": entity_name,
-                    "status": status,
-                    "message": r.get("message"),
-                    "key": r.get("key"),
-                    "httpCode": r.get("httpCode")
+                    "status": "FAILED",
+                    "message": "Max retries exceeded"
                 }
+            return results
+
+        # Map response to users - SAP returns status per record
+        records = response.get("d", [])
+        for r in records:
+            idx = r.get("index")
+            if idx is None or idx >= len(chunk_user_index):
+                continue  # safety
+            user_id = chunk_user_index[idx]
+
+            # Check status from SAP response
+            sap_status = r.get("status", "").upper()
+            if sap_status == "OK":
+                status = "SUCCESS"
+            elif sap_status == "ERROR":
+                status = "FAILED"
+            elif "Warning" in r.get("message", ""):
+                status = "WARNING"
+            else:
+                status = "SUCCESS"  # default if no error
+
+            results[user_id] = {
+                "entity": entity_name,
+                "status": status,
+                "message": r.get("message"),
+                "key": r.get("key"),
+                "httpCode": r.get("httpCode")
+            }
 
         return results
-    
+
     def upsert_entity(self, entity_name: str, payload: dict, parameters: dict = None):
         """
         Upsert a single entity record.
         """
         for attempt in range(1, self.max_retries + 1):
             try:
-                response = self.api_client.post(
-                    "/odata/v2/upsert?$format=json",
-                    json=payload,
-                    params=parameters if parameters else None
-
-                )
+                response = self._post_upsert(payload, params=parameters if parameters else None)
                 # Log payload
                 pretty_payload = json.dumps(payload, indent=2)
                 logger.info(f"Upsert payload for {entity_name}:\n{pretty_payload}")
@@ -188,10 +267,10 @@ class UpsertClient:
                     raise
                 logger.warning(f"{entity_name} upsert failed attempt {attempt}: {e}")
                 if attempt < self.max_retries:
-                    time.sleep(2 ** attempt)
+                    self.rate_limiter.backoff(attempt)
             except Exception as e:
                 logger.warning(f"{entity_name} upsert failed attempt {attempt}: {e}")
                 if attempt < self.max_retries:
-                    time.sleep(2 ** attempt)
+                    self.rate_limiter.backoff(attempt)
         else:
             raise RuntimeError(f"Max retries exceeded for upserting {entity_name}")
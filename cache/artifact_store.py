@@ -0,0 +1,264 @@
+"""
+Content-addressed intermediates of the DAG tasks:
+
+A step's key is the hash of its name, of the content of its inputs and of the source of the
+code it runs. Its outputs are saved under that key and recorded in a manifest (one JSON entry
+per artifact). A rerun or retry with the same key loads the recorded outputs instead of
+recomputing them; any change of input data or code gives a new key and recomputes.
+
+"""
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import sys
+import pandas as pd
+from cache.frame_store import read_frame, write_frame, frame_path, replace_atomically
+from datetime import datetime
+from utils.logger import get_logger
+
+Logger = get_logger("artifact_store")
+
+
+def _hash_value(digest, value):
+    if isinstance(value, pd.DataFrame):
+        digest.update(b"frame")
+        digest.update(repr([str(column) for column in value.columns]).encode())
+        digest.update(repr([str(dtype) for dtype in value.dtypes]).encode())
+        try:
+            rows = pd.util.hash_pandas_object(value, index=True)
+        except TypeError:
+            # Unhashable cells (lists, dicts): hash their string form
+            rows = pd.util.hash_pandas_object(value.astype(str), index=True)
+        digest.update(rows.to_numpy().tobytes())
+    elif isinstance(value, (list, tuple)):
+        digest.update(f"seq{len(value)}".encode())
+        for item in value:
+            _hash_value(digest, item)
+    elif isinstance(value, dict):
+        digest.update(f"map{len(value)}".encode())
+        for key in sorted(value, key=str):
+            _hash_value(digest, key)
+            _hash_value(digest, value[key])
+    else:
+        digest.update(repr(value).encode())
+
+
+def fingerprint(value) -> str:
+    """Content hash of a step input or output (DataFrame, list/tuple/dict of them, or a plain value)."""
+    digest = hashlib.sha256()
+    _hash_value(digest, value)
+    return digest.hexdigest()
+
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _project_module(obj):
+    """The project module defining obj (or obj itself if it is one), None for third-party code."""
+    module = obj if inspect.ismodule(obj) else sys.modules.get(getattr(obj, "__module__", None) or "")
+    path = getattr(module, "__file__", None)
+    if path is None or "site-packages" in path:
+        return None
+    path = os.path.abspath(path)
+    return module if path.startswith(PROJECT_ROOT + os.sep) else None
+
+
+def _project_modules(code) -> dict:
+    """The project modules defining the given objects and, transitively, the project modules they import."""
+    modules = {}
+    stack = [module for module in map(_project_module, code) if module is not None]
+    while stack:
+        module = stack.pop()
+        if module.__name__ in modules:
+            continue
+        modules[module.__name__] = module
+        for value in list(vars(module).values()):
+            imported = _project_module(value)
+            if imported is not None and imported.__name__ not in modules:
+                stack.append(imported)
+    return modules
+
+
+def code_version(*code) -> str:
+    """
+    Hash of the source of the project modules defining the given functions, classes or modules
+    and of every project module they import (directly or not), so that editing any code a step
+    runs, helpers included, invalidates its artifacts.
+    """
+    digest = hashlib.sha256()
+    modules = _project_modules(code)
+    for name in sorted(modules):
+        digest.update(name.encode())
+        try:
+            digest.update(inspect.getsource(modules[name]).encode())
+        except (OSError, TypeError):
+            Logger.warning(f"No source for {name}: its changes will not invalidate artifacts")
+    return digest.hexdigest()
+
+
+class ArtifactStore:
+    """
+    Content-addressed store of the intermediates handed between DAG tasks.
+
+    DataFrames are saved as Arrow files (index kept), other values (lists of batches, summaries) pickled.
+    A None output is only recorded in the manifest, so a step that legitimately produced nothing
+    is reused like any other. Inputs are hashed on every step_key(): a loaded artifact modified
+    in place gets a new key.
+    Nothing is written before the first save(), so creating a store at DAG parse time is free.
+
+    Args:
+        root_dir (str): Directory holding the artifacts and the manifest
+    """
+    ARTIFACT_DIR = "artifacts"
+    MANIFEST_DIR = "manifest"
+    # Result of _lookup() for an artifact that is not recorded (None is a recorded value)
+    _MISSING = object()
+
+    def __init__(self, root_dir: str = "/tmp/pdm_cache"):
+        self.root_dir = root_dir
+        self.artifact_dir = os.path.join(root_dir, self.ARTIFACT_DIR)
+        self.manifest_dir = os.path.join(root_dir, self.MANIFEST_DIR)
+
+    def step_key(self, step: str, inputs: dict, code: tuple = ()) -> str:
+        """
+        Key of a step run: hash of the step name, of its inputs (by name) and of its code.
+
+        Args:
+            step (str): Step name
+            inputs (dict): Input values by parameter name
+            code (tuple): Functions / classes / modules the step runs (see code_version)
+        """
+        digest = hashlib.sha256(step.encode())
+        for name in sorted(inputs):
+            digest.update(name.encode())
+            digest.update(fingerprint(inputs[name]).encode())
+        digest.update(code_version(*code).encode())
+        return digest.hexdigest()
+
+    def _entry_path(self, name: str) -> str:
+        return os.path.join(self.manifest_dir, f"{name}.json")
+
+    def _read_entry(self, name: str) -> dict | None:
+        try:
+            with open(self._entry_path(name)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            Logger.warning(f"Unreadable manifest entry for {name}: {e}")
+            return None
+
+    def _write_entry(self, name: str, entry: dict):
+        os.makedirs(self.manifest_dir, exist_ok=True)
+        def write(tmp_path):
+            with open(tmp_path, "w") as f:
+                json.dump(entry, f, indent=2)
+        replace_atomically(self._entry_path(name), write)
+
+    def _pickle_path(self, file_key: str) -> str:
+        return os.path.join(self.artifact_dir, f"{file_key}.pkl")
+
+    def _remove_file(self, entry: dict):
+        if entry["kind"] == "none":
+            return
+        path = (
+            frame_path(self.artifact_dir, entry["file_key"]) if entry["kind"] == "frame"
+            else self._pickle_path(entry["file_key"])
+        )
+        if os.path.exists(path):
+            os.remove(path)
+
+    def load(self, name: str, key: str = None):
+        """
+        Load an artifact.
+
+        Args:
+            name (str): Artifact name
+            key (str): Only load it if it was produced under this step key. Defaults to the latest one.
+
+        Returns:
+            The artifact value, or None if it is missing, was produced under another key or is None
+        """
+        value = self._lookup(name, key)
+        return None if value is self._MISSING else value
+
+    def _lookup(self, name: str, key: str = None):
+        """The artifact value (None included), or _MISSING if it cannot be loaded."""
+        entry = self._read_entry(name)
+        if entry is None or (key is not None and entry["key"] != key):
+            return self._MISSING
+        try:
+            if entry["kind"] == "none":
+                return None
+            if entry["kind"] == "frame":
+                value = read_frame(self.artifact_dir, entry["file_key"])
+                return self._MISSING if value is None else value
+            with open(self._pickle_path(entry["file_key"]), "rb") as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            Logger.warning(f"Artifact {name} is in the manifest but its file is missing")
+            return self._MISSING
+
+    def save(self, name: str, key: str, value):
+        """
+        Save an artifact produced under a step key and record it in the manifest.
+        The file of the previous version of the artifact is removed.
+        """
+        previous = self._read_entry(name)
+        # A None value has no file: the manifest entry is the artifact
+        file_key = f"{name}-{key[:16]}" if value is not None else None
+        if value is None:
+            kind = "none"
+        elif isinstance(value, pd.DataFrame):
+            write_frame(self.artifact_dir, file_key, value, preserve_index=None)
+            kind = "frame"
+        else:
+            os.makedirs(self.artifact_dir, exist_ok=True)
+            def write(tmp_path):
+                with open(tmp_path, "wb") as f:
+                    pickle.dump(value, f)
+            replace_atomically(self._pickle_path(file_key), write)
+            kind = "pickle"
+
+        self._write_entry(name, {
+            "key": key,
+            "kind": kind,
+            "file_key": file_key,
+            "content": fingerprint(value),
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+        })
+        if previous is not None and previous.get("file_key") != file_key:
+            self._remove_file(previous)
+
+    def run_step(self, step: str, outputs: tuple, inputs: dict, compute, code: tuple = (), replay=None):
+        """
+        Run compute(**inputs) unless its outputs were already produced from the same inputs and code.
+        Only the outputs are reused: side effects of compute (e.g. cache writes) are redone by replay.
+
+        Args:
+            step (str): Step name
+            outputs (tuple): Artifact names of the step outputs, in the order compute returns them
+            inputs (dict): Input values by parameter name of compute
+            compute (Callable): The step function
+            code (tuple): Functions / classes / modules the step runs. Defaults to compute.
+            replay (Callable): Called with the reused outputs (in the order of outputs) when compute is skipped
+
+        Returns:
+            The step outputs (a single value when the step has one output)
+        """
+        key = self.step_key(step, inputs, code or (compute,))
+        cached = [self._lookup(name, key) for name in outputs]
+        if all(value is not self._MISSING for value in cached):
+            Logger.info(f"{step}: inputs and code unchanged (key {key[:12]}), reusing {', '.join(outputs)}")
+            if replay is not None:
+                replay(*cached)
+            return cached[0] if len(outputs) == 1 else tuple(cached)
+
+        Logger.info(f"{step}: computing {', '.join(outputs)} (key {key[:12]})")
+        results = compute(**inputs)
+        values = (results,) if len(outputs) == 1 else tuple(results)
+        for name, value in zip(outputs, values):
+            self.save(name, key, value)
+        return results
@@ -0,0 +1,346 @@
+import pandas as pd
+from cache.frame_store import frame_exists, read_frame, remove_frames, write_frame
+from collections import OrderedDict
+from config.cache_config import CACHE_MEMORY_BUDGET_MB
+from threading import RLock
+import weakref
+from utils.logger import get_logger
+
+
+class DataFrameCache:
+    """
+    Base of the singleton DataFrame caches. Each subclass is a namespace with its own
+    cache directory, frames, derived structures and hit/miss/eviction counts.
+
+    Frames are written to disk by set() and loaded on demand by get(). The frames held in
+    memory by all namespaces share one memory budget (DataFrame.memory_usage(deep=True)):
+    when it is exceeded, the least recently used frames are dropped from memory and reloaded
+    from disk by their next get(). Structures derived from a frame (get_derived) are dropped
+    with it. The frames read for every user (PINNED_KEYS) are never evicted, nor are the keys
+    pinned at runtime with pin() until they are unpinned (e.g. for a long DAG step).
+    Eviction only drops the cache's own reference: a frame a caller still holds stays alive,
+    so evicted frames are remembered by weak reference and the next get() takes such a frame
+    back instead of loading a second copy of it. Long-lived holders should still re-fetch
+    through get() (or their key be pinned) for the budget to actually free memory.
+
+    Each namespace has its own lock, and cache hits take no lock at all (the hit/miss counts
+    are therefore approximate). Disk reads and writes and frame size measurements run
+    outside the locks.
+
+    Subclasses set NAMESPACE and CACHE_DIR, and PINNED_KEYS for their hot frames.
+    """
+    NAMESPACE = None
+    CACHE_DIR = None
+    PINNED_KEYS = ()
+
+    # Shared by every namespace: eviction crosses namespaces. _lru_lock only guards this
+    # bookkeeping and is never held while taking a namespace lock.
+    _lru_lock = RLock()
+    _lru = OrderedDict()
+    _unsaved = set()
+    _namespaces = []
+    _memory_budget = CACHE_MEMORY_BUDGET_MB * 1024 * 1024 if CACHE_MEMORY_BUDGET_MB else None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._lock = RLock()
+        cls._instance = None
+        cls._data = {}
+        cls._derived = {}
+        # Evicted frames still referenced elsewhere (key -> frame, weak) and their sizes
+        cls._evicted = weakref.WeakValueDictionary()
+        cls._evicted_sizes = {}
+        # Keys pinned with pin(), on top of PINNED_KEYS
+        cls._pinned = set()
+        cls._initialized = False
+        cls._stats = {"hits": 0, "misses": 0, "evictions": 0, "readopted": 0}
+        cls._logger = get_logger(cls.__module__.rsplit('.', 1)[-1])
+        DataFrameCache._namespaces.append(cls)
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._lock:
+                # Double-check locking pattern
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        # Only initialize once
+        cls = type(self)
+        if not cls._initialized:
+            with cls._lock:
+                if not cls._initialized:
+                    cls._logger.info(f"Initializing {cls.__name__} singleton")
+                    self._cache_dir = cls.CACHE_DIR
+                    cls._initialized = True
+
+    def get(self, key: str, columns: list = None) -> pd.DataFrame:
+        """
+        Get DataFrame from cache. Load from disk if not in memory.
+
+        Args:
+            key: Cache key (e.g., 'positions_df', 'employees_df')
+            columns: Only return these columns. The whole frame is still loaded (once, and
+                kept like any other frame), the columns are selected from it.
+
+        Returns:
+            DataFrame or None if not found
+        """
+        cls = type(self)
+        df = cls._data.get(key)
+        if df is not None:
+            cls._stats["hits"] += 1
+            self._touch(key)
+            cls._logger.debug(f"Cache HIT for {key} (using in-memory data)")
+            return df if columns is None else df[columns]
+        cls._stats["misses"] += 1
+
+        df = self._readopt(key)
+        if df is not None:
+            return df if columns is None else df[columns]
+
+        cls._logger.info(f"Cache MISS for {key} - loading from disk")
+        df = self._load_frame(key)
+        if df is None:
+            return None
+        size = int(df.memory_usage(deep=True).sum())
+
+        with cls._lock:
+            # Another thread may have loaded or set the frame in the meantime
+            current = cls._data.get(key)
+            if current is not None:
+                return current if columns is None else current[columns]
+            self._store(key, df, size)
+        cls._logger.info(f"Loaded {key}: {len(df)} rows, {size / 1024 / 1024:.2f} MB")
+        self._evict(keep=(cls, key))
+        return df if columns is None else df[columns]
+
+    def _readopt(self, key: str) -> pd.DataFrame:
+        """Take back an evicted frame that is still alive (held by a caller), or return None."""
+        cls = type(self)
+        with cls._lock:
+            df = cls._evicted.pop(key, None)
+            size = cls._evicted_sizes.pop(key, None)
+            if df is None:
+                return None
+            current = cls._data.get(key)
+            if current is not None:
+                return current
+            self._store(key, df, size)
+            cls._stats["readopted"] += 1
+        cls._logger.info(f"Took back evicted {key} still held in memory (no reload)")
+        self._evict(keep=(cls, key))
+        return df
+
+    def _touch(self, key: str):
+        """Mark a frame as the most recently used one."""
+        try:
+            DataFrameCache._lru.move_to_end((type(self), key))
+        except KeyError:
+            # Evicted or cleared by another thread since it was read
+            pass
+
+    def _load_frame(self, key: str) -> pd.DataFrame:
+        """Load DataFrame from its memory-mapped cache file."""
+        try:
+            df = read_frame(self._cache_dir, key)
+            if df is None:
+                type(self)._logger.warning(f"Cache file not found for {key} in {self._cache_dir}")
+            return df
+        except Exception as e:
+            type(self)._logger.error(f"Error loading {key}: {e}")
+            return None
+
+    def set(self, key: str, df: pd.DataFrame):
+        """
+        Save DataFrame to cache (both memory and disk).
+
+        Args:
+            key: Cache key
+            df: DataFrame to cache
+        """
+        cls = type(self)
+        size = int(df.memory_usage(deep=True).sum())
+
+        # Save to disk; a frame that could not be saved is never evicted
+        try:
+            write_frame(self._cache_dir, key, df)
+            saved = True
+            cls._logger.info(f"Saved {key} to cache: {len(df)} rows")
+        except Exception as e:
+            saved = False
+            cls._logger.error(f"Error saving {key} to disk: {e}")
+
+        with cls._lock:
+            # Structures derived from the previous frame are no longer valid
+            cls._derived.pop(key, None)
+            self._forget_evicted(key)
+            self._store(key, df, size)
+            with DataFrameCache._lru_lock:
+                if saved:
+                    DataFrameCache._unsaved.discard((cls, key))
+                else:
+                    DataFrameCache._unsaved.add((cls, key))
+        self._evict(keep=(cls, key))
+
+    def _store(self, key: str, df: pd.DataFrame, size: int):
+        """Keep a frame of the given size (bytes) in memory as the most recently used one."""
+        cls = type(self)
+        with DataFrameCache._lru_lock:
+            cls._data[key] = df
+            DataFrameCache._lru[(cls, key)] = size
+            DataFrameCache._lru.move_to_end((cls, key))
+
+    def pin(self, key: str):
+        """Never evict a frame from memory until unpin(key). The frame does not have to be loaded yet."""
+        cls = type(self)
+        with DataFrameCache._lru_lock:
+            cls._pinned.add(key)
+        cls._logger.info(f"Pinned {key} in memory")
+
+    def unpin(self, key: str):
+        """Make a frame pinned with pin() evictable again (keys of PINNED_KEYS stay pinned)."""
+        cls = type(self)
+        with DataFrameCache._lru_lock:
+            cls._pinned.discard(key)
+        cls._logger.info(f"Unpinned {key}")
+        # Frames loaded while it was pinned may have pushed the caches over budget
+        self._evict()
+
+    @classmethod
+    def _is_pinned(cls, key: str) -> bool:
+        return key in cls.PINNED_KEYS or key in cls._pinned
+
+    @staticmethod
+    def _evict(keep=None):
+        """Drop least recently used, unpinned frames from memory until the budget is met."""
+        budget = DataFrameCache._memory_budget
+        if budget is None:
+            return
+        with DataFrameCache._lru_lock:
+            used = sum(DataFrameCache._lru.values())
+            for entry in list(DataFrameCache._lru):
+                if used <= budget:
+                    break
+                owner, key = entry
+                if entry == keep or owner._is_pinned(key) or entry in DataFrameCache._unsaved:
+                    continue
+                size = DataFrameCache._lru.pop(entry)
+                used -= size
+                df = owner._data.pop(key, None)
+                if df is not None:
+                    owner._evicted[key] = df
+                    owner._evicted_sizes[key] = size
+                owner._derived.pop(key, None)
+                owner._stats["evictions"] += 1
+                owner._logger.info(f"Evicted {key} from memory ({size / 1024 / 1024:.2f} MB)")
+
+    def get_derived(self, key: str, name, builder):
+        """
+        Get a structure derived from a cached DataFrame (e.g. a composite lookup table).
+        Built once with builder(df) and dropped when set() replaces the frame or it is evicted.
+
+        Args:
+            key: Cache key (e.g., 'positions_df')
+            name: Name of the derived structure
+            builder: Callable taking the DataFrame and returning the structure
+
+        Returns:
+            The derived structure, or None if the frame is not cached
+        """
+        cls = type(self)
+        df = self.get(key)
+        if df is None:
+            return None
+
+        derived = cls._derived.get(key, {})
+        if name in derived:
+            return derived[name]
+
+        structure = builder(df)
+        with cls._lock:
+            if cls._data.get(key) is not df:
+                # The frame was replaced or evicted while building: do not attach to it
+                return structure
+            derived = cls._derived.setdefault(key, {})
+            if name not in derived:
+                derived[name] = structure
+                cls._logger.info(f"Built {name} on {key}")
+            return derived[name]
+
+    def exists(self, key: str) -> bool:
+        """Whether a frame is cached, in memory or on disk (without loading it)."""
+        return key in type(self)._data or frame_exists(self._cache_dir, key)
+
+    @classmethod
+    def stats(cls) -> dict:
+        """
+        Hit/miss/eviction counts and in-memory frames of a namespace (called on a cache class),
+        or of every namespace (called on DataFrameCache).
+        """
+        if cls is DataFrameCache:
+            return {namespace.NAMESPACE: namespace.stats() for namespace in DataFrameCache._namespaces}
+        with DataFrameCache._lru_lock:
+            memory = sum(size for (owner, _), size in DataFrameCache._lru.items() if owner is cls)
+            return {**cls._stats, "frames": len(cls._data), "memory_mb": round(memory / 1024 / 1024, 2)}
+
+    @classmethod
+    def log_stats(cls):
+        """Log the counts returned by stats()."""
+        for namespace in ([cls] if cls is not DataFrameCache else DataFrameCache._namespaces):
+            namespace._logger.info(f"{namespace.__name__} stats: {namespace.stats()}")
+
+    @classmethod
+    def clear_key(cls, key: str):
+        """Drop a single DataFrame (and its derived structures) from memory so the next get() reloads it."""
+        with cls._lock:
+            cls._data.pop(key, None)
+            cls._derived.pop(key, None)
+            cls._forget_evicted(key)
+            with DataFrameCache._lru_lock:
+                DataFrameCache._lru.pop((cls, key), None)
+            cls._logger.info(f"Cleared {key} from in-memory cache")
+
+    def clear(self):
+        """Clear in-memory cache (useful for testing or memory management)."""
+        cls = type(self)
+        with cls._lock:
+            self._drop_all()
+            cls._logger.info("Cleared in-memory cache")
+
+    @classmethod
+    def _drop_all(cls):
+        with DataFrameCache._lru_lock:
+            for key in list(cls._data):
+                DataFrameCache._lru.pop((cls, key), None)
+        cls._data.clear()
+        cls._derived.clear()
+        cls._evicted.clear()
+        cls._evicted_sizes.clear()
+
+    @classmethod
+    def _forget_evicted(cls, key: str):
+        """An evicted frame must not be taken back once its key is replaced or cleared."""
+        cls._evicted.pop(key, None)
+        cls._evicted_sizes.pop(key, None)
+
+    @classmethod
+    def reset_singleton(cls):
+        """Reset singleton instance (useful for testing)."""
+        with cls._lock:
+            cls._instance = None
+            cls._drop_all()
+            cls._pinned.clear()
+            cls._initialized = False
+            cls._logger.info(f"Reset {cls.__name__} singleton")
+
+    # Reset cache files (use with caution - this will delete all cached data on disk)
+    def clear_cache_files(self):
+        cls = type(self)
+        with cls._lock:
+            try:
+                remove_frames(self._cache_dir)
+                cls._logger.info("Cleared cache files")
+            except Exception as e:
+                cls._logger.error(f"Error clearing cache files: {e}")
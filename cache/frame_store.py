@@ -0,0 +1,107 @@
+"""
+On-disk format of the DataFrame caches:
+
+Frames are written as uncompressed Arrow IPC (Feather v2) files and read back memory-mapped:
+a read skips the decompression and page decoding of Parquet, and a column projection only
+touches the pages of the requested columns. The frames are still converted to regular pandas
+columns (to_pandas()): numeric buffers are copied and string columns become Python objects,
+so the None/NaN semantics downstream code relies on are kept and every task holds its own
+copy of the frames it loads. The gain is read time, not memory.
+Parquet snapshots written by earlier runs are still read when no Arrow file exists.
+
+"""
+import os
+import tempfile
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+
+ARROW_SUFFIX = '.arrow'
+PARQUET_SUFFIX = '.parquet'
+
+
+def frame_path(cache_dir: str, key: str, suffix: str = ARROW_SUFFIX) -> str:
+    return os.path.join(cache_dir, f"{key}{suffix}")
+
+
+def frame_exists(cache_dir: str, key: str) -> bool:
+    return any(os.path.exists(frame_path(cache_dir, key, suffix)) for suffix in (ARROW_SUFFIX, PARQUET_SUFFIX))
+
+
+def replace_atomically(file_path: str, write) -> None:
+    """
+    Writes a file through write(tmp_path) into a temporary file of its directory, unique to
+    the caller (concurrent writers of the same file never share it), then moves it in place.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(file_path), suffix='.tmp')
+    os.close(fd)
+    try:
+        write(tmp_path)
+        # mkstemp files are private to their owner: give the file the usual permissions
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def write_frame(cache_dir: str, key: str, df: pd.DataFrame, preserve_index: bool = False) -> str:
+    """
+    Writes a frame as an Arrow IPC file (index dropped by default, like the former to_parquet(index=False)).
+    The file is replaced atomically: tasks still mapping the previous version keep reading it.
+
+    Args:
+        preserve_index: Passed to pa.Table.from_pandas (None keeps a non-default index, like to_parquet())
+
+    Returns:
+        str: Path of the written file
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    file_path = frame_path(cache_dir, key)
+    table = pa.Table.from_pandas(df, preserve_index=preserve_index)
+    replace_atomically(file_path, lambda tmp_path: feather.write_feather(table, tmp_path, compression='uncompressed'))
+
+    # A Parquet snapshot of the same key is now stale
+    parquet_path = frame_path(cache_dir, key, PARQUET_SUFFIX)
+    if os.path.exists(parquet_path):
+        os.remove(parquet_path)
+    return file_path
+
+
+def read_frame(cache_dir: str, key: str, columns: list = None) -> pd.DataFrame | None:
+    """
+    Reads a cached frame from its memory-mapped Arrow file (or from a legacy Parquet snapshot)
+    into regular pandas columns (object strings, NaN/None for nulls).
+
+    Args:
+        cache_dir: Cache directory
+        key: Cache key
+        columns: Columns to load. Defaults to all columns.
+
+    Returns:
+        DataFrame, or None if the key has no file
+    """
+    file_path = frame_path(cache_dir, key)
+    if os.path.exists(file_path):
+        table = feather.read_table(file_path, columns=columns, memory_map=True)
+        if columns is not None:
+            # Projected columns come back in file order: keep the requested order, like read_parquet()
+            table = table.select(columns)
+        return table.to_pandas()
+
+    parquet_path = frame_path(cache_dir, key, PARQUET_SUFFIX)
+    if os.path.exists(parquet_path):
+        return pd.read_parquet(parquet_path, columns=columns)
+    return None
+
+
+def remove_frames(cache_dir: str) -> int:
+    """Deletes every cached frame file of a cache directory. Returns the number of files removed."""
+    removed = 0
+    for filename in os.listdir(cache_dir):
+        if filename.endswith((ARROW_SUFFIX, PARQUET_SUFFIX)):
+            os.remove(os.path.join(cache_dir, filename))
+            removed += 1
+    return removed
@@ -1,125 +1,90 @@
-import os
 import pandas as pd
-from threading import Lock
+from cache.dataframe_cache import DataFrameCache
 from utils.logger import get_logger
 
 Logger = get_logger("sap_cache")
 
-class SAPDataCache:
+class SAPDataCache(DataFrameCache):
     """
     Singleton cache for SAP data.
-    Loads parquet files once per process/DAG task and keeps DataFrames in memory.
+    Loads cache files once per process/DAG task and keeps DataFrames in memory.
     """
-    _instance = None
-    _lock = Lock()
-    _data = {}
-    _initialized = False
-    
-    def __new__(cls):
-        if cls._instance is None:
-            with cls._lock:
-                # Double-check locking pattern
-                if cls._instance is None:
-                    cls._instance = super().__new__(cls)
-        return cls._instance
-    
-    def __init__(self):
-        # Only initialize once
-        if not SAPDataCache._initialized:
-            with SAPDataCache._lock:
-                if not SAPDataCache._initialized:
-                    Logger.info("Initializing SAPDataCache singleton")
-                    self._cache_dir = "./cache/sap_data"
-                    SAPDataCache._initialized = True
-    
-    def get(self, key: str) -> pd.DataFrame:
+    NAMESPACE = "sap"
+    CACHE_DIR = "./cache/sap_data"
+    # Looked up for every processed user
+    PINNED_KEYS = ("positions_df", "employees_df")
+
+    @staticmethod
+    def _normalize(value) -> str:
+        """Normalize a lookup value the same way the callers compare it (string, lowercased)."""
+        return str(value).lower()
+
+    def get_index(self, key: str, columns) -> dict:
         """
-        Get DataFrame from cache. Load from parquet if not in memory.
-        
+        Get a hash index over one or more columns of a cached DataFrame.
+        The index is built once per (key, columns) and dropped whenever set() replaces the frame or it is evicted.
+
         Args:
-            key: Cache key (e.g., 'positions_df', 'employees_df')
-            
+            key: Cache key (e.g., 'employees_df')
+            columns: Column name or tuple of column names to index on
+
         Returns:
-            DataFrame or None if not found
+            Dict mapping normalized value (or tuple of values) to row positions, in frame order.
+            Empty dict if the frame or one of the columns is missing.
         """
-        # Check if already loaded in memory
-        if key in SAPDataCache._data:
-            Logger.debug(f"Cache HIT for {key} (using in-memory data)")
-            return SAPDataCache._data[key]
-        
-        # Load from parquet (thread-safe)
-        with SAPDataCache._lock:
-            # Double-check after acquiring lock
-            if key in SAPDataCache._data:
-                return SAPDataCache._data[key]
-            
-            Logger.info(f"Cache MISS for {key} - loading from parquet")
-            df = self._load_from_parquet(key)
-            
-            if df is not None:
-                SAPDataCache._data[key] = df
-                Logger.info(f"Loaded {key}: {len(df)} rows, {df.memory_usage(deep=True).sum() / 1024 / 1024:.2f} MB")
-            
-            return df
-    
-    def _load_from_parquet(self, key: str) -> pd.DataFrame:
-        """Load DataFrame from parquet file."""
-        try:
-            file_path = os.path.join(self._cache_dir, f"{key}.parquet")
-            
-            if not os.path.exists(file_path):
-                Logger.warning(f"Parquet file not found: {file_path}")
-                return None
-            
-            df = pd.read_parquet(file_path)
-            return df
-            
-        except Exception as e:
-            Logger.error(f"Error loading {key} from parquet: {e}")
-            return None
-    
-    def set(self, key: str, df: pd.DataFrame):
+        columns = (columns,) if isinstance(columns, str) else tuple(columns)
+
+        def build_index(df):
+            if not all(col in df.columns for col in columns):
+                Logger.warning(f"Cannot index {key} on {list(columns)}: missing column(s)")
+                return {}
+
+            normalized = [
+                df[col].astype(str).str.lower().reset_index(drop=True) for col in columns
+            ]
+            positions = pd.Series(range(len(df)))
+            if len(columns) == 1:
+                groups = positions.groupby(normalized[0], sort=False).indices
+            else:
+                groups = positions.groupby(normalized, sort=False).indices
+            index = {k: v.tolist() for k, v in groups.items()}
+            Logger.info(f"Built index on {key} {list(columns)}: {len(index)} keys")
+            return index
+
+        index = self.get_derived(key, columns, build_index)
+        return index if index is not None else {}
+
+    def lookup(self, key: str, columns, values, exact=()) -> pd.DataFrame:
         """
-        Save DataFrame to cache (both memory and parquet).
-        
+        Get the rows of a cached DataFrame matching the given value(s), case-insensitively.
+
         Args:
-            key: Cache key
-            df: DataFrame to cache
+            key: Cache key (e.g., 'employees_df')
+            columns: Column name or tuple of column names
+            values: Value or tuple of values, aligned with columns
+            exact: Column name or tuple of column names (among columns) whose values must be equal
+                as stored (df[col] == value, case-sensitive) instead of matching case-insensitively
+
+        Returns:
+            DataFrame of matching rows in frame order (empty if no match), or None if the frame is not cached
         """
-        with SAPDataCache._lock:
-            # Save to memory
-            SAPDataCache._data[key] = df
-            
-            # Save to parquet
-            try:
-                os.makedirs(self._cache_dir, exist_ok=True)
-                file_path = os.path.join(self._cache_dir, f"{key}.parquet")
-                df.to_parquet(file_path, index=False, compression='snappy')
-                Logger.info(f"Saved {key} to cache: {len(df)} rows")
-            except Exception as e:
-                Logger.error(f"Error saving {key} to parquet: {e}")
-    
-    def clear(self):
-        """Clear in-memory cache (useful for testing or memory management)."""
-        with SAPDataCache._lock:
-            SAPDataCache._data.clear()
-            Logger.info("Cleared in-memory cache")
-    
-    @classmethod
-    def reset_singleton(cls):
-        """Reset singleton instance (useful for testing)."""
-        with cls._lock:
-            cls._instance = None
-            cls._data.clear()
-            cls._initialized = False
-            Logger.info("Reset SAPDataCache singleton")
-    # Reset Parquet files (use with caution - this will delete all cached data on disk)
-    def clear_parquet_cache(self):
-        with SAPDataCache._lock:
-            try:
-                for filename in os.listdir(self._cache_dir):
-                    if filename.endswith(".parquet"):
-                        os.remove(os.path.join(self._cache_dir, filename))
-                Logger.info("Cleared parquet cache files")
-            except Exception as e:
-                Logger.error(f"Error clearing parquet cache: {e}")
\ No newline at end of file
+        df = self.get(key)
+        if df is None:
+            return None
+        index = self.get_index(key, columns)
+        if isinstance(columns, str):
+            columns, values = (columns,), (values,)
+        lookup_key = tuple(self._normalize(v) for v in values)
+        positions = index.get(lookup_key[0] if len(columns) == 1 else lookup_key)
+        if not positions:
+            return df.iloc[0:0]
+        rows = df.iloc[positions]
+        exact = (exact,) if isinstance(exact, str) else tuple(exact)
+        if exact:
+            # Case-insensitive matches are a superset of the exact ones: filter the few rows found
+            mask = pd.Series(True, index=rows.index)
+            for col, value in zip(columns, values):
+                if col in exact:
+                    mask &= rows[col] == value
+            rows = rows[mask.to_numpy()]
+        return rows
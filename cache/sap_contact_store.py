@@ -0,0 +1,70 @@
+import pandas as pd
+from threading import Lock
+from cache.sap_cache import SAPDataCache
+from utils.logger import get_logger
+
+Logger = get_logger("sap_contact_store")
+
+
+class SAPContactStore:
+    """
+    Per-person view of an SAP contact table (peremail_df), grouped once so that the contacts
+    of a user are a dict lookup instead of a scan of the whole table.
+
+    Rows are kept as small dicts (column -> value) in table order, grouped by the lowercased
+    person id ('personidexternal', or 'userid' for renamed copies of the table). Plain dicts
+    rather than Arrow-backed structures: callers read a few fields of a few rows per user,
+    where dict access is much cheaper than Arrow scalar access.
+    Built from the SAP cache with from_cache() and passed to EmailResolver by its holders.
+
+    Args:
+        contacts (pd.DataFrame): SAP contact rows
+    """
+    CACHE_KEY = "peremail_df"
+    _lock = Lock()
+
+    def __init__(self, contacts: pd.DataFrame):
+        self._by_person = {}
+        self._derived = {}
+        if contacts is None or contacts.empty:
+            return
+
+        id_col = 'personidexternal' if 'personidexternal' in contacts.columns else 'userid'
+        person_ids = contacts[id_col].astype(str).str.lower()
+        for person_id, row in zip(person_ids, contacts.to_dict("records")):
+            self._by_person.setdefault(person_id, []).append(row)
+        self._by_person = {person_id: tuple(rows) for person_id, rows in self._by_person.items()}
+        Logger.info(f"Built SAP contact store: {len(contacts)} rows, {len(self._by_person)} persons")
+
+    @classmethod
+    def from_cache(cls) -> "SAPContactStore":
+        """
+        Returns the store of the peremail_df frame of SAPDataCache, built once per version of
+        the frame (set() replaces it). Callers keep the returned store for their whole run and
+        pass it along instead of the frame, so it is not rebuilt per call or per copy of the table.
+        An empty store is returned when the frame is not cached.
+        """
+        store = SAPDataCache().get_derived(cls.CACHE_KEY, "contact_store", cls)
+        return store if store is not None else cls(None)
+
+    def rows(self, userid: str) -> tuple:
+        """Contact rows of a person (case-insensitive id), in table order. Empty tuple if none."""
+        return self._by_person.get(str(userid).strip().lower(), ())
+
+    def persons(self) -> dict:
+        """All contact rows, grouped per lowercased person id."""
+        return self._by_person
+
+    def get_derived(self, name: str, builder):
+        """
+        Get a structure derived from the store (e.g. a per-person primary email map),
+        built once with builder(store) and living as long as the store.
+        """
+        if name not in self._derived:
+            with SAPContactStore._lock:
+                if name not in self._derived:
+                    self._derived[name] = builder(self)
+        return self._derived[name]
+
+    def __len__(self):
+        return len(self._by_person)
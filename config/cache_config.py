@@ -0,0 +1,7 @@
+"""
+In-memory budget of the DataFrame caches.
+"""
+# Memory (MB, measured with DataFrame.memory_usage(deep=True)) the frames held in memory by all
+# caches of a process may use before the least recently used ones are evicted back to disk.
+# None disables eviction.
+CACHE_MEMORY_BUDGET_MB = 2048
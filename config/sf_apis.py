@@ -22,4 +22,43 @@ uris_params = {
 
 batch_apis = {
     "/odata/v2/$batch"
-}
\ No newline at end of file
+}
+
+# Identity of a record, used to merge delta extracts into the cached snapshot (SAP field names).
+# The snapshot keeps one row per identity: the latest effective-dated record.
+entity_keys = {
+    "positions": ["code"],
+    "employees": ["userId"],
+    "perPerson": ["personIdExternal"],
+    "perPersonal": ["personIdExternal"],
+    "perEmail": ["personIdExternal", "emailType"],
+    "empJobRelationships": ["userId", "relationshipType"]
+}
+
+# Effective-dating fields deciding which record of an identity is the latest one (SAP field names)
+entity_effective_fields = {
+    "positions": ["effectiveStartDate"],
+    "employees": ["startDate", "seqNumber"],
+    "perPersonal": ["startDate"],
+    "empJobRelationships": ["startDate"]
+}
+
+# Stable sort order (unique record key) required by partitioned $skip/$top fetches
+entity_order_by = {
+    "positions": "code,effectiveStartDate",
+    "employees": "userId,startDate,seqNumber",
+    "perPerson": "personIdExternal",
+    "perPersonal": "personIdExternal,startDate",
+    "perEmail": "personIdExternal,emailType",
+    "empJobRelationships": "userId,relationshipType,startDate"
+}
+
+# Field used for delta extraction ($filter=<field> gt datetimeoffset'...')
+delta_field = "lastModifiedDateTime"
+
+# Independent entities CoreProcessor upserts at the same time (1 = strictly EXECUTION_PLAN order).
+# Opt-in: raise it once the SAP tenant's rate limits are known to absorb the extra load.
+max_parallel_upserts = 1
+
+# Chunks of one entity UpsertClient sends at the same time (1 = one after the other). Opt-in as well.
+max_concurrent_upsert_chunks = 1
@@ -0,0 +1,39 @@
+"""
+Connection pool lifecycle of a DAG task.
+
+Each Airflow task runs in its own process: the PostgreSQL and Oracle pools it opened are only
+useful until the task ends. with_connection_pools wraps a task callable so that, however the
+task ends, the usage of every pool is logged and the pooled connections are closed instead of
+being left for the server to time out.
+"""
+import functools
+from db.oracle_connection import OracleDatabaseConnection
+from db.psycopg2_connection import Psycopg2DatabaseConnection
+from utils.logger import get_logger
+
+logger_ = get_logger('connection_pools')
+
+
+def release_connection_pools():
+    """Log the metrics of every open pool, then close all of them."""
+    for name, connection_class in (("PostgreSQL", Psycopg2DatabaseConnection), ("Oracle", OracleDatabaseConnection)):
+        try:
+            for pool_name, metrics in connection_class.all_pool_metrics().items():
+                logger_.info(f"{name} pool {pool_name}: {metrics}")
+        except Exception as e:
+            logger_.warning(f"Could not read {name} pool metrics: {e}")
+        try:
+            connection_class.close_all_pools()
+        except Exception as e:
+            logger_.warning(f"Error closing {name} connection pools: {e}")
+
+
+def with_connection_pools(task):
+    """Decorate a DAG task callable: release_connection_pools() runs when it returns or raises."""
+    @functools.wraps(task)
+    def wrapper(*args, **kwargs):
+        try:
+            return task(*args, **kwargs)
+        finally:
+            release_connection_pools()
+    return wrapper
@@ -1,3 +1,6 @@
+import os
+from contextlib import contextmanager
+from threading import Lock
 import oracledb
 from utils.logger import get_logger
 from utils.send_except_email import send_error_notification
@@ -7,17 +10,61 @@ logger_ = get_logger('oracle_db_connection')
 class OracleDatabaseConnection():
     """
     Establishes and returns database connections using oracledb for Oracle.
-    
+    Connections are acquired from a process-wide oracledb pool shared by every instance using
+    the same DSN/user (use_pool=False restores one connection per call). Closing a pooled
+    connection releases it back to the pool, so callers do not change.
+
     Args:
         oracle_dsn (dict): Database connection parameters
         connect_timeout (int): Connection timeout in seconds (default: 20)
         call_timeout (int): Query execution timeout in milliseconds (default: 60000 = 60s)
+        use_pool (bool): Acquire connections from the shared pool (default: True)
+        min_connections (int): Connections kept open by the pool (default: 1)
+        max_connections (int): Upper bound of open connections; callers wait for a free one (default: 4)
+        ping_interval (int): Seconds of idleness after which a connection is pinged on acquire (default: 60)
     """
+    _pools = {}
+    _pools_lock = Lock()
+    _pools_pid = None
 
-    def __init__(self, oracle_dsn: dict, connect_timeout: int = 20, call_timeout: int = 60000):
+    def __init__(self, oracle_dsn: dict, connect_timeout: int = 20, call_timeout: int = 60000,
+                 use_pool: bool = True, min_connections: int = 1, max_connections: int = 4,
+                 ping_interval: int = 60):
         self.oracle_dsn = oracle_dsn
         self.connect_timeout = connect_timeout
         self.call_timeout = call_timeout
+        self.use_pool = use_pool
+        self.min_connections = min_connections
+        self.max_connections = max_connections
+        self.ping_interval = ping_interval
+
+    def _dsn(self) -> str:
+        return f"{self.oracle_dsn['host']}:{self.oracle_dsn['port']}/{self.oracle_dsn['database']}"
+
+    def _get_pool(self):
+        """Returns the pool for this DSN/user, creating it on first use in this process."""
+        key = (self._dsn(), self.oracle_dsn['user'])
+        with OracleDatabaseConnection._pools_lock:
+            # Pools (and their sockets) must not be shared with forked worker processes
+            if OracleDatabaseConnection._pools_pid != os.getpid():
+                OracleDatabaseConnection._pools = {}
+                OracleDatabaseConnection._pools_pid = os.getpid()
+            pool = OracleDatabaseConnection._pools.get(key)
+            if pool is None:
+                pool = oracledb.create_pool(
+                    user=self.oracle_dsn['user'],
+                    password=self.oracle_dsn['password'],
+                    dsn=self._dsn(),
+                    min=self.min_connections,
+                    max=self.max_connections,
+                    increment=1,
+                    getmode=oracledb.POOL_GETMODE_WAIT,
+                    ping_interval=self.ping_interval,
+                    tcp_connect_timeout=self.connect_timeout,
+                )
+                OracleDatabaseConnection._pools[key] = pool
+                logger_.info(f"Oracle connection pool created (min={self.min_connections}, max={self.max_connections})")
+            return pool
 
     def get_oracle_db_connection(self):
         """
@@ -26,16 +73,20 @@ class OracleDatabaseConnection():
         Returns:
             oracledb.Connection: A connection object to the Oracle database.
         """
-        try: 
-            # Set connection timeout
-            oracledb.defaults.timeout = self.connect_timeout
-            
-            connection = oracledb.connect(
-                user=self.oracle_dsn['user'],
-                password=self.oracle_dsn['password'],
-                dsn=f"{self.oracle_dsn['host']}:{self.oracle_dsn['port']}/{self.oracle_dsn['database']}"
-            )
-            
+        try:
+            if self.use_pool:
+                # The pool pings connections idle for more than ping_interval before handing them out
+                connection = self._get_pool().acquire()
+            else:
+                # Set connection timeout
+                oracledb.defaults.timeout = self.connect_timeout
+
+                connection = oracledb.connect(
+                    user=self.oracle_dsn['user'],
+                    password=self.oracle_dsn['password'],
+                    dsn=self._dsn()
+                )
+
             if connection:
                 # Set query execution timeout (call_timeout in milliseconds)
                 connection.call_timeout = self.call_timeout
@@ -49,3 +100,44 @@ class OracleDatabaseConnection():
             logger_.error(f"Error connecting to Oracle database: {e}")
             send_error_notification("Oracle DB Connection Error", str(e))
             raise e
+
+    @contextmanager
+    def connection(self):
+        """
+        Context-manager checkout: `with conn_provider.connection() as conn:` releases the
+        connection to the pool (or closes it) on exit.
+        """
+        connection = self.get_oracle_db_connection()
+        try:
+            yield connection
+        finally:
+            connection.close()
+
+    def pool_metrics(self) -> dict:
+        """
+        Pool usage: connections open, busy (checked out) and the configured maximum.
+        """
+        pool = OracleDatabaseConnection._pools.get((self._dsn(), self.oracle_dsn['user']))
+        if pool is None:
+            return {}
+        return self._metrics(pool)
+
+    @classmethod
+    def all_pool_metrics(cls) -> dict:
+        """pool_metrics() of every pool of this process, keyed by 'user@dsn'."""
+        with cls._pools_lock:
+            pools = dict(cls._pools)
+        return {f"{user}@{dsn}": cls._metrics(pool) for (dsn, user), pool in pools.items()}
+
+    @staticmethod
+    def _metrics(pool) -> dict:
+        return {"open": pool.opened, "in_use": pool.busy, "max_connections": pool.max}
+
+    @classmethod
+    def close_all_pools(cls):
+        """Close every pooled connection (end of a DAG task)."""
+        with cls._pools_lock:
+            for pool in cls._pools.values():
+                pool.close(force=True)
+            cls._pools = {}
+            logger_.info("Closed Oracle connection pools")
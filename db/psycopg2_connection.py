@@ -1,47 +1,202 @@
+import os
+import time
+from contextlib import contextmanager
+from threading import BoundedSemaphore, Lock
 import psycopg2
+import psycopg2.extras
+from psycopg2.pool import ThreadedConnectionPool
 from utils.logger import get_logger
 from utils.send_except_email import send_error_notification
 
 logger_ = get_logger('psycopg2_db_connection')
 
 
+class PooledConnection:
+    """
+    Proxy around a pooled psycopg2 connection.
+    close() returns the connection to its pool instead of closing the socket (any uncommitted
+    work is rolled back first, as a real close would), so existing callers reuse pooled
+    connections without changes.
+    """
+
+    def __init__(self, connection, release):
+        self._connection = connection
+        self._release = release
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        if self._connection is not None:
+            connection, self._connection = self._connection, None
+            self._release(connection)
+
+
 class Psycopg2DatabaseConnection():
     """
     Establishes and returns database connections using psycopg2 for PostgreSQL.
-    
+    Connections come from a process-wide ThreadedConnectionPool shared by every instance
+    using the same database/user/schema (use_pool=False restores one connection per call).
+
     Args:
         postgres_url (dict): Database connection parameters
         connect_timeout (int): Connection timeout in seconds (default: 30)
         statement_timeout (int): Query execution timeout in milliseconds (default: 60000 = 60s)
+        use_pool (bool): Check connections out of the shared pool (default: True)
+        min_connections (int): Connections kept open by the pool (default: 1)
+        max_connections (int): Upper bound of open connections; callers wait for a free one (default: 5)
+        ping_interval (int): Seconds of idleness after which a connection is pinged on checkout (default: 60)
     """
+    _pools = {}
+    _pools_lock = Lock()
+    _pools_pid = None
 
-    def __init__(self, postgres_url: dict, connect_timeout: int = 30, statement_timeout: int = 60000):
+    def __init__(self, postgres_url: dict, connect_timeout: int = 30, statement_timeout: int = 60000,
+                 use_pool: bool = True, min_connections: int = 1, max_connections: int = 5,
+                 ping_interval: int = 60):
         self.postgres_url = postgres_url
         self.connect_timeout = connect_timeout
         self.statement_timeout = statement_timeout
+        self.use_pool = use_pool
+        self.min_connections = min_connections
+        self.max_connections = max_connections
+        self.ping_interval = ping_interval
+
+    def _connect_kwargs(self) -> dict:
+        return dict(
+            host=self.postgres_url['host'],
+            port=self.postgres_url['port'],
+            database=self.postgres_url['database'],
+            user=self.postgres_url['user'],
+            password=self.postgres_url['password'],
+            connect_timeout=self.connect_timeout,
+            options=f"-c search_path={self.postgres_url['schema']} -c statement_timeout={self.statement_timeout}"
+        )
+
+    def _pool_key(self) -> tuple:
+        return (
+            self.postgres_url['host'], self.postgres_url['port'], self.postgres_url['database'],
+            self.postgres_url['user'], self.postgres_url['schema'], self.statement_timeout
+        )
+
+    def _get_pool(self) -> dict:
+        """Returns the pool entry for this database, creating it on first use in this process."""
+        key = self._pool_key()
+        with Psycopg2DatabaseConnection._pools_lock:
+            # Pools (and their sockets) must not be shared with forked worker processes
+            if Psycopg2DatabaseConnection._pools_pid != os.getpid():
+                Psycopg2DatabaseConnection._pools = {}
+                Psycopg2DatabaseConnection._pools_pid = os.getpid()
+            entry = Psycopg2DatabaseConnection._pools.get(key)
+            if entry is None:
+                psycopg2.extensions.set_wait_callback(psycopg2.extras.wait_select)
+                entry = {
+                    "pool": ThreadedConnectionPool(self.min_connections, self.max_connections, **self._connect_kwargs()),
+                    "slots": BoundedSemaphore(self.max_connections),
+                    "metrics": {"checkouts": 0, "in_use": 0, "discarded": 0, "pings": 0, "wait_seconds": 0.0},
+                    # id(connection) -> time it was last given back, to ping only idle connections
+                    "returned_at": {},
+                    "metrics_lock": Lock(),
+                    "max_connections": self.max_connections,
+                }
+                Psycopg2DatabaseConnection._pools[key] = entry
+                logger_.info(f"PostgreSQL connection pool created (min={self.min_connections}, max={self.max_connections})")
+            return entry
+
+    def _is_healthy(self, connection, idle_seconds: float, metrics: dict, metrics_lock) -> bool:
+        """
+        Health check run on checkout. A closed socket (psycopg2 marks it when a statement failed
+        on a lost connection) is always discarded; the server is only asked for a SELECT 1 when
+        the connection sat idle for more than ping_interval, when the server or a firewall may
+        have dropped it silently. Recently used connections are handed out without a round trip.
+        """
+        if connection.closed:
+            return False
+        if idle_seconds <= self.ping_interval:
+            return True
+        with metrics_lock:
+            metrics["pings"] += 1
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            connection.rollback()
+            return True
+        except psycopg2.Error:
+            return False
 
-    def get_postgres_db_connection(self):    
+    def _checkout(self) -> PooledConnection:
+        entry = self._get_pool()
+        pool, metrics, metrics_lock = entry["pool"], entry["metrics"], entry["metrics_lock"]
+        returned_at = entry["returned_at"]
+        start = time.perf_counter()
+        entry["slots"].acquire()
+        try:
+            connection = pool.getconn()
+            # New connections have no entry: they were just opened and need no ping
+            idle_seconds = time.monotonic() - returned_at.pop(id(connection), time.monotonic())
+            while not self._is_healthy(connection, idle_seconds, metrics, metrics_lock):
+                logger_.warning("Discarding broken pooled PostgreSQL connection")
+                pool.putconn(connection, close=True)
+                with metrics_lock:
+                    metrics["discarded"] += 1
+                connection = pool.getconn()
+                idle_seconds = time.monotonic() - returned_at.pop(id(connection), time.monotonic())
+        except Exception:
+            entry["slots"].release()
+            raise
+        with metrics_lock:
+            metrics["checkouts"] += 1
+            metrics["in_use"] += 1
+            metrics["wait_seconds"] += time.perf_counter() - start
+
+        def release(conn):
+            try:
+                if not conn.closed:
+                    conn.rollback()
+                if not conn.closed:
+                    returned_at[id(conn)] = time.monotonic()
+                pool.putconn(conn, close=bool(conn.closed))
+            except Exception as e:
+                # The rollback failed: the connection is broken, close it instead of pooling it
+                logger_.warning(f"Error returning PostgreSQL connection to the pool: {e}")
+                returned_at.pop(id(conn), None)
+                try:
+                    pool.putconn(conn, close=True)
+                except Exception:
+                    pass
+                with metrics_lock:
+                    metrics["discarded"] += 1
+            finally:
+                with metrics_lock:
+                    metrics["in_use"] -= 1
+                entry["slots"].release()
+
+        return PooledConnection(connection, release)
+
+    def get_postgres_db_connection(self):
         """
         Establishes and returns a connection to the PostgreSQL database using
         credentials stored in Airflow Variables or environment variables.
-    
+        With pooling, calling close() on the returned connection gives it back to the pool.
+
         Returns:
             psycopg2.extensions.connection: A connection object to the PostgreSQL database.
         """
         try:
+            if self.use_pool:
+                return self._checkout()
+
             # Set a timeout for the connection attempt
             psycopg2.extensions.set_wait_callback(psycopg2.extras.wait_select)
 
-            connection = psycopg2.connect(
-                host=self.postgres_url['host'],
-                port=self.postgres_url['port'],
-                database=self.postgres_url['database'],
-                user=self.postgres_url['user'],
-                password=self.postgres_url['password'],
-                connect_timeout=self.connect_timeout,
-                options=f"-c search_path={self.postgres_url['schema']} -c statement_timeout={self.statement_timeout}"
-            )
-            
+            connection = psycopg2.connect(**self._connect_kwargs())
+
             if connection:
                 logger_.info(f"PostgreSQL connection established (connect_timeout={self.connect_timeout}s, statement_timeout={self.statement_timeout}ms)")
                 return connection
@@ -52,4 +207,56 @@ class Psycopg2DatabaseConnection():
         except Exception as e:
             logger_.error(f"Error connecting to PostgreSQL database: {e}")
             send_error_notification("PostgreSQL DB Connection Error", str(e))
-            raise e
\ No newline at end of file
+            raise e
+
+    @contextmanager
+    def connection(self):
+        """
+        Context-manager checkout: `with conn_provider.connection() as conn:` returns the
+        connection to the pool (or closes it) on exit.
+        """
+        connection = self.get_postgres_db_connection()
+        try:
+            yield connection
+        finally:
+            connection.close()
+
+    def pool_metrics(self) -> dict:
+        """
+        Pool usage: checkouts, connections in use / idle / open, discarded broken connections,
+        pings of idle connections and total seconds spent waiting for a free connection.
+        """
+        entry = Psycopg2DatabaseConnection._pools.get(self._pool_key())
+        if entry is None:
+            return {}
+        return self._entry_metrics(entry)
+
+    @classmethod
+    def all_pool_metrics(cls) -> dict:
+        """pool_metrics() of every pool of this process, keyed by 'user@host:port/database'."""
+        with cls._pools_lock:
+            entries = dict(cls._pools)
+        return {
+            f"{key[3]}@{key[0]}:{key[1]}/{key[2]}": cls._entry_metrics(entry)
+            for key, entry in entries.items()
+        }
+
+    @staticmethod
+    def _entry_metrics(entry: dict) -> dict:
+        pool = entry["pool"]
+        with entry["metrics_lock"]:
+            metrics = dict(entry["metrics"])
+        metrics["idle"] = len(pool._pool)
+        metrics["open"] = len(pool._pool) + len(pool._used)
+        metrics["max_connections"] = entry["max_connections"]
+        metrics["wait_seconds"] = round(metrics["wait_seconds"], 3)
+        return metrics
+
+    @classmethod
+    def close_all_pools(cls):
+        """Close every pooled connection (end of a DAG task)."""
+        with cls._pools_lock:
+            for entry in cls._pools.values():
+                entry["pool"].closeall()
+            cls._pools = {}
+            logger_.info("Closed PostgreSQL connection pools")
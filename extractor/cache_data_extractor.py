@@ -3,7 +3,15 @@ from extractor.postgres_extractor import PostgresDBExtractor
 from extractor.oracle_extractor import OracleDBExtractor
 from cache.postgres_cache import PostgresDataCache
 from cache.oracle_cache import OracleDataCache
+from queries.oracle_queries import (
+    extract_pdm_max_scn_query,
+    extract_pdm_changed_userids_query,
+    extract_pdm_records_for_user_ids_query,
+)
+from datetime import datetime, timedelta, timezone
 import pandas as pd
+import json
+import os
 
 logger = get_logger('data_extraction')
 
@@ -11,7 +19,16 @@ logger = get_logger('data_extraction')
 class CacheDataExtractor:
     """
     Class to extract data from PostgreSQL and Oracle databases and cache them.
+
+    In incremental mode the PDM query is only run for users whose PDM row (or one of their
+    managers' or direct reports' rows) changed since the last run, using ORA_ROWSCN as the
+    watermark, and the result is merged into the cached pdm_data_df by userid. A full extraction
+    still runs when there is no watermark or cached snapshot, every
+    full_reconciliation_interval_hours, and after full_reconciliation_every_runs incremental runs:
+    ORA_ROWSCN cannot see deleted rows, so users deleted from PDM (or losing their qualification
+    through a row that moved away from them) stay in the snapshot until the next full extraction.
     """
+    STATE_FILE = "./cache/oracle_data/_pdm_extraction_state.json"
 
     def __init__(
             self,
@@ -21,6 +38,12 @@ class CacheDataExtractor:
             extract_ec_records_query: str,
             extract_jobs_titles_records_query: str,
             extract_different_userid_personid_query: str,
+            incremental: bool = False,
+            full_reconciliation_interval_hours: int = 24,
+            full_reconciliation_every_runs: int = 12,
+            extract_pdm_max_scn_query: str = extract_pdm_max_scn_query,
+            extract_pdm_changed_userids_query: str = extract_pdm_changed_userids_query,
+            extract_pdm_records_for_user_ids_query: str = extract_pdm_records_for_user_ids_query,
             ):
         self.postgres_extractor = postgres_extractor
         self.oracle_extractor = oracle_extractor
@@ -28,6 +51,113 @@ class CacheDataExtractor:
         self.extract_jobs_titles_records_query = extract_jobs_titles_records_query
         self.extract_different_userid_personid_query = extract_different_userid_personid_query
         self.extract_pdm_records_query = extract_pdm_records_query
+        self.incremental = incremental
+        self.full_reconciliation_interval = timedelta(hours=full_reconciliation_interval_hours)
+        # Incremental runs allowed between two full extractions (None: only the time interval applies)
+        self.full_reconciliation_every_runs = full_reconciliation_every_runs
+        self.extract_pdm_max_scn_query = extract_pdm_max_scn_query
+        self.extract_pdm_changed_userids_query = extract_pdm_changed_userids_query
+        self.extract_pdm_records_for_user_ids_query = extract_pdm_records_for_user_ids_query
+        # Watermark to store once pdm_data_df has been cached: (scn, full_refresh)
+        self._pending_pdm_state = None
+
+    def _load_pdm_state(self) -> dict:
+        try:
+            with open(self.STATE_FILE, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Unreadable PDM extraction state, running a full extraction: {e}")
+            return {}
+
+    def _save_pdm_state(self, scn: int, full_refresh: bool):
+        state = self._load_pdm_state()
+        state['scn'] = scn
+        if full_refresh:
+            state['last_full_refresh'] = datetime.now(timezone.utc).isoformat()
+            state['incremental_runs'] = 0
+        else:
+            state['incremental_runs'] = state.get('incremental_runs', 0) + 1
+        os.makedirs(os.path.dirname(self.STATE_FILE), exist_ok=True)
+        with open(self.STATE_FILE, 'w') as f:
+            json.dump(state, f, indent=2)
+
+    def _current_pdm_scn(self):
+        """
+        Returns the highest ORA_ROWSCN of the PDM table, or None if it cannot be read.
+        Read before the extraction so rows committed meanwhile are picked up by the next run.
+        """
+        try:
+            scn_data, _ = self.oracle_extractor.extract_data(self.extract_pdm_max_scn_query)
+            return int(scn_data[0][0]) if scn_data and scn_data[0][0] is not None else None
+        except Exception as e:
+            logger.warning(f"Could not read the PDM change watermark, incremental extraction disabled: {e}")
+            return None
+
+    def _extract_pdm_data_incremental(self, scn: int) -> pd.DataFrame:
+        """
+        Re-extracts the PDM rows of users changed since the stored watermark and merges them
+        into the cached pdm_data_df. Changed users missing from the result no longer qualify
+        and are removed.
+
+        Returns:
+            The merged DataFrame, or None when a full extraction is needed.
+        """
+        state = self._load_pdm_state()
+        if 'scn' not in state or 'last_full_refresh' not in state:
+            logger.info("No PDM extraction watermark found, running a full extraction.")
+            return None
+        last_full_refresh = datetime.fromisoformat(state['last_full_refresh'])
+        if datetime.now(timezone.utc) - last_full_refresh >= self.full_reconciliation_interval:
+            logger.info("PDM full reconciliation is due, running a full extraction.")
+            return None
+        if self.full_reconciliation_every_runs and state.get('incremental_runs', 0) >= self.full_reconciliation_every_runs:
+            logger.info(
+                f"{state['incremental_runs']} incremental PDM runs since the last full extraction, "
+                "running a full extraction."
+            )
+            return None
+        cached_pdm_data = OracleDataCache().get('pdm_data_df')
+        if cached_pdm_data is None:
+            logger.info("No cached PDM snapshot found, running a full extraction.")
+            return None
+
+        changed_data, _ = self.oracle_extractor.extract_data(
+            self.extract_pdm_changed_userids_query.format(since_scn=int(state['scn']))
+        )
+        changed_user_ids = sorted({str(row[0]) for row in changed_data if row[0] is not None})
+        logger.info(f"{len(changed_user_ids)} PDM users changed since SCN {state['scn']}.")
+        if not changed_user_ids:
+            return cached_pdm_data
+
+        pd_delta_data = self.oracle_extractor.extract_data_for_user_ids(
+            self.extract_pdm_records_for_user_ids_query, changed_user_ids
+        )
+        unchanged = cached_pdm_data[~cached_pdm_data['userid'].astype(str).isin(changed_user_ids)]
+        merged = pd.concat([unchanged, pd_delta_data], ignore_index=True)
+        logger.info(
+            f"Merged {len(pd_delta_data)} changed PDM rows: {len(cached_pdm_data)} -> {len(merged)} rows "
+            f"({len(cached_pdm_data) - len(unchanged)} replaced or removed)."
+        )
+        return merged
+
+    def _extract_pdm_data(self) -> pd.DataFrame:
+        """
+        Extracts the PDM data, incrementally when possible.
+        """
+        scn = self._current_pdm_scn() if self.incremental else None
+        if scn is not None:
+            pd_pdm_data = self._extract_pdm_data_incremental(scn)
+            if pd_pdm_data is not None:
+                self._pending_pdm_state = (scn, False)
+                return pd_pdm_data
+
+        pd_pdm_data = self.oracle_extractor.extract_dataframe(self.extract_pdm_records_query)
+        logger.info(f"Extracted {len(pd_pdm_data)} records from Oracle Database.")
+        if scn is not None:
+            self._pending_pdm_state = (scn, True)
+        return pd_pdm_data
         
 
     def extract_and_cache_data(self):
@@ -36,33 +166,25 @@ class CacheDataExtractor:
         """
         
         postgres_extractor = self.postgres_extractor
-        oracle_extractor = self.oracle_extractor
         logger.info("Starting data extraction from PostgreSQL Database.")
-        # Extact EC columns and data
-        ec_data, ec_columns = postgres_extractor.extract_data(self.extract_ec_records_query)
-        logger.info(f"Extracted {len(ec_data)} records from PostgreSQL Database.")
+        # Extact EC columns and data (streamed straight into DataFrames, lowercase columns)
+        pd_ec_data = postgres_extractor.extract_dataframe(self.extract_ec_records_query)
+        logger.info(f"Extracted {len(pd_ec_data)} records from PostgreSQL Database.")
         # Extact Job Titles columns and data
-        jobs_titles_data, jobs_titles_columns = postgres_extractor.extract_data(self.extract_jobs_titles_records_query)
-        logger.info(f"Extracted {len(jobs_titles_data)} records from PostgreSQL Database (Job Titles).")
+        pd_jobs_titles_data = postgres_extractor.extract_dataframe(self.extract_jobs_titles_records_query)
+        logger.info(f"Extracted {len(pd_jobs_titles_data)} records from PostgreSQL Database (Job Titles).")
         # Extract employee having different USERID and PERSON_ID_EXTERNAL
-        different_userid_personid_data, different_userid_personid_columns = postgres_extractor.extract_data(self.extract_different_userid_personid_query)
-        logger.info(f"Extracted {len(different_userid_personid_data)} records with different USERID and PERSON_ID_EXTERNAL from PostgreSQL Database.")
+        pd_different_userid_personid_data = postgres_extractor.extract_dataframe(self.extract_different_userid_personid_query)
+        logger.info(f"Extracted {len(pd_different_userid_personid_data)} records with different USERID and PERSON_ID_EXTERNAL from PostgreSQL Database.")
         # Extract PDM columns and data
-        pdm_data, pdm_columns = oracle_extractor.extract_data(self.extract_pdm_records_query)
-        logger.info(f"Extracted {len(pdm_data)} records from Oracle Database.")
+        pd_pdm_data = self._extract_pdm_data()
 
-        # Create DataFrames with column names and normalize to lowercase
-        pd_ec_data = pd.DataFrame(ec_data, columns=[col.lower() for col in ec_columns])
-        pd_pdm_data = pd.DataFrame(pdm_data, columns=[col.lower() for col in pdm_columns])
-        
         dates_columns = ['date_of_birth', 'date_of_position', 'hiredate']
         for date_col in dates_columns:
             if date_col in pd_ec_data.columns:
                 # Replace dashes with slashes only for non-null values (preserve NULL as None/NaN)
                 pd_ec_data[date_col] = pd_ec_data[date_col].apply(lambda x: x.replace('-', '/') if pd.notna(x) and x is not None else x)
         
-        pd_jobs_titles_data = pd.DataFrame(jobs_titles_data, columns=[col.lower() for col in jobs_titles_columns])
-        pd_different_userid_personid_data = pd.DataFrame(different_userid_personid_data, columns=[col.lower() for col in different_userid_personid_columns])
         postgres_cache = PostgresDataCache()
         oracle_cache = OracleDataCache()
 
@@ -71,6 +193,9 @@ class CacheDataExtractor:
         postgres_cache.set('jobs_titles_data_df', pd_jobs_titles_data)
         postgres_cache.set('different_userid_personid_data_df', pd_different_userid_personid_data)
         oracle_cache.set('pdm_data_df', pd_pdm_data)
+        if self._pending_pdm_state is not None:
+            self._save_pdm_state(*self._pending_pdm_state)
+            self._pending_pdm_state = None
 
 
         logger.info("Data extraction completed successfully.")
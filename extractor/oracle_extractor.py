@@ -1,5 +1,7 @@
 from utils.logger import get_logger
 from db.oracle_connection import OracleDatabaseConnection
+from utils.cursor_streaming import fetch_dataframe
+import pandas as pd
 
 logger = get_logger('oracledb_extractor')
 
@@ -8,8 +10,9 @@ class OracleDBExtractor:
     Extractor class for Oracle Database.
     """
 
-    def __init__(self, oracle_dsn: dict):
+    def __init__(self, oracle_dsn: dict, fetch_batch_size: int = 10000):
         self.oracle_connection = OracleDatabaseConnection(oracle_dsn)
+        self.fetch_batch_size = fetch_batch_size
 
     def extract_data(self, query: str):
         """
@@ -39,4 +42,80 @@ class OracleDBExtractor:
             if cursor:
                 cursor.close()
             if connection:
-                connection.close()
\ No newline at end of file
+                connection.close()
+
+    def extract_dataframe(self, query: str) -> pd.DataFrame:
+        """
+        Extracts data from Oracle Database into a DataFrame, streaming the rows with fetchmany().
+        arraysize/prefetchrows are set to the batch size so each fetchmany() is one round trip.
+
+        Args:
+            query (str): SQL query to execute.
+
+        Returns:
+            pd.DataFrame: Query results with lowercase column names
+        """
+        connection = None
+        cursor = None
+
+        try:
+            connection = self.oracle_connection.get_oracle_db_connection()
+            cursor = connection.cursor()
+            cursor.arraysize = self.fetch_batch_size
+            cursor.prefetchrows = self.fetch_batch_size + 1
+            cursor.execute(query)
+            df = fetch_dataframe(cursor, self.fetch_batch_size)
+            logger.info(f"Data extracted successfully from Oracle Database: {len(df)} rows.")
+            return df
+        except Exception as e:
+            logger.error(f"Error extracting data from Oracle Database: {e}")
+            raise e
+        finally:
+            if cursor:
+                cursor.close()
+            if connection:
+                connection.close()
+
+    def extract_data_for_user_ids(self, query: str, user_ids: list, bind_name: str = 'user_ids', batch_size: int = 32767) -> pd.DataFrame:
+        """
+        Runs a query restricted to the given users, streaming the rows like extract_dataframe().
+        The ids are bound as one SYS.ODCIVARCHAR2LIST collection that the query reads with
+        TABLE(:<bind_name>), so the filter is applied inside the query (see
+        extract_pdm_records_for_user_ids_query) and the query runs once instead of once per
+        1000 ids. Only id lists longer than the collection limit (32767) are split.
+
+        Args:
+            query (str): SQL query filtering its rows on TABLE(:<bind_name>).
+            user_ids (list): User ids to keep.
+            bind_name (str): Name of the collection bind variable in the query.
+            batch_size (int): Maximum number of user ids per execution.
+
+        Returns:
+            pd.DataFrame: Query results with lowercase column names
+        """
+        connection = None
+        cursor = None
+
+        try:
+            connection = self.oracle_connection.get_oracle_db_connection()
+            id_list_type = connection.gettype("SYS.ODCIVARCHAR2LIST")
+            cursor = connection.cursor()
+            cursor.arraysize = self.fetch_batch_size
+            cursor.prefetchrows = self.fetch_batch_size + 1
+            frames = []
+            for i in range(0, len(user_ids), batch_size):
+                # Bind variables: ids are never interpolated into the SQL text
+                id_list = id_list_type.newobject([str(uid) for uid in user_ids[i:i + batch_size]])
+                cursor.execute(query, {bind_name: id_list})
+                frames.append(fetch_dataframe(cursor, self.fetch_batch_size))
+            df = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+            logger.info(f"Data extracted successfully from Oracle Database for {len(user_ids)} users: {len(df)} rows.")
+            return df
+        except Exception as e:
+            logger.error(f"Error extracting data for user ids from Oracle Database: {e}")
+            raise e
+        finally:
+            if cursor:
+                cursor.close()
+            if connection:
+                connection.close()
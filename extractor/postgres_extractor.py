@@ -1,5 +1,8 @@
 from utils.logger import get_logger
 from db.psycopg2_connection import Psycopg2DatabaseConnection
+from utils.cursor_streaming import fetch_dataframe
+import pandas as pd
+import uuid
 
 logger = get_logger('postgresdb_extractor')
 
@@ -7,8 +10,9 @@ class PostgresDBExtractor:
     """
     Extractor class for PostgreSQL Database.
     """
-    def __init__(self, postgres_url: dict):
+    def __init__(self, postgres_url: dict, fetch_batch_size: int = 10000):
         self.postgres_connection = Psycopg2DatabaseConnection(postgres_url)
+        self.fetch_batch_size = fetch_batch_size
     def extract_data(self, query: str):
         """
         Extracts data from PostgreSQL Database based on the provided SQL query.
@@ -33,4 +37,34 @@ class PostgresDBExtractor:
             if cursor:
                 cursor.close()
             if connection:
-                connection.close()
\ No newline at end of file
+                connection.close()
+
+    def extract_dataframe(self, query: str) -> pd.DataFrame:
+        """
+        Extracts data from PostgreSQL Database into a DataFrame through a server-side (named)
+        cursor, so rows are streamed in fetch_batch_size batches instead of being buffered client-side.
+
+        Args:
+            query (str): SQL query to execute.
+        Returns:
+            pd.DataFrame: Query results with lowercase column names
+        """
+        connection = None
+        cursor = None
+
+        try:
+            connection = self.postgres_connection.get_postgres_db_connection()
+            cursor = connection.cursor(name=f"extract_{uuid.uuid4().hex}")
+            cursor.itersize = self.fetch_batch_size
+            cursor.execute(query)
+            df = fetch_dataframe(cursor, self.fetch_batch_size)
+            logger.info(f"Data extracted successfully from PostgreSQL Database: {len(df)} rows.")
+            return df
+        except Exception as e:
+            logger.error(f"Error extracting data from PostgreSQL Database: {e}")
+            raise e
+        finally:
+            if cursor:
+                cursor.close()
+            if connection:
+                connection.close()
@@ -1,10 +1,16 @@
 from cache.sap_cache import SAPDataCache
 from utils.logger import get_logger
-from config.sf_apis import uris_params,get_apis
+from config.sf_apis import uris_params,get_apis,entity_keys,entity_effective_fields,entity_order_by,delta_field
 from api.api_client import APIClient
 from api.auth_client import AuthAPI
 from utils.extract_params import extract_sap_params_safe
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
+from threading import Lock
 import pandas as pd
+import json
+import os
+import time
 
 Logger = get_logger('sap_data_extraction_test')
 
@@ -12,9 +18,23 @@ Logger = get_logger('sap_data_extraction_test')
 class SAPInfoCacheHandler:
     """
     Handler class to extract and cache SAP data.
+
+    In delta mode, each entity keeps a high-water mark in the extraction state file and only
+    records modified after it are fetched and merged into the cached snapshot by record
+    identity, keeping the latest effective-dated record of each identity.
+    A full refresh still runs when requested, when a snapshot or mark is missing, once
+    full_refresh_interval_hours have passed since the last one, or after
+    full_refresh_every_runs delta runs (deleted and ended records in SAP are only removed
+    from the snapshot by full refreshes).
     """
+    STATE_FILE = "_extraction_state.json"
+    # Re-read changes made shortly before the previous run started (clock skew, in-flight commits)
+    DELTA_OVERLAP = timedelta(minutes=5)
+    _state_lock = Lock()
 
-    def __init__(self,base_url: str,auth_url: str, auth_credentials: dict, max_retries: int = 5,entites: list = None):
+    def __init__(self,base_url: str,auth_url: str, auth_credentials: dict, max_retries: int = 5,entites: list = None,
+                 fetch_workers: int = 1, max_workers: int = 4, delta_mode: bool = False,
+                 full_refresh_interval_hours: int = 24, full_refresh_every_runs: int = 12):
         self.base_url = base_url
         self.auth_url = auth_url
         self.client_id = auth_credentials['client_id']
@@ -23,7 +43,18 @@ class SAPInfoCacheHandler:
         self.company_id = auth_credentials['company_id']
         self.max_retries = max_retries
         self.sap_cache = SAPDataCache()
-        self.entities = entites if entites else ['positions', 'employees', 'perPerson', 'empJobRelationships']
+        self.entities = entites if entites else [
+            'positions', 'employees', 'perPerson', 'perPersonal', 'perEmail', 'empJobRelationships'
+        ]
+        # Number of entities extracted at the same time
+        self.max_workers = max_workers
+        # > 1 fetches $skip/$top page ranges concurrently instead of following __next links
+        self.fetch_workers = fetch_workers
+        self.delta_mode = delta_mode
+        self.full_refresh_interval = timedelta(hours=full_refresh_interval_hours)
+        # Delta runs allowed between two full refreshes (None: only the time interval applies)
+        self.full_refresh_every_runs = full_refresh_every_runs
+        self._state_path = os.path.join(self.sap_cache._cache_dir, self.STATE_FILE)
 
     def _fetch_cache_sap_data(self, entity: str, api_client: APIClient) -> pd.DataFrame:
         """
@@ -32,23 +63,223 @@ class SAPInfoCacheHandler:
             entity (str): The SAP entity to fetch data for.
             api_client (APIClient): The API client to use for fetching data.
         """
-        cached_data = self.sap_cache.get(f'{entity}_df')
+        cached_data = self.sap_cache.get(f'{entity.lower()}_df')
         if cached_data is not None:
             Logger.info(f"Retrieved {entity} data from cache.")
             return cached_data
         params = uris_params[entity]
         params_dict = extract_sap_params_safe(params)
-        entity_data = api_client.fetch_all(get_apis[entity], params=params_dict)
-        entity_df = pd.DataFrame(entity_data)
+        started_at = datetime.now(timezone.utc)
+        entity_df = self._fetch_pages_to_dataframe(entity, api_client, params_dict)
         entity_df.columns = [col.lower() for col in entity_df.columns]
 
         self.sap_cache.set(f'{entity.lower()}_df', entity_df)
         Logger.info(f"Fetched and cached {len(entity_df)} records for {entity}.")
+        if self.delta_mode:
+            self._update_entity_state(entity, started_at, full_refresh=True)
+        return entity_df
+
+    def _fetch_delta_sap_data(self, entity: str, api_client: APIClient, high_water_mark: datetime) -> pd.DataFrame:
+        """
+        Fetches the records of an entity modified since its high-water mark and merges them
+        into the cached snapshot by record identity (see _latest_per_identity).
+        Args:
+            entity (str): The SAP entity to fetch data for.
+            api_client (APIClient): The API client to use for fetching data.
+            high_water_mark (datetime): Start of the previous successful extraction (UTC).
+        """
+        key = f'{entity.lower()}_df'
+        snapshot_df = self.sap_cache.get(key)
+        params_dict = extract_sap_params_safe(uris_params[entity])
+        since = (high_water_mark - self.DELTA_OVERLAP).strftime('%Y-%m-%dT%H:%M:%SZ')
+        delta_filter = f"{delta_field} gt datetimeoffset'{since}'"
+        params_dict['$filter'] = f"({params_dict['$filter']}) and {delta_filter}" if params_dict.get('$filter') else delta_filter
+
+        started_at = datetime.now(timezone.utc)
+        delta_df = self._fetch_pages_to_dataframe(entity, api_client, params_dict)
+        delta_df.columns = [col.lower() for col in delta_df.columns]
+
+        if delta_df.empty:
+            Logger.info(f"No {entity} records modified since {since}.")
+            entity_df = snapshot_df
+        else:
+            entity_df = self._latest_per_identity(entity, pd.concat([snapshot_df, delta_df], ignore_index=True))
+            self.sap_cache.set(key, entity_df)
+            Logger.info(
+                f"Merged {len(delta_df)} {entity} records modified since {since}: "
+                f"{len(snapshot_df)} -> {len(entity_df)} rows."
+            )
+        self._update_entity_state(entity, started_at, full_refresh=False)
+        return entity_df
+
+    @staticmethod
+    def _latest_per_identity(entity: str, entity_df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Keeps one record per identity (entity_keys): the latest by the effective-dating fields,
+        the later row (the delta one) on ties. Rows keep their order.
+        Args:
+            entity (str): The SAP entity of the records.
+            entity_df (pd.DataFrame): Snapshot rows followed by delta rows (lowercased columns).
+        """
+        key_columns = [col.lower() for col in entity_keys[entity]]
+        effective_columns = [
+            col.lower() for col in entity_effective_fields.get(entity, []) if col.lower() in entity_df.columns
+        ]
+        if effective_columns:
+            sort_keys = pd.DataFrame({
+                col: SAPInfoCacheHandler._effective_sort_value(entity_df[col]) for col in effective_columns
+            })
+            order = sort_keys.sort_values(effective_columns, kind='stable', na_position='first').index
+            entity_df = entity_df.loc[order]
+        latest = entity_df.drop_duplicates(subset=key_columns, keep='last')
+        return latest.sort_index().reset_index(drop=True)
+
+    @staticmethod
+    def _effective_sort_value(values: pd.Series) -> pd.Series:
+        """
+        Sortable form of an effective-dating field: /Date(ms)/ strings as milliseconds,
+        other values as numbers (seqNumber).
+        """
+        text = values.astype('string')
+        millis = text.str.extract(r'/Date\((-?\d+)', expand=False)
+        return pd.to_numeric(millis.fillna(text), errors='coerce')
+
+    def _fetch_entity(self, entity: str, api_client: APIClient) -> pd.DataFrame:
+        """
+        Fetches an entity as a delta when a high-water mark is available, in full otherwise.
+        """
+        high_water_mark = self._entity_high_water_mark(entity) if self.delta_mode else None
+        if high_water_mark is not None:
+            return self._fetch_delta_sap_data(entity, api_client, high_water_mark)
+        return self._fetch_cache_sap_data(entity, api_client)
+
+    def _load_state(self) -> dict:
+        try:
+            with open(self._state_path, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            Logger.warning(f"Unreadable extraction state {self._state_path}, doing a full refresh: {e}")
+            return {}
+
+    def _update_entity_state(self, entity: str, started_at: datetime, full_refresh: bool):
+        with SAPInfoCacheHandler._state_lock:
+            state = self._load_state()
+            entity_state = state.setdefault(entity, {})
+            entity_state['high_water_mark'] = started_at.isoformat()
+            if full_refresh:
+                entity_state['last_full_refresh'] = started_at.isoformat()
+                entity_state['delta_runs'] = 0
+            else:
+                entity_state['delta_runs'] = entity_state.get('delta_runs', 0) + 1
+            os.makedirs(os.path.dirname(self._state_path), exist_ok=True)
+            with open(self._state_path, 'w') as f:
+                json.dump(state, f, indent=2)
+
+    def _clear_state(self):
+        with SAPInfoCacheHandler._state_lock:
+            if os.path.exists(self._state_path):
+                os.remove(self._state_path)
+
+    def _entity_high_water_mark(self, entity: str):
+        """
+        Returns the entity high-water mark, or None when the entity needs a full refresh.
+        """
+        entity_state = self._load_state().get(entity, {})
+        if 'high_water_mark' not in entity_state or 'last_full_refresh' not in entity_state:
+            return None
+        if not self.sap_cache.exists(f'{entity.lower()}_df'):
+            return None
+        last_full_refresh = datetime.fromisoformat(entity_state['last_full_refresh'])
+        if datetime.now(timezone.utc) - last_full_refresh >= self.full_refresh_interval:
+            return None
+        if self.full_refresh_every_runs and entity_state.get('delta_runs', 0) >= self.full_refresh_every_runs:
+            return None
+        return datetime.fromisoformat(entity_state['high_water_mark'])
+
+    def _needs_full_refresh(self, entities: list) -> bool:
+        return not self.delta_mode or any(self._entity_high_water_mark(entity) is None for entity in entities)
 
+    def _timed_fetch_cache_sap_data(self, entity: str, api_client: APIClient) -> tuple:
+        """
+        Runs _fetch_cache_sap_data and returns (row count, elapsed seconds) for the extraction summary.
+        """
+        start = time.perf_counter()
+        entity_df = self._fetch_entity(entity, api_client)
+        elapsed = time.perf_counter() - start
+        rows = len(entity_df) if entity_df is not None else 0
+        Logger.info(f"Extracted {entity}: {rows} rows in {elapsed:.1f}s")
+        return rows, elapsed
+
+    def _fetch_entities_concurrently(self, entities: list, api_client: APIClient):
+        """
+        Fetches the given entities on a bounded worker pool sharing one API client
+        (one authenticated session and the process-wide rate limiter), then logs a
+        per-entity timing summary.
+        Args:
+            entities (list): The SAP entities to fetch.
+            api_client (APIClient): The API client to use for fetching data.
+        """
+        timings = {}
+        errors = {}
+        workers = max(1, min(self.max_workers, len(entities)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="sap-extract") as executor:
+            futures = {
+                executor.submit(self._timed_fetch_cache_sap_data, entity, api_client): entity
+                for entity in entities
+            }
+            for future in as_completed(futures):
+                entity = futures[future]
+                try:
+                    timings[entity] = future.result()
+                except Exception as e:
+                    Logger.error(f"Extraction of {entity} failed: {e}", exc_info=True)
+                    errors[entity] = e
 
-    def extract_and_cache_sap_data(self,position_flag: bool = False,empjob_flag: bool = False):
+        for entity, (rows, elapsed) in sorted(timings.items(), key=lambda item: item[1][1], reverse=True):
+            Logger.info(f"SAP extraction summary - {entity}: {rows} rows, {elapsed:.1f}s")
+        if errors:
+            raise RuntimeError(f"SAP extraction failed for: {', '.join(errors)}")
+
+
+    def _fetch_pages_to_dataframe(self, entity: str, api_client: APIClient, params_dict: dict) -> pd.DataFrame:
+        """
+        Streams the pages of an entity into a columnar buffer: each page is turned into a
+        DataFrame as it arrives, so the raw JSON records never pile up for the whole extract.
+        Args:
+            entity (str): The SAP entity to fetch data for.
+            api_client (APIClient): The API client to use for fetching data.
+            params_dict (dict): OData query parameters.
+        """
+        if self.fetch_workers > 1:
+            # $skip pages are only consistent over a stable order
+            params_dict = {**params_dict, '$orderby': entity_order_by[entity]}
+            pages = api_client.iter_pages_partitioned(get_apis[entity], params=params_dict, max_workers=self.fetch_workers)
+        else:
+            pages = api_client.iter_pages(get_apis[entity], params=params_dict)
+
+        page_frames = []
+        try:
+            for page in pages:
+                if page:
+                    page_frames.append(pd.DataFrame(page))
+        except Exception as e:
+            Logger.error(f"Error fetching all pages for {entity}: {e}")
+            if self.delta_mode:
+                # Caching a partial extract would advance the high-water mark past missing records
+                raise
+            return pd.DataFrame()
+
+        if not page_frames:
+            return pd.DataFrame()
+        return pd.concat(page_frames, ignore_index=True)
+
+    def extract_and_cache_sap_data(self,position_flag: bool = False,empjob_flag: bool = False,full_refresh: bool = False):
         """
         Extracts SAP data using the API client and caches it.
+        In delta mode only changed records are fetched, unless full_refresh is set or one of the
+        entities is due for a full refresh.
         """
         # Initialize Auth API URL
         auth_url_ = f"{self.base_url}{self.auth_url}"
@@ -65,16 +296,25 @@ class SAPInfoCacheHandler:
         token = auth_api.get_token()
         api_client = APIClient(base_url=self.base_url, token={'access_token': token},max_retries=self.max_retries)
         
-        #Clear cache before fetching new data
-        self.sap_cache.reset_singleton()
-
-        #Remove Parquet files to reset cache state
-        self.sap_cache.clear_parquet_cache()
-        
         if position_flag:
-            self._fetch_cache_sap_data('positions', api_client)
+            entities = ['positions']
         elif empjob_flag:
-            self._fetch_cache_sap_data('employees', api_client)
+            entities = ['employees']
+        else:
+            entities = self.entities
+
+        #Clear cache before fetching new data (cache snapshots are reloaded on demand)
+        self.sap_cache.reset_singleton()
+
+        if full_refresh or self._needs_full_refresh(entities):
+            Logger.info("Running a full SAP extraction")
+            #Remove cache files to reset cache state
+            self.sap_cache.clear_cache_files()
+            self._clear_state()
+        else:
+            Logger.info("Running a delta SAP extraction")
+
+        if len(entities) == 1:
+            self._fetch_entity(entities[0], api_client)
         else:
-            for entity in self.entities:
-                self._fetch_cache_sap_data(entity, api_client)
+            self._fetch_entities_concurrently(entities, api_client)
@@ -0,0 +1,78 @@
+from utils.logger import get_logger
+from queue import Queue
+from threading import Thread
+from typing import Callable
+
+logger = get_logger('background_writer')
+
+
+class BackgroundWriter:
+    """
+    Runs a write function on chunks in a worker thread so producers keep generating
+    while the previous chunk is written.
+
+    The queue is bounded (max_pending chunks): a producer faster than the database blocks
+    instead of buffering without limit. The first write error stops the worker; it is
+    re-raised by the next submit(), flush() or close().
+
+    Args:
+        write_fn (Callable[[list], object]): Function persisting one chunk
+        max_pending (int): Chunks that may wait in the queue. Defaults to 2.
+        name (str): Worker thread name
+    """
+    _STOP = object()
+
+    def __init__(self, write_fn: Callable[[list], object], max_pending: int = 2, name: str = "background-writer"):
+        self._write_fn = write_fn
+        self._queue = Queue(maxsize=max_pending)
+        self._error = None
+        self._written_chunks = 0
+        self._thread = Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            chunk = self._queue.get()
+            try:
+                if chunk is self._STOP:
+                    return
+                if self._error is None:
+                    self._write_fn(chunk)
+                    self._written_chunks += 1
+            except Exception as e:
+                logger.error(f"Background write failed: {e}")
+                self._error = e
+            finally:
+                self._queue.task_done()
+
+    def _raise_if_failed(self):
+        if self._error is not None:
+            raise self._error
+
+    def submit(self, chunk: list):
+        """Queue a chunk for writing. Blocks while max_pending chunks are already waiting."""
+        self._raise_if_failed()
+        self._queue.put(chunk)
+
+    def flush(self):
+        """Wait until every queued chunk is written (the worker keeps running)."""
+        self._queue.join()
+        self._raise_if_failed()
+
+    def close(self):
+        """Wait until every queued chunk is written and stop the worker."""
+        self._queue.put(self._STOP)
+        self._thread.join()
+        logger.info(f"Background writer finished: {self._written_chunks} chunks written.")
+        self._raise_if_failed()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            # Producer failed: still drain and stop the worker, keep the original exception
+            self._queue.put(self._STOP)
+            self._thread.join()
@@ -1,15 +1,22 @@
 from utils.logger import get_logger
 from psycopg2.extras import execute_values
+from loader.copy_loader import LOAD_METHODS, copy_merge
+import time
 
 logger = get_logger('bulk_insert_employee_field_changes')
 
 class BulkInsertEmployeeFieldChanges:
     """
     Loader class for bulk inserting employee field changes into PostgreSQL.
+    load_method selects the bulk path: 'insert' (execute_values) or 'copy' (COPY into a
+    staging table + one INSERT ... SELECT ... ON CONFLICT, for large migration batches).
     """
-    def __init__(self, postgres_connector, table_names: dict):
+    def __init__(self, postgres_connector, table_names: dict, load_method: str = 'insert'):
+        if load_method not in LOAD_METHODS:
+            raise ValueError(f"Unknown load_method '{load_method}', expected one of {LOAD_METHODS}")
         self.postgres_connector = postgres_connector  # Psycopg2DatabaseConnection instance
         self.table_names = table_names
+        self.load_method = load_method
 
     def bulk_insert_employee_field_changes(self, buffer: list):
         """
@@ -58,10 +65,30 @@ class BulkInsertEmployeeFieldChanges:
         try:
             connection = self.postgres_connector.get_postgres_db_connection()
             cursor = connection.cursor()
-            execute_values(cursor, insert_query, values)
+            start = time.perf_counter()
+            if self.load_method == 'copy':
+                copy_merge(
+                    cursor,
+                    self.table_names['employee_field_changes'],
+                    ['batch_id', 'userid', 'field_name', 'ec_value', 'pdm_value', 'detected_at'],
+                    values,
+                    conflict_clause="""
+                        ON CONFLICT(batch_id, userid, field_name) DO UPDATE
+                        SET ec_value = EXCLUDED.ec_value,
+                            pdm_value = EXCLUDED.pdm_value,
+                            detected_at = EXCLUDED.detected_at
+                    """,
+                    dedupe_keys=['batch_id', 'userid', 'field_name']
+                )
+            else:
+                execute_values(cursor, insert_query, values)
             inserted_count = len(values)
             connection.commit()
-            logger.info(f"Inserted {inserted_count} employee field changes.")
+            elapsed = time.perf_counter() - start
+            logger.info(
+                f"Inserted {inserted_count} employee field changes ({self.load_method}: "
+                f"{elapsed:.2f}s, {inserted_count / elapsed if elapsed else 0:.0f} rows/s)."
+            )
         except Exception as e:
             logger.error(f"Error inserting employee field changes: {e}")
             if connection:
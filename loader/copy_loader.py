@@ -0,0 +1,96 @@
+"""
+COPY-based bulk loading:
+
+Rows are streamed with COPY FROM STDIN (CSV) into a session-private staging table
+(a temporary table, hence unlogged, dropped at commit) and merged into the target with a
+single INSERT ... SELECT ... ON CONFLICT. Used by the loaders when load_method='copy'.
+
+"""
+from utils.logger import get_logger
+import pandas as pd
+import uuid
+
+logger = get_logger('copy_loader')
+
+LOAD_METHODS = ('insert', 'copy')
+
+# Unquoted marker for NULL; quoted CSV values never match it, so real strings are safe
+_CSV_NULL = '\\N'
+
+
+def _csv_field(value) -> str:
+    # Missing values (None, NaN, pd.NA, NaT) are NULL, not their 'nan' / '<NA>' text
+    if value is None or (pd.api.types.is_scalar(value) and pd.isna(value)):
+        return _CSV_NULL
+    return '"' + str(value).replace('"', '""') + '"'
+
+
+class _CsvRowStream:
+    """
+    File-like object producing CSV lines lazily for cursor.copy_expert(), so the rows are
+    never rendered into one large in-memory buffer.
+    """
+
+    def __init__(self, rows):
+        self._rows = iter(rows)
+        self._buffer = ''
+        self.row_count = 0
+
+    def read(self, size: int = -1) -> str:
+        while size < 0 or len(self._buffer) < size:
+            row = next(self._rows, None)
+            if row is None:
+                break
+            self._buffer += ','.join(_csv_field(value) for value in row) + '\n'
+            self.row_count += 1
+        if size < 0:
+            data, self._buffer = self._buffer, ''
+        else:
+            data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+
+def copy_merge(cursor, target_table: str, columns: list, rows: list, conflict_clause: str,
+               dedupe_keys: list = None) -> int:
+    """
+    Loads rows into target_table through a COPY into a staging table and one merge statement.
+    Runs in the caller's transaction; the caller commits or rolls back.
+
+    Args:
+        cursor: psycopg2 cursor
+        target_table: Fully qualified target table name
+        columns: Target columns, aligned with the row tuples
+        rows: Iterable of row tuples
+        conflict_clause: ON CONFLICT clause of the merge (e.g. "ON CONFLICT (...) DO NOTHING")
+        dedupe_keys: Keep only the last staged row per key (required by ON CONFLICT DO UPDATE,
+            which cannot touch the same target row twice in one statement)
+
+    Returns:
+        int: Number of rows staged
+    """
+    staging_table = f"stg_{uuid.uuid4().hex[:16]}"
+    column_list = ', '.join(columns)
+
+    cursor.execute(
+        f"CREATE TEMP TABLE {staging_table} ON COMMIT DROP AS "
+        f"SELECT {column_list} FROM {target_table} WITH NO DATA"
+    )
+    row_stream = _CsvRowStream(rows)
+    cursor.copy_expert(
+        f"COPY {staging_table} ({column_list}) FROM STDIN WITH (FORMAT csv, NULL '{_CSV_NULL}')",
+        row_stream
+    )
+    staged_count = row_stream.row_count
+
+    if dedupe_keys:
+        key_list = ', '.join(dedupe_keys)
+        select_query = (
+            f"SELECT DISTINCT ON ({key_list}) {column_list} FROM {staging_table} "
+            f"ORDER BY {key_list}, ctid DESC"
+        )
+    else:
+        select_query = f"SELECT {column_list} FROM {staging_table}"
+
+    cursor.execute(f"INSERT INTO {target_table} ({column_list}) {select_query} {conflict_clause}")
+    logger.info(f"COPY-merged {staged_count} staged rows into {target_table} ({cursor.rowcount} written)")
+    return staged_count
@@ -1,9 +1,11 @@
 from utils.logger import get_logger
 from psycopg2.extras import execute_values
+from loader.copy_loader import LOAD_METHODS, copy_merge
 from datetime import datetime
 from typing import Dict, List, Optional
 import uuid
 import json
+import time
 
 logger = get_logger('pipeline_history_loader')
 
@@ -12,7 +14,7 @@ class PipelineHistoryLoader:
     Loader class for pipeline execution history tracking.
     Handles pipeline_run_summary and user_sync_results tables.
     """
-    def __init__(self, postgres_connector,table_names: Dict):
+    def __init__(self, postgres_connector,table_names: Dict, load_method: str = 'insert'):
         """
         Initializes the PipelineHistoryLoader with a Postgres connector and table names.
         Args:
@@ -22,7 +24,12 @@ class PipelineHistoryLoader:
                     "pipeline_run_summary": "pdm_test.pipeline_run_summary",
                     "user_sync_results": "pdm_test.user_sync_results"
                 }
+            load_method (str): Bulk path for bulk_insert_results, 'insert' (execute_values)
+                or 'copy' (COPY into a staging table + one INSERT ... SELECT ... ON CONFLICT)
         """
+        if load_method not in LOAD_METHODS:
+            raise ValueError(f"Unknown load_method '{load_method}', expected one of {LOAD_METHODS}")
+        self.load_method = load_method
         self.postgres_connector = postgres_connector
         self.run_id = None
         self.table_names = table_names
@@ -251,9 +258,27 @@ class PipelineHistoryLoader:
         try:
             connection = self.postgres_connector.get_postgres_db_connection()
             cursor = connection.cursor()
-            execute_values(cursor, insert_query, values)
+            start = time.perf_counter()
+            if self.load_method == 'copy':
+                copy_merge(
+                    cursor,
+                    self.table_names['user_sync_results'],
+                    [
+                        'run_id', 'user_id', 'operation', 'status', 'error_message', 'warning_message',
+                        'success_message', 'payload_snapshot', 'failed_entities', 'success_entities',
+                        'skipped_entities'
+                    ],
+                    values,
+                    conflict_clause="ON CONFLICT (run_id, user_id, operation, created_at) DO NOTHING"
+                )
+            else:
+                execute_values(cursor, insert_query, values)
             connection.commit()
-            logger.info(f"Inserted {len(unique_results)} result records")
+            elapsed = time.perf_counter() - start
+            logger.info(
+                f"Inserted {len(unique_results)} result records ({self.load_method}: "
+                f"{elapsed:.2f}s, {len(unique_results) / elapsed if elapsed else 0:.0f} rows/s)"
+            )
         except Exception as e:
             logger.error(f"Failed to insert result records: {e}")
             if connection:
@@ -1,7 +1,12 @@
 """
 Country code mapping utilities for SuccessFactors integration.
 Handles ISO2 to ISO3 conversions and phone number country detection.
+Phone numbers are normalized one at a time by the PerPhone builders; the per-number cache of
+normalize_phone() means a number repeated across users is still parsed once.
 """
+from functools import lru_cache
+from typing import NamedTuple, Optional
+import pandas as pd
 import pycountry
 import phonenumbers
 from utils.logger import get_logger
@@ -9,6 +14,14 @@ from utils.logger import get_logger
 logger = get_logger('country_mapper')
 
 
+class PhoneNumberInfo(NamedTuple):
+    """Fields derived from one phonenumbers.parse() of a phone number."""
+    country_code: str              # Calling code with '+' prefix (e.g. '+1')
+    region_code: str               # ISO2 region of the calling code (e.g. 'US')
+    iso3: Optional[str]            # 3-letter ISO code of the region (e.g. 'USA')
+    national_number: str           # Number without the country code
+
+
 def get_iso3_numeric(iso2):
     """
     Convert a 2-letter ISO country code to a 3-letter code using pycountry.
@@ -27,7 +40,12 @@ def get_iso3_numeric(iso2):
     """
     if not iso2:
         return None
-    
+    if isinstance(iso2, str):
+        return _cached_iso3(iso2)
+    return _lookup_iso3(iso2)
+
+
+def _lookup_iso3(iso2):
     try:
         country = pycountry.countries.get(alpha_2=iso2)
         return country.alpha_3 if country else None
@@ -36,6 +54,68 @@ def get_iso3_numeric(iso2):
         return None
 
 
+@lru_cache(maxsize=1024)
+def _cached_iso3(iso2: str):
+    # A few hundred country codes: every distinct code hits pycountry once per process
+    return _lookup_iso3(iso2)
+
+
+def get_iso3_numeric_column(iso2_codes: pd.Series) -> pd.Series:
+    """
+    Column version of get_iso3_numeric: converts each distinct code once.
+
+    Args:
+        iso2_codes (pd.Series): 2-letter ISO country codes
+
+    Returns:
+        pd.Series: 3-letter ISO country codes (missing where not found)
+    """
+    return iso2_codes.map(_map_distinct(iso2_codes, get_iso3_numeric))
+
+
+def _map_distinct(values: pd.Series, func) -> dict:
+    """{value: func(value)} over the distinct non-missing values of a Series."""
+    return {value: func(value) for value in values.dropna().unique()}
+
+
+def normalize_phone(phone_number) -> Optional[PhoneNumberInfo]:
+    """
+    Parse a phone number once and derive its country code, region, ISO3 code and national number.
+    Results are cached per number, so the same number is never parsed twice.
+
+    Args:
+        phone_number (str): Phone number in international format (e.g., '+14155552671')
+
+    Returns:
+        PhoneNumberInfo or None if the number is empty or cannot be parsed
+    """
+    if not phone_number:
+        return None
+    if isinstance(phone_number, str):
+        return _cached_normalize_phone(phone_number)
+    return _parse_phone(phone_number)
+
+
+def _parse_phone(phone_number) -> Optional[PhoneNumberInfo]:
+    try:
+        parsed_phone = phonenumbers.parse(phone_number, None)
+        region_code = phonenumbers.region_code_for_country_code(parsed_phone.country_code)
+        return PhoneNumberInfo(
+            country_code=f"+{parsed_phone.country_code}",
+            region_code=region_code,
+            iso3=get_iso3_numeric(region_code),
+            national_number=str(parsed_phone.national_number),
+        )
+    except Exception as e:
+        logger.debug(f"Could not parse phone '{phone_number}': {e}")
+        return None
+
+
+@lru_cache(maxsize=65536)
+def _cached_normalize_phone(phone_number: str) -> Optional[PhoneNumberInfo]:
+    return _parse_phone(phone_number)
+
+
 def get_iso3_from_phone(phone_number):
     """
     Extract ISO3 country code from a phone number.
@@ -52,16 +132,8 @@ def get_iso3_from_phone(phone_number):
         >>> get_iso3_from_phone('+442071234567')
         'GBR'
     """
-    if not phone_number:
-        return None
-    
-    try:
-        parsed_phone = phonenumbers.parse(phone_number, None)
-        region_code = phonenumbers.region_code_for_country_code(parsed_phone.country_code)
-        return get_iso3_numeric(region_code)
-    except Exception as e:
-        logger.debug(f"Could not extract country from phone '{phone_number}': {e}")
-        return None
+    phone = normalize_phone(phone_number)
+    return phone.iso3 if phone else None
 
 
 def get_country_code_from_phone(phone_number):
@@ -80,15 +152,8 @@ def get_country_code_from_phone(phone_number):
         >>> get_country_code_from_phone('+442071234567')
         '+44'
     """
-    if not phone_number:
-        return None
-    
-    try:
-        parsed_phone = phonenumbers.parse(phone_number, None)
-        return f"+{parsed_phone.country_code}"
-    except Exception as e:
-        logger.debug(f"Could not extract country code from phone '{phone_number}': {e}")
-        return None
+    phone = normalize_phone(phone_number)
+    return phone.country_code if phone else None
 
 
 def get_national_number(phone_number):
@@ -105,12 +170,5 @@ def get_national_number(phone_number):
         >>> get_national_number('+14155552671')
         '4155552671'
     """
-    if not phone_number:
-        return None
-    
-    try:
-        parsed_phone = phonenumbers.parse(phone_number, None)
-        return str(parsed_phone.national_number)
-    except Exception as e:
-        logger.debug(f"Could not extract national number from phone '{phone_number}': {e}")
-        return None
+    phone = normalize_phone(phone_number)
+    return phone.national_number if phone else None
@@ -1,6 +1,5 @@
-import phonenumbers
 from utils.logger import get_logger
-from mapper.country_mapper import get_iso3_numeric
+from mapper.country_mapper import normalize_phone
 logger = get_logger('phone_mapper')
 
 def build_per_phone_payload(person_id, phone_number, phone_type):
@@ -17,15 +16,14 @@ def build_per_phone_payload(person_id, phone_number, phone_type):
     parsed_country_code = None
     iso3_code = None
     national_number = None
-    try:
-        parsed_phone = phonenumbers.parse(phone_number, None)
-        parsed_country_code = f"+{parsed_phone.country_code}"
-        region_code = phonenumbers.region_code_for_country_code(parsed_phone.country_code)
-        iso3_code = get_iso3_numeric(region_code)
-        national_number = str(parsed_phone.national_number)
-    except Exception as e:
-        logger.info(f"No valid phone data for {person_id} - {phone_number}: {e}")
+    # Parsed once per distinct number (cached)
+    phone = normalize_phone(phone_number)
+    if phone is None:
+        logger.info(f"No valid phone data for {person_id} - {phone_number}: number could not be parsed")
         return None
+    parsed_country_code = phone.country_code
+    iso3_code = phone.iso3
+    national_number = phone.national_number
     if parsed_country_code and iso3_code:
         payload = {
             "__metadata": {"uri": "PerPhone"},
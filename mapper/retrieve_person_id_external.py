@@ -1,4 +1,76 @@
 from cache.postgres_cache import PostgresDataCache
+from utils.logger import get_logger
+
+Logger = get_logger("retrieve_person_id_external")
+
+
+class UserIdMapping:
+    """
+    Bidirectional PDM PERSON_ID_EXTERNAL <-> EC USERID mapping for the users whose ids differ
+    (different_userid_personid_data_df), built once so both directions are dict lookups.
+
+    Lookups are exact, like the DataFrame filters they replace; when an id appears on several
+    rows the first row of the table wins.
+
+    Args:
+        mapping_df (pd.DataFrame): Rows with 'userid' and 'person_id_external' columns
+    """
+    CACHE_KEY = "different_userid_personid_data_df"
+
+    def __init__(self, mapping_df):
+        self._rows = []
+        self._row_by_person = {}
+        self._row_by_user = {}
+        if mapping_df is None or mapping_df.empty:
+            return
+
+        self._rows = list(zip(mapping_df["userid"].tolist(), mapping_df["person_id_external"].tolist()))
+        for position, (user_id, person_id) in enumerate(self._rows):
+            # Null ids never match an equality filter
+            if person_id is not None and person_id == person_id:
+                self._row_by_person.setdefault(person_id, position)
+            if user_id is not None and user_id == user_id:
+                self._row_by_user.setdefault(user_id, position)
+        Logger.info(f"Built userid/personid mapping: {len(self._rows)} rows")
+
+    @classmethod
+    def from_cache(cls, postgres_cache: PostgresDataCache = None) -> "UserIdMapping":
+        """
+        Returns the mapping of the cached different_userid_personid_data_df, built once and
+        dropped with the frame (PostgresDataCache.get_derived).
+
+        Args:
+            postgres_cache (PostgresDataCache): Cache to read from. Defaults to the singleton.
+        """
+        mapping = (postgres_cache or PostgresDataCache()).get_derived(cls.CACHE_KEY, "userid_mapping", cls)
+        return mapping if mapping is not None else cls(None)
+
+    def userid_for(self, person_id):
+        """EC USERID of a PDM PERSON_ID_EXTERNAL, or the person id itself if not mapped."""
+        position = self._row_by_person.get(person_id)
+        return person_id if position is None else self._rows[position][0]
+
+    def personid_for(self, user_id):
+        """PDM PERSON_ID_EXTERNAL of an EC USERID, or the user id itself if not mapped."""
+        position = self._row_by_user.get(user_id)
+        return user_id if position is None else self._rows[position][1]
+
+    def resolve(self, any_id) -> dict:
+        """
+        Both ids of a user given either of them.
+
+        Returns:
+            dict: {"userId": ..., "personIdExternal": ...}, both equal to any_id if not mapped
+        """
+        positions = [
+            position for position in (self._row_by_person.get(any_id), self._row_by_user.get(any_id))
+            if position is not None
+        ]
+        if not positions:
+            return {"userId": any_id, "personIdExternal": any_id}
+        user_id, person_id = self._rows[min(positions)]
+        return {"userId": user_id, "personIdExternal": person_id}
+
 
 def get_userid_from_personid(person_id):
         """
@@ -8,14 +80,4 @@ def get_userid_from_personid(person_id):
         Returns:
             str: The corresponding USERID if different, else the original PERSON_ID_EXTERNAL.
         """
-        postgres_cache = PostgresDataCache()
-        different_userid_personid_df =postgres_cache.get(
-            "different_userid_personid_data_df"
-        )
-        if different_userid_personid_df is not None:
-            match = different_userid_personid_df[
-                different_userid_personid_df["person_id_external"] == person_id
-            ]
-            if not match.empty:
-                return match["userid"].values[0]
-        return person_id
\ No newline at end of file
+        return UserIdMapping.from_cache().userid_for(person_id)
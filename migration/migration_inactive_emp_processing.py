@@ -46,6 +46,7 @@ from payload_builders.employment._terminate_emp import (
     EmploymentTerminationPayloadBuilder,
 )
 from migration.migration_processing import MigrationProcessor
+from config.sf_apis import max_parallel_upserts as configured_parallel_upserts
 
 import pandas as pd
 
@@ -76,6 +77,10 @@ class MigrationInactiveEmpProcessor(MigrationProcessor):
         "EmpInitLoadJob": ["Position", "PerPerson"],
         "EmpEmploymentTermination": ["EmpEmployment", "PerPerson"],
     }
+    UPSERT_ORDERING = {
+        "EmpInitLoadJob": ["EmpEmployment"],
+        "EmpEmploymentTermination": ["EmpInitLoadJob"],
+    }
 
     def __init__(
         self,
@@ -88,6 +93,7 @@ class MigrationInactiveEmpProcessor(MigrationProcessor):
         exit_events: dict,
         positions_cache_key: str = "positions_df",
         max_retries: int = 5,
+        max_parallel_upserts: int = configured_parallel_upserts,
     ):
         # Call parent's __init__
         super().__init__(
@@ -99,6 +105,7 @@ class MigrationInactiveEmpProcessor(MigrationProcessor):
             job_code=job_code,
             positions_cache_key=positions_cache_key,
             max_retries=max_retries,
+            max_parallel_upserts=max_parallel_upserts,
         )
         self.auth_api = AuthAPI(
             auth_url=auth_url,
@@ -55,6 +55,7 @@ from api.upsert_client import UpsertClient
 from cache.postgres_cache import PostgresDataCache
 from cache.oracle_cache import OracleDataCache
 from cache.sap_cache import SAPDataCache
+from cache.sap_contact_store import SAPContactStore
 from cache.employees_cache import EmployeesDataCache
 from orchestrator.core_processing import CoreProcessor
 from payload_builders.employment._employment import EmploymentPayloadBuilder
@@ -166,7 +167,7 @@ class MigrationProcessorOffline(CoreProcessor):
                 self.oracle_cache.get('pdm_data_df')['division'].str.lower() == 'human resources'
             ]['userid'].astype(str).str.lower()
         )
-        self.sap_email_data = self.sap_cache.get('peremail_df')
+        self.sap_contact_store = SAPContactStore.from_cache()
     def _create_or_get_dummy_position(self, ctx: UserExecutionContext):
         """
         Mocking the creation or retrieval of a dummy position for the user.
@@ -211,10 +212,8 @@ class MigrationProcessorOffline(CoreProcessor):
         try:
             empjob_data = self.sap_cache.get("employees_df")
             if empjob_data is not None:
-                mask = (
-                    empjob_data["userid"].astype(str).str.lower().eq(ec_user_id.lower())
-                )
-                result = empjob_data[mask & (empjob_data["position"] != dummy_position)]
+                result = self.sap_cache.lookup("employees_df", "userid", ec_user_id)
+                result = result[result["position"] != dummy_position]
 
                 return not result.empty
             return False
@@ -352,7 +351,7 @@ class MigrationProcessorOffline(CoreProcessor):
             )
 
             job_mapping = job_validator.get_job_mapping()
-            if job_mapping.empty:
+            if job_mapping is None:
                 ctx.fail(f"Job code {row['jobcode']} does not exist for user {user_id}")
                 return
 
@@ -789,7 +788,7 @@ class MigrationProcessorOffline(CoreProcessor):
                                 )
 
                                 job_mapping = job_validator.get_job_mapping()
-                                if job_mapping.empty:
+                                if job_mapping is None:
                                     Logger.error(
                                         f"Job code {row['jobcode']} does not exist for user {user_id} during Position sync"
                                     )
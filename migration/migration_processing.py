@@ -55,8 +55,10 @@ from api.upsert_client import UpsertClient
 from cache.postgres_cache import PostgresDataCache
 from cache.oracle_cache import OracleDataCache
 from cache.sap_cache import SAPDataCache
+from cache.sap_contact_store import SAPContactStore
 from cache.employees_cache import EmployeesDataCache
 from orchestrator.core_processing import CoreProcessor
+from config.sf_apis import max_parallel_upserts as configured_parallel_upserts
 from payload_builders.position._dummy_position import DummyPositionPayloadBuilder
 from payload_builders.employment._employment import EmploymentPayloadBuilder
 from payload_builders.position._position import PositionPayloadBuilder
@@ -108,6 +110,10 @@ class MigrationProcessor(CoreProcessor):
         "EmpJobRelationships": ["Position", "PerPerson"],
         "UserRole": ["PerPerson"],
     }
+    UPSERT_ORDERING = {
+        **CoreProcessor.UPSERT_ORDERING,
+        "EmpInitLoadJob": ["EmpEmployment"],
+    }
 
     def __init__(
         self,
@@ -119,6 +125,7 @@ class MigrationProcessor(CoreProcessor):
         job_code: dict,
         positions_cache_key: str = "positions_df",
         max_retries: int = 5,
+        max_parallel_upserts: int = configured_parallel_upserts,
     ):
         # Call parent's __init__
         super().__init__(
@@ -128,6 +135,7 @@ class MigrationProcessor(CoreProcessor):
             ordered_batches=ordered_batches,
             batches_summary=batches_summary,
             max_retries=max_retries,
+            max_parallel_upserts=max_parallel_upserts,
         )
         self.auth_api = AuthAPI(
             auth_url=auth_url,
@@ -167,7 +175,7 @@ class MigrationProcessor(CoreProcessor):
                 self.oracle_cache.get('pdm_data_df')['division'].str.lower() == 'human resources'
             ]['userid'].astype(str).str.lower()
         )
-        self.sap_email_data = self.sap_cache.get('peremail_df')
+        self.sap_contact_store = SAPContactStore.from_cache()
     def _create_or_get_dummy_position(self, ctx: UserExecutionContext):
         """
         Creates or retrieves a dummy position for the given country and company.
@@ -297,10 +305,8 @@ class MigrationProcessor(CoreProcessor):
         try:
             empjob_data = self.sap_cache.get("employees_df")
             if empjob_data is not None:
-                mask = (
-                    empjob_data["userid"].astype(str).str.lower().eq(ec_user_id.lower())
-                )
-                result = empjob_data[mask & (empjob_data["position"] != dummy_position)]
+                result = self.sap_cache.lookup("employees_df", "userid", ec_user_id)
+                result = result[result["position"] != dummy_position]
                 return not result.empty
             return False
         except Exception as e:
@@ -12,6 +12,7 @@ from validator.person.person_validator import PersonValidator
 from cache.postgres_cache import PostgresDataCache
 from cache.oracle_cache import OracleDataCache
 from cache.sap_cache import SAPDataCache
+from cache.sap_contact_store import SAPContactStore
 from cache.employees_cache import EmployeesDataCache
 from utils.logger import get_logger
 from mapper.retrieve_person_id_external import get_userid_from_personid
@@ -172,7 +173,9 @@ class CoreOfflineProcessor(CoreProcessor):
                 self.oracle_cache.get('pdm_data_df')['division'].str.lower() == 'human resources'
             ]['userid'].astype(str).str.lower()
         )
-        self.sap_email_data = self.sap_cache.get('peremail_df')
+        self.sap_contact_store = SAPContactStore.from_cache()
+        # Safe emails of the batch being processed (see CoreProcessor._prepare_resolved_emails)
+        self._resolved_emails = {}
 
     def _process_single_user(
         self, row: pd.Series, ctx: UserExecutionContext, results: dict
@@ -286,7 +289,7 @@ class CoreOfflineProcessor(CoreProcessor):
             )
 
             job_mapping = job_validator.get_job_mapping()
-            if job_mapping.empty:
+            if job_mapping is None:
                 ctx.fail(f"Job code {row['jobcode']} does not exist for user {user_id}")
                 return
 
@@ -400,15 +403,9 @@ class CoreOfflineProcessor(CoreProcessor):
             if employees_df is not None and not employees_df.empty:
                 # Retrieve personexternalid from get_userid_from_personid
                 ec_user_id = ctx.ec_user_id
-                # Put Mask to retrieve position for the given ec_user_id,and filter by jobcode != "T00001"
-                emp_mask = (
-                    employees_df["userid"]
-                    .astype(str)
-                    .str.lower()
-                    .eq(ec_user_id.lower())
-                ) & (employees_df["jobcode"] != "T00001")
-
-                emp_result = employees_df[emp_mask]
+                # Retrieve position for the given ec_user_id, and filter by jobcode != "T00001"
+                emp_result = self.sap_cache.lookup("employees_df", "userid", ec_user_id)
+                emp_result = emp_result[emp_result["jobcode"] != "T00001"]
                 if not emp_result.empty:
                     existing_position = emp_result["position"].values[0]
 
@@ -555,7 +552,7 @@ class CoreOfflineProcessor(CoreProcessor):
                                 )
 
                                 job_mapping = job_validator.get_job_mapping()
-                                if job_mapping.empty:
+                                if job_mapping is None:
                                     ctx.fail(
                                         f"Job code {row['jobcode']} does not exist for user {user_id} during Position sync"
                                     )
@@ -1,4 +1,5 @@
-from orchestrator.user_context import UserExecutionContext
+from orchestrator.user_context import UserExecutionContext, UserResults
+from orchestrator.user_record import ColumnarFrame
 from payload_builders.employment._employment import EmploymentPayloadBuilder
 from payload_builders.person._person import PersonPayloadBuilder
 from payload_builders.position._position import PositionPayloadBuilder
@@ -13,12 +14,17 @@ from cache.postgres_cache import PostgresDataCache
 from cache.oracle_cache import OracleDataCache
 from cache.sap_cache import SAPDataCache
 from cache.employees_cache import EmployeesDataCache
+from cache.dataframe_cache import DataFrameCache
+from cache.sap_contact_store import SAPContactStore
 from utils.logger import get_logger
+from config.sf_apis import max_parallel_upserts as configured_parallel_upserts
 from utils.date_converter import convert_to_unix_timestamp
 from mapper.retrieve_person_id_external import get_userid_from_personid
 from planning.convert_pdm_data import convert_pdm_data
 from planning.email_resolver import EmailResolver
 from payload_builders.user._user import build_user_role_payload
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from threading import RLock
 import pandas as pd
 
 
@@ -97,6 +103,22 @@ class CoreProcessor:
         "EmpJobRelationships": ["Position", "PerPerson"],
         "UserRole": ["PerPerson"],
     }
+    # Ordering SAP enforces between entity upserts on top of ENTITY_DEPENDENCIES
+    # (which only decide per user if an entity is eligible): EmpJob needs the employment,
+    # relationships and the User record need the job/employment to exist, and matrix relationships
+    # must not race the Position-to-Job sync triggered after EmpJob.
+    UPSERT_ORDERING = {
+        "EmpJob": ["EmpEmployment"],
+        "EmpJobRelationships": ["EmpJob"],
+        "PositionMatrixRelationships": ["EmpJob"],
+        "UserRole": ["EmpEmployment"],
+    }
+    # Barrier steps run after an entity upsert: (method name, entities that must also be upserted first).
+    # Entities depending on the upserted entity wait for its barrier step as well.
+    UPSERT_BARRIERS = {
+        "Position": ("_retry_position_dependent_entities", ["PerPerson"]),
+        "EmpJob": ("_execute_position_sync", []),
+    }
     DIRTY_FIELD_TO_ENTITY = {
         # Position
         "jobcode": ["Position"],
@@ -123,7 +145,6 @@ class CoreProcessor:
         "biz_phone": ["PerPhone"],
         "custom_string_8": ["UserRole"],
     }
-
     def __init__(
         self,
         auth_url: str,
@@ -132,9 +153,16 @@ class CoreProcessor:
         ordered_batches: list[pd.DataFrame],
         batches_summary: dict,
         max_retries: int = 5,
+        max_parallel_upserts: int = configured_parallel_upserts,
     ):
         self.ordered_batches = ordered_batches
+        # Number of independent entities upserted at the same time (1 = strictly EXECUTION_PLAN order)
+        self.max_parallel_upserts = max_parallel_upserts
+        # Guards the user contexts and collected payloads shared by concurrent upsert steps
+        self._results_lock = RLock()
         self.batches_summary = batches_summary
+        # Resolved (safe) emails of the batch being processed, keyed by lowercased userid
+        self._resolved_emails = {}
         self.auth_credentials = auth_credentials
         self.auth_api = AuthAPI(
             auth_url=auth_url,
@@ -174,7 +202,8 @@ class CoreProcessor:
             .astype(str)
             .str.lower()
         )
-        self.sap_email_data = self.sap_cache.get("peremail_df")
+        # SAP emails grouped per person, kept for the whole run (see SAPContactStore.from_cache)
+        self.sap_contact_store = SAPContactStore.from_cache()
 
     def process_batches_new_employees(self):
         """
@@ -189,13 +218,14 @@ class CoreProcessor:
         """
         try:
             batches = self.ordered_batches
-            results = {}
+            results = UserResults()
 
             for i, batch_df in enumerate(batches, start=1):
                 Logger.info(f"Processing batch {i} with {len(batch_df)} employees")
                 batch_user_ids = set()  # To track user_ids in the current batch
+                self._prepare_resolved_emails(batch_df)
                 # Process each user and collect payloads
-                for _, row in batch_df.iterrows():
+                for row in ColumnarFrame(batch_df):
                     user_id = row.get("userid", "Unknown")
                     if user_id in results:
                         Logger.info(
@@ -241,10 +271,14 @@ class CoreProcessor:
                 is_retry=True,
             )
 
+            DataFrameCache.log_stats()
             return results
         except Exception as e:
             Logger.error(f"Fatal error during batch processing: {e}")
             raise
+        finally:
+            # Resolved emails belong to the batches above, never reuse them in a later run
+            self._resolved_emails = {}
 
     def process_field_updates(self, field_changes_df: pd.DataFrame):
         """
@@ -269,7 +303,7 @@ class CoreProcessor:
         dirty_entities_map = self._extract_dirty_entities(field_changes_df)
         Logger.info(f"Identified {len(dirty_entities_map)} users with dirty entities")
 
-        results = {}
+        results = UserResults()
         self._reset_collected_payloads()
 
         # get user ids from dirty_entities_map
@@ -293,15 +327,17 @@ class CoreProcessor:
             Logger.error("No users found in PDM cache after filtering")
             return results
 
+        # Columnar rows with a userid -> position map, built once for all dirty users
+        users_to_process = ColumnarFrame(users_to_process_df)
+
         # Logging users not found in PDM cache
-        found_user_ids = users_to_process_df["userid"].astype(str).str.lower().tolist()
         for uid in dirty_user_ids:
-            if str(uid).lower() not in found_user_ids:
+            if users_to_process.position_of(uid) is None:
                 Logger.error(
                     f"User {uid} not found in PDM cache for updates processing"
                 )
         Logger.info(
-            f"Number of users found in PDM cache for updates processing: {len(found_user_ids)} out of {len(dirty_user_ids)}"
+            f"Number of users found in PDM cache for updates processing: {len(users_to_process)} out of {len(dirty_user_ids)}"
         )
 
         for user_id, entities_info in dirty_entities_map.items():
@@ -321,18 +357,13 @@ class CoreProcessor:
             }
 
             # Find user in PDM data
-            user_mask = (
-                users_to_process_df["userid"].astype(str).str.lower()
-                == str(user_id).lower()
-            )
-            user_rows = users_to_process_df[user_mask]
+            row = users_to_process.find(user_id)
 
-            if user_rows.empty:
+            if row is None:
                 ctx.fail(f"No data found for user {user_id} in PDM cache")
                 results[user_id] = ctx
                 continue
 
-            row = user_rows.iloc[0]
             ctx.is_scm = row.get("is_peoplehub_scm_manually_included", "N") == "Y"
             ctx.is_im = row.get("is_peoplehub_im_manually_included", "N") == "Y"
 
@@ -365,6 +396,7 @@ class CoreProcessor:
         Logger.info(f"Executing batch upserts for {len(results)} users")
         self._execute_batch_upserts(results=results, batch_user_ids=batch_user_ids)
 
+        DataFrameCache.log_stats()
         return results
 
     def _can_execute_entity(self, ctx: UserExecutionContext, entity_name: str) -> bool:
@@ -512,7 +544,7 @@ class CoreProcessor:
             )
 
             job_mapping = job_validator.get_job_mapping()
-            if job_mapping.empty:
+            if job_mapping is None:
                 ctx.fail(f"Job code {row['jobcode']} does not exist for user {user_id}")
                 return
 
@@ -591,14 +623,34 @@ class CoreProcessor:
             Logger.error(error_msg, exc_info=True)
             ctx.fail(error_msg)
 
+    def _prepare_resolved_emails(self, users_df: pd.DataFrame):
+        """
+        Resolves the safe emails of a whole batch at once (EmailResolver.resolve_emails);
+        _resolve_and_update_emails then only looks them up. The previous batch's emails are
+        dropped first.
+        """
+        self._resolved_emails = {}
+        try:
+            resolved = EmailResolver().resolve_emails(
+                users_df, self.hr_global_users, self.sap_contact_store
+            )
+            self._resolved_emails = resolved[
+                ~resolved.index.duplicated(keep="first")
+            ].to_dict("index")
+        except Exception as e:
+            # Users are then resolved one by one
+            Logger.warning(f"Batch email resolution failed, resolving per user: {e}")
+
     def _resolve_and_update_emails(self, row, ctx, user_id):
-        email_resolver = EmailResolver()
-        resolved = email_resolver.resolve_user_email(
-            userid=user_id,
-            pdm_row=row,
-            hr_global_users=self.hr_global_users,
-            sap_email_data=self.sap_email_data,
-        )
+        resolved = self._resolved_emails.get(str(user_id).strip().lower())
+        if resolved is None:
+            email_resolver = EmailResolver()
+            resolved = email_resolver.resolve_user_email(
+                userid=user_id,
+                pdm_row=row,
+                hr_global_users=self.hr_global_users,
+                contact_store=self.sap_contact_store,
+            )
         safe_row = row.copy()
         safe_row["email"] = resolved["business_email"]
         safe_row["private_email"] = resolved["private_email"]
@@ -1136,14 +1188,10 @@ class CoreProcessor:
                 return convert_to_unix_timestamp(position_date)
 
         # Fallback to EmpJob cache
-        emp_cache = self.sap_cache.get("empjob_data_df")
-        if emp_cache is not None and not emp_cache.empty:
-            rel_empjob_row = emp_cache[
-                emp_cache["userid"].astype(str).str.lower() == user_id
-            ]
-            if not rel_empjob_row.empty:
-                start_date = rel_empjob_row.iloc[0]["startdate"]
-                return start_date
+        rel_empjob_row = self.sap_cache.lookup("empjob_data_df", "userid", user_id)
+        if rel_empjob_row is not None and not rel_empjob_row.empty:
+            start_date = rel_empjob_row.iloc[0]["startdate"]
+            return start_date
 
     def _get_relationship_if_exists(self, user_id: str, relation_type: str):
         """
@@ -1151,15 +1199,15 @@ class CoreProcessor:
         Return:
         Relation ID and Start Date.
         """
-        empjob_rel_cache = self.sap_cache.get("empjobrelationships_df")
-        if empjob_rel_cache is not None and not empjob_rel_cache.empty:
-            rel_rows = empjob_rel_cache[
-                (empjob_rel_cache["userid"].astype(str).str.lower() == user_id.lower())
-                & (empjob_rel_cache["relationshiptype"] == relation_type)
-            ]
-            if not rel_rows.empty:
-                relation_row = rel_rows.iloc[0]
-                return relation_row["reluserid"], relation_row["startdate"]
+        rel_rows = self.sap_cache.lookup(
+            "empjobrelationships_df",
+            ("userid", "relationshiptype"),
+            (user_id, relation_type),
+            exact="relationshiptype",
+        )
+        if rel_rows is not None and not rel_rows.empty:
+            relation_row = rel_rows.iloc[0]
+            return relation_row["reluserid"], relation_row["startdate"]
 
         return None, None
 
@@ -1262,7 +1310,9 @@ class CoreProcessor:
     def _execute_batch_upserts(self, results, batch_user_ids, is_retry=False):
         """
         Execute batched upserts per entity (SAP-compliant).
-        Refresh caches for Position and EmpJob after upserts.
+        Independent entities are upserted concurrently (see max_parallel_upserts) following
+        ENTITY_DEPENDENCIES and UPSERT_ORDERING, with the Position retry and Position-to-Job sync
+        steps as barriers for the entities depending on Position and EmpJob.
         Args:
             results (Dict[str, UserExecutionContext]): Mapping of user_id to their execution context.
             batch_user_ids (set): Set of user IDs in the current batch.
@@ -1273,49 +1323,191 @@ class CoreProcessor:
                 self._execute_hr_retry_upserts(results, batch_user_ids)
                 return
 
-            for entity_name, _ in self.EXECUTION_PLAN:
-                payloads_per_user = self.collected_payloads.get(entity_name)
-                Logger.info(
-                    f"Processing upsert for entity: {entity_name} with {len(payloads_per_user) if payloads_per_user else 0} users"
-                )
+            if self.max_parallel_upserts <= 1:
+                for entity_name, _ in self.EXECUTION_PLAN:
+                    if not self._upsert_entity(entity_name, results):
+                        continue
+                    self._run_upsert_barrier(entity_name, results, batch_user_ids)
+                    # Mark remaining PENDING users as SKIPPED
+                    self._mark_pending_as_skipped(results, entity_name)
+                return
 
-                if not payloads_per_user:
-                    continue
+            self._execute_upsert_plan_concurrently(results, batch_user_ids)
 
-                # Filter eligible users for this entity
-                eligible_payloads = self._filter_eligible_payloads(
-                    entity_name, payloads_per_user, results
-                )
+        except Exception as e:
+            Logger.error(f"Fatal error during batch upserts: {e}")
+            raise
 
-                if not eligible_payloads:
-                    Logger.info(f"No eligible users for {entity_name}")
-                    continue
+    def _upsert_entity(self, entity_name, results, failed_users=None) -> bool:
+        """
+        Upsert the collected payloads of one entity for its eligible users.
+        Args:
+            entity_name (str): Entity to upsert.
+            results (Dict[str, UserExecutionContext]): Mapping of user_id to their execution context.
+            failed_users (set): Users to treat as failed (see _filter_eligible_payloads).
+        Returns:
+            bool: True if an upsert was sent, False if there was nothing to upsert.
+        """
+        # Snapshot: barrier steps may collect payloads while other entities are being upserted
+        with self._results_lock:
+            payloads_per_user = dict(self.collected_payloads.get(entity_name) or {})
+        Logger.info(
+            f"Processing upsert for entity: {entity_name} with {len(payloads_per_user)} users"
+        )
 
-                # Execute upserts with entity-specific handling
-                Logger.info(
-                    f"Upserting {entity_name} for {len(eligible_payloads)} users"
-                )
+        if not payloads_per_user:
+            return False
 
-                if entity_name == "PerEmail":
-                    self._execute_email_upserts(entity_name, eligible_payloads, results)
-                else:
-                    self._execute_standard_upserts(
-                        entity_name, eligible_payloads, results
-                    )
+        # Filter eligible users for this entity
+        eligible_payloads = self._filter_eligible_payloads(
+            entity_name, payloads_per_user, results, failed_users
+        )
 
-                # Post-processing after specific entities
-                if entity_name == "Position":
-                    self._retry_position_dependent_entities(results, batch_user_ids)
+        if not eligible_payloads:
+            Logger.info(f"No eligible users for {entity_name}")
+            return False
 
-                if entity_name == "EmpJob":
-                    self._execute_position_sync(results, batch_user_ids)
+        # Execute upserts with entity-specific handling
+        Logger.info(f"Upserting {entity_name} for {len(eligible_payloads)} users")
 
-                # Mark remaining PENDING users as SKIPPED
-                self._mark_pending_as_skipped(results, entity_name)
+        if entity_name == "PerEmail":
+            self._execute_email_upserts(entity_name, eligible_payloads, results)
+        else:
+            self._execute_standard_upserts(entity_name, eligible_payloads, results)
+        return True
 
-        except Exception as e:
-            Logger.error(f"Fatal error during batch upserts: {e}")
-            raise
+    def _run_upsert_barrier(self, entity_name, results, batch_user_ids):
+        """
+        Run the post-processing step of an entity (Position retry, Position-to-Job sync), if any.
+        """
+        barrier = self.UPSERT_BARRIERS.get(entity_name)
+        if barrier:
+            method_name, _ = barrier
+            getattr(self, method_name)(results, batch_user_ids)
+
+    def _build_upsert_graph(self) -> tuple[list, dict]:
+        """
+        Build the upsert DAG from ENTITY_DEPENDENCIES, UPSERT_ORDERING and UPSERT_BARRIERS,
+        restricted to the entities of EXECUTION_PLAN.
+        Returns:
+            Tuple of (nodes in EXECUTION_PLAN order, dict node -> set of nodes it waits for).
+            Nodes are entity names, plus "<entity>:barrier" for entities with a barrier step.
+        """
+        planned = [entity for entity, _ in self.EXECUTION_PLAN]
+        barriers = {e for e in self.UPSERT_BARRIERS if e in planned}
+
+        def node_of(entity):
+            # Depending on an entity means waiting for its barrier step as well
+            return f"{entity}:barrier" if entity in barriers else entity
+
+        order, deps = [], {}
+        for entity in planned:
+            required = self.ENTITY_DEPENDENCIES.get(entity, []) + self.UPSERT_ORDERING.get(entity, [])
+            order.append(entity)
+            deps[entity] = {node_of(d) for d in required if d in planned and d != entity}
+            if entity in barriers:
+                _, barrier_deps = self.UPSERT_BARRIERS[entity]
+                barrier_node = f"{entity}:barrier"
+                order.append(barrier_node)
+                deps[barrier_node] = {entity} | {
+                    node_of(d) for d in barrier_deps if d in planned and d != entity
+                }
+        return order, deps
+
+    def _upsert_levels(self) -> list[list]:
+        """
+        Group the nodes of the upsert DAG by dependency level: every node only depends on
+        nodes of earlier levels.
+        Returns:
+            List of levels, each a list of nodes in EXECUTION_PLAN order.
+        """
+        order, deps = self._build_upsert_graph()
+        level_of = {}
+        remaining = list(order)
+        while remaining:
+            ready = [n for n in remaining if deps[n] <= level_of.keys()]
+            if not ready:
+                raise RuntimeError(f"Unresolvable upsert dependencies for: {sorted(remaining)}")
+            for node in ready:
+                level_of[node] = max((level_of[d] + 1 for d in deps[node]), default=0)
+            remaining = [n for n in remaining if n not in level_of]
+
+        levels = [[] for _ in range(max(level_of.values(), default=-1) + 1)]
+        for node in order:
+            levels[level_of[node]].append(node)
+        return levels
+
+    def _execute_upsert_plan_concurrently(self, results, batch_user_ids):
+        """
+        Upsert the entities of EXECUTION_PLAN on a bounded thread pool, one dependency level
+        at a time: the entities (and barrier steps) of a level run concurrently once every
+        level before it is done.
+
+        Users are skipped for the failures recorded before the level started (a snapshot),
+        not for the failures of sibling steps still running, so eligibility does not depend on
+        thread timing. A failed step does not stop the others: the steps depending on it are
+        not run, and the failures are raised once the plan is done.
+        """
+        _, deps = self._build_upsert_graph()
+        upserted = {}
+        failed_steps = {}
+
+        def run_entity(entity_name, failed_users):
+            sent = self._upsert_entity(entity_name, results, failed_users)
+            with self._results_lock:
+                upserted[entity_name] = sent
+                if sent and entity_name not in self.UPSERT_BARRIERS:
+                    # Mark remaining PENDING users as SKIPPED
+                    self._mark_pending_as_skipped(results, entity_name)
+
+        def run_barrier(entity_name, failed_users):
+            # Not under _results_lock: barrier steps send upserts and take the lock only
+            # around their own reads and writes of the user contexts
+            with self._results_lock:
+                sent = upserted.get(entity_name)
+            if sent:
+                self._run_upsert_barrier(entity_name, results, batch_user_ids)
+                with self._results_lock:
+                    self._mark_pending_as_skipped(results, entity_name)
+
+        with ThreadPoolExecutor(
+            max_workers=self.max_parallel_upserts, thread_name_prefix="upsert"
+        ) as executor:
+            for level in self._upsert_levels():
+                with self._results_lock:
+                    failed_users = {
+                        user_id for user_id, ctx in results.items() if ctx.has_errors
+                    }
+
+                running = {}
+                for node in level:
+                    blocked = deps[node] & failed_steps.keys()
+                    if blocked:
+                        Logger.error(f"Upsert step {node} not run: {', '.join(sorted(blocked))} failed")
+                        failed_steps[node] = None
+                        continue
+                    if node.endswith(":barrier"):
+                        func, arg = run_barrier, node[: -len(":barrier")]
+                    else:
+                        func, arg = run_entity, node
+                    Logger.info(f"Starting upsert step {node}")
+                    running[executor.submit(func, arg, failed_users)] = node
+
+                for future in as_completed(running):
+                    node = running[future]
+                    try:
+                        future.result()
+                    except Exception as e:
+                        Logger.error(f"Upsert step {node} failed: {e}", exc_info=True)
+                        failed_steps[node] = e
+
+        if failed_steps:
+            failed = [node for node, error in failed_steps.items() if error is not None]
+            not_run = [node for node, error in failed_steps.items() if error is None]
+            raise RuntimeError(
+                f"Upsert steps failed: {', '.join(failed)}"
+                + (f" (not run: {', '.join(not_run)})" if not_run else "")
+            )
 
     def _execute_hr_retry_upserts(self, results, batch_user_ids):
         """
@@ -1354,7 +1546,7 @@ class CoreProcessor:
                 entity, responses, results, is_warning_only=True
             )
 
-    def _filter_eligible_payloads(self, entity_name, payloads_per_user, results):
+    def _filter_eligible_payloads(self, entity_name, payloads_per_user, results, failed_users=None):
         """
         Filter payloads to only include eligible users for the given entity.
 
@@ -1362,30 +1554,34 @@ class CoreProcessor:
             entity_name: Name of the entity being processed
             payloads_per_user: Dict mapping user_id to their payloads
             results: Dict of UserExecutionContext objects
+            failed_users: Users with errors, snapshotted before concurrent steps started.
+                Defaults to the current errors of each context.
 
         Returns:
             Dict of eligible payloads ready for upsert
         """
         eligible_payloads = {}
 
-        for user_id, payload in payloads_per_user.items():
-            ctx = results[user_id]
+        with self._results_lock:
+            for user_id, payload in payloads_per_user.items():
+                ctx = results[user_id]
+                has_errors = user_id in failed_users if failed_users is not None else ctx.has_errors
 
-            # Skip users with errors (only for new employee creation)
-            if not ctx.is_update and ctx.has_errors:
-                Logger.info(
-                    f"{entity_name} skipped for {user_id}: has_errors=True, errors={ctx.errors}"
-                )
-                ctx.runtime["entity_status"][entity_name] = "SKIPPED"
-                continue
+                # Skip users with errors (only for new employee creation)
+                if not ctx.is_update and has_errors:
+                    Logger.info(
+                        f"{entity_name} skipped for {user_id}: has_errors=True, errors={ctx.errors}"
+                    )
+                    ctx.runtime["entity_status"][entity_name] = "SKIPPED"
+                    continue
 
-            # For updates, skip dependency checks since entities already exist in SAP
-            # Only enforce dependencies for new employee creation
-            if not ctx.is_update and not self._can_execute_entity(ctx, entity_name):
-                ctx.runtime["entity_status"][entity_name] = "SKIPPED"
-                continue
+                # For updates, skip dependency checks since entities already exist in SAP
+                # Only enforce dependencies for new employee creation
+                if not ctx.is_update and not self._can_execute_entity(ctx, entity_name):
+                    ctx.runtime["entity_status"][entity_name] = "SKIPPED"
+                    continue
 
-            eligible_payloads[user_id] = payload
+                eligible_payloads[user_id] = payload
         return eligible_payloads
 
     def _execute_email_upserts(self, entity_name, eligible_payloads, results):
@@ -1462,41 +1658,42 @@ class CoreProcessor:
             results: Dict of UserExecutionContext objects
             is_warning_only: If True, failures are treated as warnings instead of errors
         """
-        for user_id, result in responses.items():
-            ctx = results[user_id]
-            ctx.runtime[entity_name] = result
+        with self._results_lock:
+            for user_id, result in responses.items():
+                ctx = results[user_id]
+                ctx.runtime[entity_name] = result
 
-            if result["status"] == "FAILED":
-                ctx.runtime["entity_status"][entity_name] = "FAILED"
+                if result["status"] == "FAILED":
+                    ctx.runtime["entity_status"][entity_name] = "FAILED"
 
-                # Build detailed error message with API response
-                error_details = (
-                    f"{entity_name} failed - Message: {result.get('message')}"
-                )
-                if result.get("httpCode"):
-                    error_details += f", HTTP Code: {result.get('httpCode')}"
-                if result.get("key"):
-                    error_details += f", Key: {result.get('key')}"
-
-                if is_warning_only:
-                    Logger.warning(f"{error_details} - continuing anyway")
-                    ctx.warn(error_details)
-                else:
-                    Logger.error(error_details)
-                    ctx.fail(error_details)
-            else:
-                ctx.runtime["entity_status"][entity_name] = "SUCCESS"
-
-                # Store position_code from response for employment processing
-                if entity_name == "Position" and result.get("key"):
-                    key = result.get("key")
-                    # Extract position code from compound key
-                    # Key format: "Position/code=1020001,Position/effectiveStartDate=2026-01-14T00:00:00.000Z"
-                    if "code=" in key:
-                        position_code = key.split("code=")[1].split(",")[0]
-                        ctx.position_code = position_code
+                    # Build detailed error message with API response
+                    error_details = (
+                        f"{entity_name} failed - Message: {result.get('message')}"
+                    )
+                    if result.get("httpCode"):
+                        error_details += f", HTTP Code: {result.get('httpCode')}"
+                    if result.get("key"):
+                        error_details += f", Key: {result.get('key')}"
+
+                    if is_warning_only:
+                        Logger.warning(f"{error_details} - continuing anyway")
+                        ctx.warn(error_details)
                     else:
-                        Logger.warning(f"Could not parse position code from key: {key}")
+                        Logger.error(error_details)
+                        ctx.fail(error_details)
+                else:
+                    ctx.runtime["entity_status"][entity_name] = "SUCCESS"
+
+                    # Store position_code from response for employment processing
+                    if entity_name == "Position" and result.get("key"):
+                        key = result.get("key")
+                        # Extract position code from compound key
+                        # Key format: "Position/code=1020001,Position/effectiveStartDate=2026-01-14T00:00:00.000Z"
+                        if "code=" in key:
+                            position_code = key.split("code=")[1].split(",")[0]
+                            ctx.position_code = position_code
+                        else:
+                            Logger.warning(f"Could not parse position code from key: {key}")
 
     def _retry_position_dependent_entities(self, results, batch_user_ids):
         """
@@ -1508,12 +1705,15 @@ class CoreProcessor:
         )
 
         for user_id, ctx in results.items():
-            if (
-                user_id in batch_user_ids
-                and ctx.runtime.get("needs_position_lookup")
-                and not ctx.has_errors
-                and ctx.position_code
-            ):
+            # Per user: the contexts are shared with the upserts running next to this step
+            with self._results_lock:
+                if not (
+                    user_id in batch_user_ids
+                    and ctx.runtime.get("needs_position_lookup")
+                    and not ctx.has_errors
+                    and ctx.position_code
+                ):
+                    continue
                 row = ctx.runtime.get("original_row")
                 if row is None:
                     Logger.warning(
@@ -1543,8 +1743,6 @@ class CoreProcessor:
                     # Collect payloads again if retry successful
                     if not ctx.has_errors:
                         self._collect_payloads(ctx)
-                else:
-                    continue
 
     def _execute_position_sync(self, results, batch_user_ids):
         """
@@ -1557,37 +1755,40 @@ class CoreProcessor:
 
         position_sync_payloads = {}
 
-        for user_id, ctx in results.items():
-            if not self._should_execute_position_sync(ctx, user_id, batch_user_ids):
-                continue
+        # The contexts are shared with the upserts running next to this step; the lock is
+        # released for the sync upsert itself
+        with self._results_lock:
+            for user_id, ctx in results.items():
+                if not self._should_execute_position_sync(ctx, user_id, batch_user_ids):
+                    continue
 
-            row = ctx.runtime.get("original_row")
-            position_builder = ctx.builders.get("position")
+                row = ctx.runtime.get("original_row")
+                position_builder = ctx.builders.get("position")
 
-            # Build or retrieve position builder
-            if position_builder is None:
-                position_builder = self._build_position_builder_for_sync(
-                    row, ctx, results, user_id
-                )
+                # Build or retrieve position builder
                 if position_builder is None:
-                    continue
-
-            # Build Position payload with sync_pos_to_emp=True
-            sync_payload = position_builder.build_position(
-                sync_pos_to_emp=True,
-                effective_start_date_=ctx.empjob_start_date,
-                position_code_=ctx.position_code,
-            )
+                    position_builder = self._build_position_builder_for_sync(
+                        row, ctx, results, user_id
+                    )
+                    if position_builder is None:
+                        continue
 
-            if sync_payload:
-                # Store in ctx.payloads for history tracking (payload_snapshot)
-                ctx.payloads["position_sync"] = sync_payload
-                position_sync_payloads[user_id] = [sync_payload]
-            else:
-                Logger.warning(
-                    f"[POSITION SYNC] Failed to build sync payload for user {user_id}"
+                # Build Position payload with sync_pos_to_emp=True
+                sync_payload = position_builder.build_position(
+                    sync_pos_to_emp=True,
+                    effective_start_date_=ctx.empjob_start_date,
+                    position_code_=ctx.position_code,
                 )
 
+                if sync_payload:
+                    # Store in ctx.payloads for history tracking (payload_snapshot)
+                    ctx.payloads["position_sync"] = sync_payload
+                    position_sync_payloads[user_id] = [sync_payload]
+                else:
+                    Logger.warning(
+                        f"[POSITION SYNC] Failed to build sync payload for user {user_id}"
+                    )
+
         # Batch upsert Position sync payloads
         if position_sync_payloads:
             Logger.info(
@@ -1599,20 +1800,19 @@ class CoreProcessor:
                 entity_name="Position", user_payloads=position_sync_payloads
             )
 
-            for user_id, result in sync_responses.items():
-                # Store sync result separately (not in entity_status)
-                results[user_id].runtime["Position_SYNC"] = result
+            with self._results_lock:
+                for user_id, result in sync_responses.items():
+                    # Store sync result separately (not in entity_status)
+                    results[user_id].runtime["Position_SYNC"] = result
 
-                if result["status"] == "FAILED":
-                    Logger.warning(
-                        f"[POSITION SYNC] Sync failed for user {user_id}: {result.get('message')}"
-                    )
-                    # Don't fail the entire process - this is just a sync operation
-                    results[user_id].warn(
-                        f"Position-to-Job sync failed: {result.get('message')}"
-                    )
-                else:
-                    continue
+                    if result["status"] == "FAILED":
+                        Logger.warning(
+                            f"[POSITION SYNC] Sync failed for user {user_id}: {result.get('message')}"
+                        )
+                        # Don't fail the entire process - this is just a sync operation
+                        results[user_id].warn(
+                            f"Position-to-Job sync failed: {result.get('message')}"
+                        )
 
         Logger.info("=" * 80)
 
@@ -1644,7 +1844,7 @@ class CoreProcessor:
         )
 
         job_mapping = job_validator.get_job_mapping()
-        if job_mapping.empty:
+        if job_mapping is None:
             Logger.warning(
                 f"Job code {row['jobcode']} does not exist for user {user_id} during Position sync"
             )
@@ -1821,7 +2021,7 @@ class CoreProcessor:
         """
         dirty_entities = {}
 
-        for _, row in df.iterrows():
+        for row in ColumnarFrame(df):
             user_id = row.get("userid")
             field = row.get("field_name")
             pdm_value = row.get("pdm_value")
@@ -1963,15 +2163,9 @@ class CoreProcessor:
             if employees_df is not None and not employees_df.empty:
                 # Retrieve personexternalid from get_userid_from_personid
                 ec_user_id = ctx.ec_user_id
-                # Put Mask to retrieve position for the given ec_user_id,and filter by jobcode != "T00001"
-                emp_mask = (
-                    employees_df["userid"]
-                    .astype(str)
-                    .str.lower()
-                    .eq(ec_user_id.lower())
-                ) & (employees_df["jobcode"] != "T00001")
-
-                emp_result = employees_df[emp_mask]
+                # Retrieve position for the given ec_user_id, and filter by jobcode != "T00001"
+                emp_result = self.sap_cache.lookup("employees_df", "userid", ec_user_id)
+                emp_result = emp_result[emp_result["jobcode"] != "T00001"]
                 if not emp_result.empty:
                     existing_position = emp_result["position"].values[0]
 
@@ -2495,10 +2689,8 @@ class CoreProcessor:
                 employees_df = self.sap_cache.get("employees_df")
                 if employees_df is not None:
                     # Filter to retrieve match with user_id and jobcode different than the historical dummy jobcode T00001
-                    match = employees_df[
-                        (employees_df["userid"] == user_id)
-                        & (employees_df["jobcode"] != "T00001")
-                    ]
+                    match = self.sap_cache.lookup("employees_df", "userid", user_id, exact="userid")
+                    match = match[match["jobcode"] != "T00001"]
                     if not match.empty:
                         position_code = match["position"].values[0]
                         ctx.position_code = position_code  # Store for future use
@@ -2516,7 +2708,7 @@ class CoreProcessor:
             if "EmpJob" in dirty_entities:
                 employees_df = self.sap_cache.get("employees_df")
                 if employees_df is not None:
-                    match = employees_df[employees_df["userid"] == user_id]
+                    match = self.sap_cache.lookup("employees_df", "userid", user_id, exact="userid")
                     if not match.empty:
                         current_seq = match["seqnumber"].values[0]
                         start_date = match["startdate"].values[0]
@@ -2694,13 +2886,7 @@ class CoreProcessor:
             if employees_df is not None and not employees_df.empty:
                 # Retrieve EC user ID from context
                 ec_user_id = ctx.ec_user_id
-                emp_mask = (
-                    employees_df["userid"]
-                    .astype(str)
-                    .str.lower()
-                    .eq(ec_user_id.lower())
-                )
-                emp_result = employees_df[emp_mask]
+                emp_result = self.sap_cache.lookup("employees_df", "userid", ec_user_id)
                 if not emp_result.empty:
                     start_date = emp_result["startdate"].values[0]
                     position_code = emp_result["position"].values[0]
@@ -15,6 +15,7 @@ class UserExecutionContext:
             is_update (bool): Flag indicating whether the user is being updated (True) or created (False).
             This affects payload generation and entity processing logic including handling of dependencies.
         """
+        self._registries = []
         self.user_id = user_id
         self.payloads = {}
         self.errors = []
@@ -31,6 +32,18 @@ class UserExecutionContext:
         self.dirty_entities = set()
         self.is_update = False
 
+    @property
+    def position_code(self):
+        return self._position_code
+
+    @position_code.setter
+    def position_code(self, value):
+        """Keep the position claims of every UserResults holding this context in sync."""
+        old = getattr(self, "_position_code", None)
+        self._position_code = value
+        for registry, user_id in self._registries:
+            registry._move_claim(user_id, old, value)
+
     def fail(self, msg: str):
         """Record an error message and mark the context as failed."""
         self.errors.append(msg)
@@ -52,3 +65,106 @@ class UserExecutionContext:
     def has_warnings(self):
         """Check if there are any recorded warnings."""
         return len(self.warnings) > 0
+
+
+class UserResults(dict):
+    """
+    Mapping of user_id -> UserExecutionContext used as the processing results.
+    Also maintains which position codes are already claimed by which users in the current run,
+    updated whenever a context is added or its position_code changes, so checks such as
+    "is this position already taken in the batch" are a set probe instead of a scan of all contexts.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__()
+        # position code (lowercased) -> set of user_ids (lowercased) holding it
+        self._claims = {}
+        self.update(*args, **kwargs)
+
+    @staticmethod
+    def _norm(value) -> str:
+        return str(value).strip().lower()
+
+    def _add_claim(self, user_id, position_code):
+        if position_code:
+            self._claims.setdefault(self._norm(position_code), set()).add(self._norm(user_id))
+
+    def _remove_claim(self, user_id, position_code):
+        if position_code:
+            holders = self._claims.get(self._norm(position_code))
+            if holders is not None:
+                holders.discard(self._norm(user_id))
+                if not holders:
+                    del self._claims[self._norm(position_code)]
+
+    def _move_claim(self, user_id, old, new):
+        self._remove_claim(user_id, old)
+        self._add_claim(user_id, new)
+
+    def __setitem__(self, user_id, ctx):
+        self._discard(user_id)
+        super().__setitem__(user_id, ctx)
+        if isinstance(ctx, UserExecutionContext):
+            ctx._registries.append((self, user_id))
+            self._add_claim(user_id, ctx.position_code)
+
+    def __delitem__(self, user_id):
+        self._discard(user_id)
+        super().__delitem__(user_id)
+
+    def _discard(self, user_id):
+        ctx = self.get(user_id)
+        if not isinstance(ctx, UserExecutionContext):
+            return
+        self._remove_claim(user_id, ctx.position_code)
+        ctx._registries = [
+            (registry, held_as)
+            for registry, held_as in ctx._registries
+            if not (registry is self and held_as == user_id)
+        ]
+
+    def pop(self, user_id, *default):
+        if user_id in self:
+            value = self[user_id]
+            del self[user_id]
+            return value
+        return super().pop(user_id, *default)
+
+    def update(self, *args, **kwargs):
+        for user_id, ctx in dict(*args, **kwargs).items():
+            self[user_id] = ctx
+
+    def setdefault(self, user_id, default=None):
+        if user_id not in self:
+            self[user_id] = default
+        return self[user_id]
+
+    def clear(self):
+        for user_id in list(self.keys()):
+            del self[user_id]
+
+    def is_position_claimed(self, position_code, exclude_user_id=None) -> bool:
+        """Check if a position code is held by any user other than exclude_user_id."""
+        holders = self._claims.get(self._norm(position_code))
+        if not holders:
+            return False
+        if exclude_user_id is None:
+            return True
+        return bool(holders - {self._norm(exclude_user_id)})
+
+
+def is_position_claimed(results: dict, position_code, exclude_user_id=None) -> bool:
+    """
+    Check if a position code is already assigned to another user in the current processing results.
+    Uses the claims maintained by UserResults; plain dicts fall back to a scan of the contexts.
+    """
+    if isinstance(results, UserResults):
+        return results.is_position_claimed(position_code, exclude_user_id)
+    code = str(position_code).strip().lower()
+    excluded = str(exclude_user_id).strip().lower() if exclude_user_id is not None else None
+    return any(
+        ctx.position_code
+        and str(ctx.position_code).strip().lower() == code
+        and str(user_id).strip().lower() != excluded
+        for user_id, ctx in (results or {}).items()
+    )
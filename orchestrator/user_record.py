@@ -0,0 +1,111 @@
+import pandas as pd
+
+
+class ColumnarFrame:
+    """
+    Columnar view of a DataFrame for per-user processing: the columns are extracted once as
+    NumPy arrays and a userid -> row position map is built once, so reading a user's row is
+    an array lookup instead of iterrows() / a filtered DataFrame per user.
+
+    Args:
+        df (pd.DataFrame): Source rows (e.g. a batch of PDM users)
+        id_column (str): Column used for the userid lookup (case-insensitive). Defaults to 'userid'.
+    """
+    __slots__ = ("columns", "column_index", "arrays", "labels", "_positions_by_id", "_id_column")
+
+    def __init__(self, df: pd.DataFrame, id_column: str = "userid"):
+        self.columns = list(df.columns)
+        self.column_index = {column: i for i, column in enumerate(self.columns)}
+        self.arrays = [df.iloc[:, i].to_numpy(dtype=object) for i in range(len(self.columns))]
+        self.labels = df.index.to_numpy()
+        self._id_column = id_column
+        self._positions_by_id = None
+
+    def __len__(self):
+        return len(self.labels)
+
+    def __iter__(self):
+        for position in range(len(self.labels)):
+            yield UserRecord(self, position)
+
+    def record(self, position: int) -> "UserRecord":
+        return UserRecord(self, position)
+
+    def position_of(self, userid) -> int | None:
+        """Position of the first row of a user (case-insensitive), or None."""
+        if self._positions_by_id is None:
+            positions = {}
+            if self._id_column in self.column_index:
+                ids = self.arrays[self.column_index[self._id_column]]
+                for position, value in enumerate(ids):
+                    positions.setdefault(str(value).lower(), position)
+            self._positions_by_id = positions
+        return self._positions_by_id.get(str(userid).lower())
+
+    def find(self, userid) -> "UserRecord | None":
+        """First row of a user (case-insensitive), or None."""
+        position = self.position_of(userid)
+        return None if position is None else UserRecord(self, position)
+
+
+class UserRecord:
+    """
+    One row of a ColumnarFrame with the pd.Series mapping API used by the processing path
+    (get, [], in, copy, to_dict). Assignments are kept on the record and never touch the
+    shared columns, so copy() + assignment behaves like on a Series row.
+    """
+    __slots__ = ("_frame", "_position", "_overrides")
+
+    def __init__(self, frame: ColumnarFrame, position: int, overrides: dict = None):
+        self._frame = frame
+        self._position = position
+        self._overrides = overrides
+
+    def __getitem__(self, key):
+        if self._overrides is not None and key in self._overrides:
+            return self._overrides[key]
+        return self._frame.arrays[self._frame.column_index[key]][self._position]
+
+    def __setitem__(self, key, value):
+        if self._overrides is None:
+            self._overrides = {}
+        self._overrides[key] = value
+
+    def __contains__(self, key):
+        return key in self._frame.column_index or (self._overrides is not None and key in self._overrides)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self) -> list:
+        extra = [key for key in (self._overrides or {}) if key not in self._frame.column_index]
+        return self._frame.columns + extra
+
+    @property
+    def index(self) -> list:
+        return self.keys()
+
+    @property
+    def name(self):
+        """Index label of the row in the source DataFrame (like Series.name of an iterrows row)."""
+        return self._frame.labels[self._position]
+
+    @property
+    def empty(self) -> bool:
+        return False
+
+    def items(self):
+        return [(key, self[key]) for key in self.keys()]
+
+    def to_dict(self) -> dict:
+        return dict(self.items())
+
+    def copy(self) -> "UserRecord":
+        overrides = dict(self._overrides) if self._overrides is not None else None
+        return UserRecord(self._frame, self._position, overrides)
+
+    def __repr__(self):
+        return f"UserRecord({self.to_dict()!r})"
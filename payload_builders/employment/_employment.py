@@ -3,6 +3,7 @@ from payload_builders.employment.payloads.empemployment import get_empemployment
 from payload_builders.employment.payloads.empjob import get_emp_job
 from payload_builders.employment.payloads.empjobrelationships import get_empjob_relationships_payload
 from cache.postgres_cache import PostgresDataCache
+from mapper.retrieve_person_id_external import UserIdMapping
 from utils.date_converter import convert_to_unix_timestamp
 
 import datetime
@@ -81,16 +82,7 @@ class EmploymentPayloadBuilder:
         
     def _get_userid_from_personid(self, person_id):
         """Retrieve USERID from PERSON_ID_EXTERNAL using cached data if they are different."""
-        different_userid_personid_df = self.postgres_cache.get(
-            "different_userid_personid_data_df"
-        )
-        if different_userid_personid_df is not None:
-            match = different_userid_personid_df[
-                different_userid_personid_df["person_id_external"] == person_id
-            ]
-            if not match.empty:
-                return match["userid"].values[0]
-        return person_id
+        return UserIdMapping.from_cache(self.postgres_cache).userid_for(person_id)
     
     def _normalize_relationship_start_date(self, candidate_date):
         """
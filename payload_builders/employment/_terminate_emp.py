@@ -1,6 +1,7 @@
 from payload_builders.employment.payloads.empemploymentermination import get_emp_employment_termination_payload
 from utils.logger import get_logger
 from cache.postgres_cache import PostgresDataCache
+from mapper.retrieve_person_id_external import UserIdMapping
 Logger = get_logger("build_employment_termination_payloads")
 
 
@@ -17,21 +18,7 @@ class EmploymentTerminationPayloadBuilder:
         
     def _get_userid_personIdExternal(self, person_id):
         """Retrieve USERID from PERSON_ID_EXTERNAL using cached data if they are different."""
-        different_userid_personid_df = self.postgres_cache.get(
-            "different_userid_personid_data_df"
-        )
-        result = {
-            "userId": person_id,
-            "personIdExternal": person_id
-        }
-        if different_userid_personid_df is not None:
-            match = different_userid_personid_df[
-                (different_userid_personid_df["person_id_external"] == person_id) | 
-                (different_userid_personid_df["userid"] == person_id)
-            ]
-            if not match.empty:
-                result= {"userId": match["userid"].values[0], "personIdExternal": match["person_id_external"].values[0]}
-        return result
+        return UserIdMapping.from_cache(self.postgres_cache).resolve(person_id)
 
     def build_emp_employment_termination_payload(self):
         try:
@@ -2,9 +2,9 @@ from payload_builders.person.payloads.peremail import get_per_email_payload
 from payload_builders.person.payloads.perperson import get_perperson_payload
 from payload_builders.person.payloads.perpersonal import get_perpersonal_payload
 from payload_builders.person.payloads.perphone import get_perphone_payload
-from mapper.country_mapper import get_iso3_numeric
+from mapper.country_mapper import normalize_phone
+from mapper.retrieve_person_id_external import UserIdMapping
 from utils.date_converter import convert_to_unix_timestamp
-import phonenumbers
 from utils.logger import get_logger
 
 Logger = get_logger("build_person_payloads")
@@ -46,16 +46,7 @@ class PersonPayloadBuilder:
 
     def _get_userid_from_personid(self, person_id):
         """Retrieve USERID from PERSON_ID_EXTERNAL using cached data if they are different."""
-        different_userid_personid_df = self.postgres_cache.get(
-            "different_userid_personid_data_df"
-        )
-        if different_userid_personid_df is not None:
-            match = different_userid_personid_df[
-                different_userid_personid_df["person_id_external"] == person_id
-            ]
-            if not match.empty:
-                return match["userid"].values[0]
-        return person_id
+        return UserIdMapping.from_cache(self.postgres_cache).userid_for(person_id)
 
     def build_perperson_payload(self):
         try:
@@ -164,19 +155,16 @@ class PersonPayloadBuilder:
             parsed_country_code = None
             iso3_code = None
             national_number = None
-            try:
-                parsed_phone = phonenumbers.parse(phone, None)
-                parsed_country_code = f"+{parsed_phone.country_code}"
-                region_code = phonenumbers.region_code_for_country_code(
-                    parsed_phone.country_code
-                )
-                iso3_code = get_iso3_numeric(region_code)
-                national_number = str(parsed_phone.national_number)
-            except Exception as e:
+            # Parsed once per distinct number (cached)
+            parsed_phone = normalize_phone(phone)
+            if parsed_phone is None:
                 Logger.warning(
-                    f"No valid phone data for {self.person_id_external} - {phone}: {e}"
+                    f"No valid phone data for {self.person_id_external} - {phone}: number could not be parsed"
                 )
                 return None
+            parsed_country_code = parsed_phone.country_code
+            iso3_code = parsed_phone.iso3
+            national_number = parsed_phone.national_number
             if parsed_country_code and iso3_code:
                 payload["personIdExternal"] = self.person_id_external
                 payload["phoneType"] = phone_type
@@ -3,9 +3,12 @@ from mapper.country_mapper import get_iso3_numeric
 from payload_builders.position.payloads.position import get_position_payload
 from payload_builders.position.payloads.position_matrix_relationship import get_position_matrix_relationship_payload
 from cache.postgres_cache import PostgresDataCache
+from mapper.retrieve_person_id_external import UserIdMapping
 from cache.sap_cache import SAPDataCache
 from config.wh_per_country import wh_per_country
-import pandas as pd
+from orchestrator.user_context import is_position_claimed
+from validator.position.position_validator import build_position_match_index, position_match_key
+from validator.employment.job_validator import JobMapping
 
 Logger = get_logger("build_position_payloads")
 
@@ -17,7 +20,7 @@ class PositionPayloadBuilder:
     Supports both creation and update scenarios.
     Args:
         record (dict): The user record containing position data.
-        job_mappings (pd.DataFrame): DataFrame containing job mapping data.
+        job_mappings (JobMapping | pd.DataFrame): Job mapping of the job code, or DataFrame containing job mapping data.
         results (dict): Dictionary to hold results for position code tracking.
         ec_user_id (str): The EC USERID of the user being processed.
         non_missing_manager_data (pd.DataFrame, optional): DataFrame with non-missing manager data.
@@ -50,8 +53,8 @@ class PositionPayloadBuilder:
         self.non_missing_manager_data = non_missing_manager_data
         self.is_scm = is_scm
         self.is_update = is_update
-        # Extract user_id from record for position lookup validation
-        self.user_id = record.get("userid") if isinstance(record, dict) else getattr(record, "userid", None)
+        # Extract user_id from record for position lookup validation (dict, pd.Series or UserRecord)
+        self.user_id = record.get("userid")
         self.postgres_cache = PostgresDataCache()
         self.sap_cache = SAPDataCache()
         self.results = results if results is not None else {}
@@ -67,6 +70,11 @@ class PositionPayloadBuilder:
             return ""
         return str(value).replace(".0", "")
 
+    def _job_value(self, field):
+        if isinstance(self.job_mappings, JobMapping):
+            return getattr(self.job_mappings, field)
+        return self.job_mappings[field].values[0]
+
     def _validate(self):
         for field in self.REQUIRED_FIELDS:
             if field not in self.record:
@@ -81,111 +89,56 @@ class PositionPayloadBuilder:
             "company": self._clean(self.record["company"]),
             "costCenter": self._clean(self.record["cost_center"]),
             "cust_Country_Of_Registration": self._clean(self.record.get("country_iso3") or get_iso3_numeric(self.record.get("country_code"))),
-            "division": self._clean(self.job_mappings["bufu_id"].values[0]),
+            "division": self._clean(self._job_value("bufu_id")),
             "jobCode": self._clean(self.record["jobcode"]),
             "location": self._clean(self.record["address_code"]),
-            "cust_geographicalScope": self._clean(self.job_mappings["cust_geographicalscope"].values[0]),
-            "cust_subUnit": self._clean(self.job_mappings["cust_subunit"].values[0]),
+            "cust_geographicalScope": self._clean(self._job_value("cust_geographicalscope")),
+            "cust_subUnit": self._clean(self._job_value("cust_subunit")),
         }
         # Only add fields that are not empty strings
         payload.update({k: v for k, v in fields.items() if v != ""})
 
     def _get_userid_from_personid(self, person_id):
         """Retrieve USERID from PERSON_ID_EXTERNAL using cached data if they are different."""
-        different_userid_personid_df = self.postgres_cache.get(
-            "different_userid_personid_data_df"
-        )
-        if different_userid_personid_df is not None:
-            match = different_userid_personid_df[
-                different_userid_personid_df["person_id_external"] == person_id
-            ]
-            if not match.empty:
-                return match["userid"].values[0]
-        return person_id
+        return UserIdMapping.from_cache(self.postgres_cache).userid_for(person_id)
 
     def _get_position_code_from_employees(self, userid, dummy_position: str=None):
         """Retrieve manager's position code using cached EC data."""
-        employees_df = self.employees_df
-        if employees_df is not None:
-            match = employees_df[employees_df["userid"] == userid]
-            if not match.empty:
-                if dummy_position and str(match["position"].values[0]).strip().lower() == dummy_position.strip().lower():
-                    Logger.info(f"Position code for user ID {userid} is a dummy position ({dummy_position}), skipping assignment.")
-                    return None
-                return match["position"].values[0]
+        match = self.sap_cache.lookup("employees_df", "userid", userid, exact="userid")
+        if match is not None and not match.empty:
+            if dummy_position and str(match["position"].values[0]).strip().lower() == dummy_position.strip().lower():
+                Logger.info(f"Position code for user ID {userid} is a dummy position ({dummy_position}), skipping assignment.")
+                return None
+            return match["position"].values[0]
         return None
 
     def _get_position_code_from_positions(self,record,ec_user_id: str=None):
         """Retrieve position code using cached positions data."""
         
         try:
-            pos_data = self.positions_df
-            job_code = str(record.get('jobcode')).strip().lower()
-            location_code = str(record.get('address_code')).strip().lower()
-            cost_center = str(record.get('cost_center')).strip().lower()
-            company = str(record.get('company')).strip().lower()
-            if 'positioncriticality' in pos_data.columns:
-                pos_data['_is_critical'] = (
-                    pd.to_numeric(
-                        pos_data['positioncriticality'],
-                        errors='coerce'
-                    )
-                    .fillna(0)
-                    .astype(int)
-                    == 1
-                )
-            else:
-                pos_data['_is_critical'] = False
-            mask = (
-                (pos_data['jobcode'].astype(str).str.lower() == job_code) &
-                (pos_data['location'].astype(str).str.lower() == location_code) &
-                (pos_data['costcenter'].astype(str).str.lower() == cost_center) &
-                (pos_data['company'].astype(str).str.lower() == company) &
-                (~pos_data['_is_critical'])  # Exclude critical positions
-            )
+            match_index = self.sap_cache.get_derived(
+                "positions_df", "position_match_index", build_position_match_index
+            ) or {}
 
-            result = pos_data[mask]
-
-            if not result.empty:
-                for code in result['code']:
-                    emp_mask = self.employees_df['position'].astype(str).str.lower().eq(code.lower())
-                    emp_result = self.employees_df[emp_mask]
-                    # Check if position is assigned to another user
-                    if not emp_result.empty:
-                        assigned_userid = str(emp_result['userid'].values[0]).strip().lower()
-                        current_userid = str(ec_user_id if ec_user_id else self.ec_user_id).strip().lower()
-                        # Check if this position is assigned to a different user
-                        if assigned_userid != current_userid:
-                            Logger.info(
-                                f"Position code {code} is already assigned to another user ID {assigned_userid}."
-                            )
-                    in_batch = False
-                    # Check if position code is assigned to another user in current batch
-                    results_df = pd.DataFrame.from_dict(
-                        {
-                            user_id: ctx.position_code
-                            for user_id, ctx in self.results.items()
-                            if ctx.position_code
-                        },
-                        orient="index",
-                        columns=["position_code"]
-                    ).reset_index(names="user_id")
-                    results_df["user_id"] = results_df["user_id"].astype(str).str.lower()
-                    results_df["position_code"] = results_df["position_code"].astype(str).str.lower()
-                    code_l = code.lower()
-                    current_user_l = str(self.user_id).strip().lower()
-                    in_batch = (
-                        (results_df["position_code"] == code_l) &
-                        (results_df["user_id"] != current_user_l)
-                    ).any()
-
-                    if in_batch:
+            for code in match_index.get(position_match_key(record), ()):
+                emp_result = self.sap_cache.lookup("employees_df", "position", code)
+                # Check if position is assigned to another user
+                if not emp_result.empty:
+                    assigned_userid = str(emp_result['userid'].values[0]).strip().lower()
+                    current_userid = str(ec_user_id if ec_user_id else self.ec_user_id).strip().lower()
+                    # Check if this position is assigned to a different user
+                    if assigned_userid != current_userid:
                         Logger.info(
-                            f"Position code {code} is already assigned to another user in current processing batch."
+                            f"Position code {code} is already assigned to another user ID {assigned_userid}."
                         )
-                        continue
-                    Logger.info(f"Position code {code} found for user ID {self.user_id} and not assigned to another user.")
-                    return code
+                # Check if position code is assigned to another user in current batch
+                if is_position_claimed(self.results, code, exclude_user_id=self.user_id):
+                    Logger.info(
+                        f"Position code {code} is already assigned to another user in current processing batch."
+                    )
+                    continue
+                Logger.info(f"Position code {code} found for user ID {self.user_id} and not assigned to another user.")
+                return code
 
             Logger.info(f"No position code found for user ID {self.user_id}.")
             return None
@@ -222,7 +175,7 @@ class PositionPayloadBuilder:
         Logger.info(f"Retrieving position URI for position code: {position_code} for manager USERID: {manager_userid}")
         if positions_df is not None:
             Logger.info(f"Positions DataFrame columns: {positions_df.columns.tolist()}")
-            match = positions_df[positions_df["code"] == position_code]
+            match = self.sap_cache.lookup("positions_df", "code", position_code, exact="code")
             if not match.empty:
                 # Try common metadata formats
                 if "__metadata.uri" in match.columns:
@@ -261,7 +214,7 @@ class PositionPayloadBuilder:
         """Retrieve effective start date and standard hours for a position."""
         positions_df = self.positions_df
         if positions_df is not None:
-            match = positions_df[positions_df["code"] == position_code]
+            match = self.sap_cache.lookup("positions_df", "code", position_code, exact="code")
             if not match.empty:
                 # Check if columns exist before accessing
                 Logger.info(f"Retrieving position data for position code: {position_code}")
@@ -11,7 +11,6 @@ from airflow import DAG
 from airflow.operators.python import PythonOperator
 from datetime import datetime, timedelta
 import logging
-import pandas as pd
 
 # Import pipeline functions
 from test.test_migration_pipeline import (
@@ -35,9 +34,25 @@ from test.test_migration_pipeline import (
 from cache.postgres_cache import PostgresDataCache
 from cache.oracle_cache import OracleDataCache
 from cache.sap_cache import SAPDataCache
+from cache.employees_cache import EmployeesDataCache
+from cache.artifact_store import ArtifactStore
+
+# Pools opened by a task are logged and closed when it ends
+from db.connection_pools import with_connection_pools
+
+# Code of the content-addressed steps (part of their artifact keys)
+from extractor.extract_exist_employees import ExistEmployeesExtractor
+from extractor.extract_new_employees import NewEmployeesExtractor
+from extractor.extract_inactive_employees import InactiveEmployeesExtractor
+from planning.convert_pdm_data import convert_pdm_data
+from planning.employee_creation_order_resolver import EmployeeCreationOrderResolver
 
 logger = logging.getLogger("airflow.task")
 
+# Intermediates handed between tasks, keyed by the hash of their inputs and code:
+# reruns and retries reuse the outputs of the steps whose inputs did not change
+artifacts = ArtifactStore("/tmp/pdm_cache")
+
 default_args = {
     'owner': 'khalifa',
     'depends_on_past': False,
@@ -59,13 +74,13 @@ with DAG(
     # STEP 1
     extract_db_task = PythonOperator(
         task_id='extract_database_data',
-        python_callable=extract_and_cache_database_data
+        python_callable=with_connection_pools(extract_and_cache_database_data)
     )
 
     # STEP 2
     extract_sap_task = PythonOperator(
         task_id='extract_sap_data',
-        python_callable=extract_and_cache_sap_data
+        python_callable=with_connection_pools(extract_and_cache_sap_data)
     )
 
     # STEP 3
@@ -74,94 +89,108 @@ with DAG(
 
     load_cache_task = PythonOperator(
         task_id='load_cached_data',
-        python_callable=load_cache_wrapper
+        python_callable=with_connection_pools(load_cache_wrapper)
     )
 
     # STEP 4
     def classify_employees_wrapper():
 
-        cached_ec = PostgresDataCache.get("ec_data_df")
-        cached_pdm = OracleDataCache.get("pdm_data_df")
-
-        existing, new, inactive = extract_employee_classifications(
-            cached_pdm, cached_ec
+        cached_ec = PostgresDataCache().get("ec_data_df")
+        cached_pdm = OracleDataCache().get("pdm_data_df")
+
+        # Save outputs for later stages (reused as long as PDM/EC data and code are unchanged)
+        artifacts.run_step(
+            "classify_employees",
+            outputs=("existing", "new", "inactive"),
+            inputs={"cached_pdm_data": cached_pdm, "cached_ec_data": cached_ec},
+            compute=extract_employee_classifications,
+            code=(
+                extract_employee_classifications,
+                ExistEmployeesExtractor,
+                NewEmployeesExtractor,
+                InactiveEmployeesExtractor,
+            ),
+            # NewEmployeesExtractor also caches new_employees_df: redo it when the outputs are reused
+            replay=lambda existing, new, inactive: EmployeesDataCache().set("new_employees_df", new),
         )
 
-        # Save outputs for later stages
-        existing.to_parquet("/tmp/pdm_cache/existing.parquet")
-        new.to_parquet("/tmp/pdm_cache/new.parquet")
-        inactive.to_parquet("/tmp/pdm_cache/inactive.parquet")
-
     classify_employees_task = PythonOperator(
         task_id='classify_employees',
-        python_callable=classify_employees_wrapper
+        python_callable=with_connection_pools(classify_employees_wrapper)
     )
 
     # STEP 5
     def validate_new_wrapper():
         sap_cache = SAPDataCache.get("employees_df")
-        new = PostgresDataCache.get("new_employees_df") or \
-              pd.read_parquet("/tmp/pdm_cache/new.parquet")
+        new = artifacts.load("new")
 
         validate_new_employees(new, SAPDataCache())
 
     validate_new_task = PythonOperator(
         task_id='validate_new_employees',
-        python_callable=validate_new_wrapper
+        python_callable=with_connection_pools(validate_new_wrapper)
     )
 
     # STEP 6
     def prepare_new_wrapper():
-        new = pd.read_parquet("/tmp/pdm_cache/new.parquet")
-        prepared = prepare_new_employees_data(new)
-        prepared.to_parquet("/tmp/pdm_cache/prepared_new.parquet")
+        artifacts.run_step(
+            "prepare_new_employees",
+            outputs=("prepared_new",),
+            inputs={"new_employees_df": artifacts.load("new")},
+            compute=prepare_new_employees_data,
+            code=(prepare_new_employees_data, convert_pdm_data),
+        )
 
     prepare_new_task = PythonOperator(
         task_id='prepare_new_employees',
-        python_callable=prepare_new_wrapper
+        python_callable=with_connection_pools(prepare_new_wrapper)
     )
 
     # STEP 7
     def resolve_order_wrapper():
-        prepared = pd.read_parquet("/tmp/pdm_cache/prepared_new.parquet")
-        existing = pd.read_parquet("/tmp/pdm_cache/existing.parquet")
-        batches, summary = resolve_creation_order(prepared, existing)
-        
-        if batches is not None and summary is not None:
-            PostgresDataCache.set("batches", batches)
-            PostgresDataCache.set("batches_summary", summary)
-        else:
+        batches, summary = artifacts.run_step(
+            "resolve_creation_order",
+            outputs=("batches", "batches_summary"),
+            inputs={
+                "new_employees_df": artifacts.load("prepared_new"),
+                "existing_employees_df": artifacts.load("existing"),
+            },
+            compute=resolve_creation_order,
+            code=(resolve_creation_order, EmployeeCreationOrderResolver),
+        )
+
+        if batches is None or summary is None:
             logger.error("There's no new employees to process or an error occurred during order resolution.")
 
     resolve_order_task = PythonOperator(
         task_id='resolve_creation_order',
-        python_callable=resolve_order_wrapper
+        python_callable=with_connection_pools(resolve_order_wrapper)
     )
 
     # STEP 8
     def process_new_wrapper():
-        prepared = pd.read_parquet("/tmp/pdm_cache/prepared_new.parquet")
-        batches = PostgresDataCache.get("batches")
-        summary = PostgresDataCache.get("batches_summary")
+        prepared = artifacts.load("prepared_new")
+        batches = artifacts.load("batches")
+        summary = artifacts.load("batches_summary")
         process_new_employees(prepared, batches, summary)
 
     process_new_task = PythonOperator(
         task_id='process_new_employees',
-        python_callable=process_new_wrapper
+        python_callable=with_connection_pools(process_new_wrapper)
     )
 
     # STEP 9
     def detect_changes_wrapper():
         cached_ec = PostgresDataCache.get("ec_data_df")
         cached_pdm = OracleDataCache.get("pdm_data_df")
-        existing = pd.read_parquet("/tmp/pdm_cache/existing.parquet")
+        existing = artifacts.load("existing")
 
         changes = detect_field_changes(cached_pdm, cached_ec, existing)
         PostgresDataCache.set("field_changes", changes)
 
     detect_changes_task = PythonOperator(
         task_id='detect_field_changes',
-        python_callable=detect_changes_wrapper
+        python_callable=with_connection_pools(detect_changes_wrapper)
     )
 
     # STEP 10
@@ -171,26 +200,26 @@ with DAG(
 
     process_updates_task = PythonOperator(
         task_id='process_field_updates',
-        python_callable=process_updates_wrapper
+        python_callable=with_connection_pools(process_updates_wrapper)
     )
 
     # STEP 11
     def process_inactive_wrapper():
-        inactive = pd.read_parquet("/tmp/pdm_cache/inactive.parquet")
+        inactive = artifacts.load("inactive")
         pdm = OracleDataCache.get("pdm_data_df")
         ec = PostgresDataCache.get("ec_data_df")
         process_inactive_users(inactive, pdm, ec)
 
     process_inactive_task = PythonOperator(
         task_id='process_inactive_users',
-        python_callable=process_inactive_wrapper
+        python_callable=with_connection_pools(process_inactive_wrapper)
     )
 
     # STEP 12
     def save_outputs_wrapper():
-        existing = pd.read_parquet("/tmp/pdm_cache/existing.parquet")
-        new = pd.read_parquet("/tmp/pdm_cache/new.parquet")
-        inactive = pd.read_parquet("/tmp/pdm_cache/inactive.parquet")
+        existing = artifacts.load("existing")
+        new = artifacts.load("new")
+        inactive = artifacts.load("inactive")
         changes = PostgresDataCache.get("field_changes")
 
         save_final_outputs(existing, new, inactive, changes)
@@ -198,15 +227,15 @@ with DAG(
 
     save_outputs_task = PythonOperator(
         task_id='save_final_outputs',
-        python_callable=save_outputs_wrapper
+        python_callable=with_connection_pools(save_outputs_wrapper)
     )
 
     # STEP 13
     send_notification_task = PythonOperator(
         task_id='send_notification_email',
-        python_callable=lambda: send_notification_email(
+        python_callable=with_connection_pools(lambda: send_notification_email(
             datetime.now().strftime("%Y%m%d%H%M%S")
-        )
+        ))
     )
 
     # DAG graph
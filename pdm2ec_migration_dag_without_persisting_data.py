@@ -11,7 +11,6 @@ from airflow import DAG
 from airflow.operators.python import PythonOperator
 from datetime import datetime, timedelta
 import logging
-import pandas as pd
 
 # Import pipeline functions
 from test.test_offline_migration_pipeline import (
@@ -35,9 +34,25 @@ from test.test_offline_migration_pipeline import (
 from cache.postgres_cache import PostgresDataCache
 from cache.oracle_cache import OracleDataCache
 from cache.sap_cache import SAPDataCache
+from cache.employees_cache import EmployeesDataCache
+from cache.artifact_store import ArtifactStore
+
+# Pools opened by a task are logged and closed when it ends
+from db.connection_pools import with_connection_pools
+
+# Code of the content-addressed steps (part of their artifact keys)
+from extractor.extract_exist_employees import ExistEmployeesExtractor
+from extractor.extract_new_employees import NewEmployeesExtractor
+from extractor.extract_inactive_employees import InactiveEmployeesExtractor
+from planning.convert_pdm_data import convert_pdm_data
+from planning.employee_creation_order_resolver import EmployeeCreationOrderResolver
 
 logger = logging.getLogger("airflow.task")
 
+# Intermediates handed between tasks, keyed by the hash of their inputs and code:
+# reruns and retries reuse the outputs of the steps whose inputs did not change
+artifacts = ArtifactStore("/tmp/pdm_cache")
+
 default_args = {
     "owner": "khalifa",
     "depends_on_past": False,
@@ -57,12 +72,12 @@ with DAG(
 ) as dag:
     # STEP 1
     extract_db_task = PythonOperator(
-        task_id="extract_database_data", python_callable=extract_and_cache_database_data
+        task_id="extract_database_data", python_callable=with_connection_pools(extract_and_cache_database_data)
     )
 
     # STEP 2
     extract_sap_task = PythonOperator(
-        task_id="extract_sap_data", python_callable=extract_and_cache_sap_data
+        task_id="extract_sap_data", python_callable=with_connection_pools(extract_and_cache_sap_data)
     )
 
     # STEP 3
@@ -70,74 +85,85 @@ with DAG(
         load_cached_data()
 
     load_cache_task = PythonOperator(
-        task_id="load_cached_data", python_callable=load_cache_wrapper
+        task_id="load_cached_data", python_callable=with_connection_pools(load_cache_wrapper)
     )
 
     # STEP 4
     def classify_employees_wrapper():
-        cached_ec = PostgresDataCache.get("ec_data_df")
-        cached_pdm = OracleDataCache.get("pdm_data_df")
-
-        existing, new, inactive = extract_employee_classifications(
-            cached_pdm, cached_ec
+        cached_ec = PostgresDataCache().get("ec_data_df")
+        cached_pdm = OracleDataCache().get("pdm_data_df")
+
+        # Save outputs for later stages (reused as long as PDM/EC data and code are unchanged)
+        artifacts.run_step(
+            "classify_employees",
+            outputs=("existing", "new", "inactive"),
+            inputs={"cached_pdm_data": cached_pdm, "cached_ec_data": cached_ec},
+            compute=extract_employee_classifications,
+            code=(
+                extract_employee_classifications,
+                ExistEmployeesExtractor,
+                NewEmployeesExtractor,
+                InactiveEmployeesExtractor,
+            ),
+            # NewEmployeesExtractor also caches new_employees_df: redo it when the outputs are reused
+            replay=lambda existing, new, inactive: EmployeesDataCache().set("new_employees_df", new),
         )
 
-        # Save outputs for later stages
-        existing.to_parquet("/tmp/pdm_cache/existing.parquet")
-        new.to_parquet("/tmp/pdm_cache/new.parquet")
-        inactive.to_parquet("/tmp/pdm_cache/inactive.parquet")
-
     classify_employees_task = PythonOperator(
-        task_id="classify_employees", python_callable=classify_employees_wrapper
+        task_id="classify_employees", python_callable=with_connection_pools(classify_employees_wrapper)
     )
 
     # STEP 5
     def validate_new_wrapper():
         sap_cache = SAPDataCache.get("employees_df")
-        new = PostgresDataCache.get("new_employees_df") or pd.read_parquet(
-            "/tmp/pdm_cache/new.parquet"
-        )
+        new = artifacts.load("new")
 
         validate_new_employees(new, SAPDataCache())
 
     validate_new_task = PythonOperator(
-        task_id="validate_new_employees", python_callable=validate_new_wrapper
+        task_id="validate_new_employees", python_callable=with_connection_pools(validate_new_wrapper)
     )
 
     # STEP 6
     def prepare_new_wrapper():
-        new = pd.read_parquet("/tmp/pdm_cache/new.parquet")
-        prepared = prepare_new_employees_data(new)
-        prepared.to_parquet("/tmp/pdm_cache/prepared_new.parquet")
+        artifacts.run_step(
+            "prepare_new_employees",
+            outputs=("prepared_new",),
+            inputs={"new_employees_df": artifacts.load("new")},
+            compute=prepare_new_employees_data,
+            code=(prepare_new_employees_data, convert_pdm_data),
+        )
 
     prepare_new_task = PythonOperator(
-        task_id="prepare_new_employees", python_callable=prepare_new_wrapper
+        task_id="prepare_new_employees", python_callable=with_connection_pools(prepare_new_wrapper)
     )
 
     # STEP 7
     def resolve_order_wrapper():
-        prepared = pd.read_parquet("/tmp/pdm_cache/prepared_new.parquet")
-        existing = pd.read_parquet("/tmp/pdm_cache/existing.parquet")
-
-        batches, summary = resolve_creation_order(prepared, existing)
+        batches, summary = artifacts.run_step(
+            "resolve_creation_order",
+            outputs=("batches", "batches_summary"),
+            inputs={
+                "new_employees_df": artifacts.load("prepared_new"),
+                "existing_employees_df": artifacts.load("existing"),
+            },
+            compute=resolve_creation_order,
+            code=(resolve_creation_order, EmployeeCreationOrderResolver),
+        )
 
         if not batches:
             logger.info("There's no new employees to process.")
-            return
-
-        PostgresDataCache.set("batches", batches)
-        PostgresDataCache.set("batches_summary", summary)
 
     resolve_order_task = PythonOperator(
-        task_id="resolve_creation_order", python_callable=resolve_order_wrapper
+        task_id="resolve_creation_order", python_callable=with_connection_pools(resolve_order_wrapper)
     )
 
     # STEP 13
     send_notification_task = PythonOperator(
         task_id="send_notification_email",
-        python_callable=lambda: send_notification_email(
+        python_callable=with_connection_pools(lambda: send_notification_email(
             datetime.now().strftime("%Y%m%d%H%M%S")
-        ),
+        )),
     )
 
     # DAG graph
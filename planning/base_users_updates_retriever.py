@@ -1,17 +1,18 @@
 import email
 from loader.bulk_insert_employee_field_changes import BulkInsertEmployeeFieldChanges
+from loader.background_writer import BackgroundWriter
 from cache.employees_cache import EmployeesDataCache
 from cache.oracle_cache import OracleDataCache
 from cache.sap_cache import SAPDataCache
+from cache.sap_contact_store import SAPContactStore
 from planning.field_change_data import FieldChange
 from planning.email_resolver import EmailResolver
 from typing import Callable, Iterator
-from validator.person.email_validator import EmailValidator
+from validator.person.contact_decisions import ContactDecisionEngine
 from utils.logger import get_logger
 import uuid
 import pandas as pd
 
-from validator.person.phone_validator import PhoneValidator
 Logger = get_logger("base_users_updates_retriever")
 
 class BaseUsersUpdatesRetriever:
@@ -45,7 +46,7 @@ class BaseUsersUpdatesRetriever:
                 pdm_data['division'].str.lower() == 'human resources'
             ]['userid'].astype(str).str.lower()
         )
-        self.sap_email_data_ = self.sap_cache.get('peremail_df')
+        self.sap_contact_store = SAPContactStore.from_cache()
         
         # Normalize SAP email data column names to lowercase for EmailValidator
         if sap_email_data is not None and not sap_email_data.empty:
@@ -64,17 +65,82 @@ class BaseUsersUpdatesRetriever:
             self.sap_email_data = email_data_copy
         else:
             self.sap_email_data = pd.DataFrame()
+        self._valid_email_users_ids = None
+        self._email_decisions = {}
+        self._phone_decisions = {}
+
     def _retrieve_vaild_email_users_ids(self):
         """
         Retrieves users ids that their email in SAP is not anonymized (not ending with @kn.com).
+        Computed once per retriever, the SAP email table does not change during a run.
         Returns:
             set: Set of user IDs with valid (non-anonymized) emails in SAP.
         """
-        sap_email_data = self.sap_email_data_
-        valid_email_users = sap_email_data[
-            ~sap_email_data['emailaddress'].str.lower().str.endswith('@kn.com', na=False)
-        ]['personidexternal'].astype(str).str.lower()
-        return set(valid_email_users)
+        if self._valid_email_users_ids is None:
+            # Re-fetched through the cache rather than held for the retriever's lifetime
+            sap_email_data = self.sap_cache.get('peremail_df')
+            valid_email_users = sap_email_data[
+                ~sap_email_data['emailaddress'].str.lower().str.endswith('@kn.com', na=False)
+            ]['personidexternal'].astype(str).str.lower()
+            self._valid_email_users_ids = set(valid_email_users)
+        return self._valid_email_users_ids
+
+    def prepare_contact_decisions(self, pdm_common: pd.DataFrame, include_phones: bool = False):
+        """
+        Computes the email (and optionally phone) decisions of all users at once with
+        ContactDecisionEngine, instead of one validator and one SAP table scan per user.
+        _control_email_updates / _control_phone_updates then only turn them into FieldChanges.
+
+        Args:
+            pdm_common (pd.DataFrame): PDM rows of the compared users, indexed by userid
+            include_phones (bool): Also compute phone decisions. Defaults to False.
+        """
+        self._prepare_email_decisions(pdm_common)
+        if include_phones:
+            self._prepare_phone_decisions(pdm_common)
+        Logger.info(
+            f"Prepared contact decisions for {len(self._email_decisions)} email users"
+            f" and {len(self._phone_decisions)} phone users"
+        )
+
+    def _prepare_email_decisions(self, pdm_common: pd.DataFrame):
+        valid_email_users = self._retrieve_vaild_email_users_ids()
+        engine = ContactDecisionEngine.for_emails(self.sap_email_data)
+        pdm_valid = pdm_common[pdm_common.index.isin(valid_email_users)]
+        # Safe (resolved) emails of all users in one pass
+        resolved = EmailResolver().resolve_emails(pdm_valid, self.hr_global_users, self.sap_contact_store)
+        if "is_private_email" in pdm_valid.columns:
+            private_only = pdm_valid["is_private_email"].astype(str).str.lower() == "true"
+        else:
+            private_only = pd.Series(False, index=pdm_valid.index)
+        incoming = {
+            userid: engine.incoming_contacts(private=private_email, business=business_email, is_private_only=is_private_only)
+            for userid, business_email, private_email, is_private_only in zip(
+                pdm_valid.index, resolved["business_email"], resolved["private_email"], private_only
+            )
+        }
+        self._email_decisions.update(engine.decide(incoming))
+
+    def _prepare_phone_decisions(self, pdm_common: pd.DataFrame):
+        # Phones are matched against the same SAP contact table as before
+        engine = ContactDecisionEngine.for_phones(self.sap_email_data)
+
+        def pdm_column(name):
+            if name in pdm_common.columns:
+                return pdm_common[name].to_numpy(dtype=object)
+            return [None] * len(pdm_common)
+
+        if "is_private_phone" in pdm_common.columns:
+            private_only = pdm_common["is_private_phone"].astype(str).str.lower() == "true"
+        else:
+            private_only = pd.Series(False, index=pdm_common.index)
+        incoming = {
+            userid: engine.incoming_contacts(private=biz_mobile, business=biz_phone, is_private_only=is_private_only)
+            for userid, biz_mobile, biz_phone, is_private_only in zip(
+                pdm_common.index, pdm_column("biz_mobile"), pdm_column("biz_phone"), private_only
+            )
+        }
+        self._phone_decisions.update(engine.decide(incoming))
 
     def _initialize_batch(self):
         """
@@ -101,25 +167,33 @@ class BaseUsersUpdatesRetriever:
         self._initialize_batch()
         buffer = []
         changed_users = set()
-        all_changes_by_user = {}
+        # Column buffers for the cached DataFrame, filled as changes are generated
+        columns = {}
+        # Rows are grouped by user (in order of first appearance) in the cached DataFrame
+        user_order = {}
+        row_user_order = []
 
-        for _change in change_generator():
-            change = _change.to_dict()
-            change["batch_id"] = self.batch_id
-            buffer.append(change)
-            changed_users.add(change["userid"])
-            all_changes_by_user.setdefault(change["userid"], []).append(change)
-            if len(buffer) >= self.chunk_size:
-                self.bulk_inserter.bulk_insert_employee_field_changes(buffer)
-                buffer.clear()
+        # Chunks are inserted by a background thread while changes keep being generated
+        with BackgroundWriter(self.bulk_inserter.bulk_insert_employee_field_changes, name="field-changes-writer") as writer:
+            for _change in change_generator():
+                change = _change.to_dict()
+                change["batch_id"] = self.batch_id
+                buffer.append(change)
+                changed_users.add(change["userid"])
+                for column, value in change.items():
+                    columns.setdefault(column, []).append(value)
+                row_user_order.append(user_order.setdefault(change["userid"], len(user_order)))
+                if len(buffer) >= self.chunk_size:
+                    writer.submit(buffer)
+                    buffer = []
 
-        if buffer:
-            self.bulk_inserter.bulk_insert_employee_field_changes(buffer)
+            if buffer:
+                writer.submit(buffer)
 
-        df = pd.DataFrame(
-            [change for changes in all_changes_by_user.values() for change in changes]
-        )
+        df = pd.DataFrame(columns)
         if not df.empty:
+            if any(later < earlier for earlier, later in zip(row_user_order, row_user_order[1:])):
+                df = df.iloc[pd.Series(row_user_order).argsort(kind="stable")].reset_index(drop=True)
             df["ec_value"] = df["ec_value"].astype("string")
             df["pdm_value"] = df["pdm_value"].astype("string")
             df["field_name"] = df["field_name"].astype("string")
@@ -165,26 +239,18 @@ class BaseUsersUpdatesRetriever:
         is_im_user: bool
     ):
         """
-        Controls email updates by validating and deciding necessary actions using EmailValidator.
-        Yields FieldChange objects for each action.
+        Controls email updates using the decisions computed by prepare_contact_decisions
+        (insert, delete, update_type, primary). Yields FieldChange objects for each action.
         """
 
         if userid not in self._retrieve_vaild_email_users_ids():
             return  
 
-        resolver = EmailResolver()
-        
-        resolved = resolver.resolve_user_email(userid=userid,pdm_row= pdm_row, hr_global_users=self.hr_global_users, sap_email_data=self.sap_email_data_)
-        safe_row = pdm_row.copy()
-        safe_row["email"] = resolved["business_email"]
-        safe_row["private_email"] = resolved["private_email"]
-        validator = EmailValidator(
-            record=safe_row,
-            email_data=self.sap_email_data,
-            userid=userid
-        )
+        if userid not in self._email_decisions:
+            # Not prepared upfront: decide for this user alone
+            self._prepare_email_decisions(pd.DataFrame([pdm_row], index=[userid]))
 
-        decisions = validator.decide()  # structured dict with insert, delete, update_type, primary
+        decisions = self._email_decisions[userid]  # structured dict with insert, delete, update_type, primary
 
         # -------------------------
         # Insert emails
@@ -259,16 +325,14 @@ class BaseUsersUpdatesRetriever:
     
     def _control_phone_updates(self, userid: str, pdm_row: pd.Series, is_scm_user: bool, is_im_user: bool):
         """
-        Controls phone updates by validating and deciding necessary actions using PhoneValidator.
-        Yields FieldChange objects for each action.
+        Controls phone updates using the decisions computed by prepare_contact_decisions
+        (insert, delete, update_type, primary). Yields FieldChange objects for each action.
         """
-        validator = PhoneValidator(
-            record=pdm_row,
-            email_data=self.sap_email_data,
-            userid=userid
-        )
+        if userid not in self._phone_decisions:
+            # Not prepared upfront: decide for this user alone
+            self._prepare_phone_decisions(pd.DataFrame([pdm_row], index=[userid]))
 
-        decisions = validator.decide()  # structured dict with insert, delete, update_type, primary
+        decisions = self._phone_decisions[userid]  # structured dict with insert, delete, update_type, primary
 
         # -------------------------
         # Insert phones
@@ -1,6 +1,6 @@
 from utils.logger import get_logger
-from mapper.country_mapper import get_iso3_numeric
-from utils.date_converter import convert_to_unix_timestamp
+from mapper.country_mapper import get_iso3_numeric_column
+from utils.date_converter import convert_series_to_unix_timestamp
 
 logger = get_logger('pdm_data_converter')
 
@@ -25,13 +25,13 @@ def convert_pdm_data(pdm_data):
 
     for date_field in date_fields:
         if date_field in pdm_data.columns:
-            pdm_data[date_field] = pdm_data[date_field].apply(convert_to_unix_timestamp)
+            pdm_data[date_field] = convert_series_to_unix_timestamp(pdm_data[date_field])
 
     # Handle country code conversion for 'country' or 'country_code' field if exists
     if 'country' in pdm_data.columns:
-        pdm_data['country_iso3'] = pdm_data['country'].apply(get_iso3_numeric)
+        pdm_data['country_iso3'] = get_iso3_numeric_column(pdm_data['country'])
     elif 'country_code' in pdm_data.columns:
-        pdm_data['country_iso3'] = pdm_data['country_code'].apply(get_iso3_numeric)
+        pdm_data['country_iso3'] = get_iso3_numeric_column(pdm_data['country_code'])
 
     logger.info("Converted PDM date fields and country codes.")
     return pdm_data
\ No newline at end of file
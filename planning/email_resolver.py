@@ -1,7 +1,10 @@
 from cache.oracle_cache import OracleDataCache
 from config.excluded_users_emails import USERS_TO_BE_EXCLUDED
 from cache.sap_cache import SAPDataCache
+from cache.sap_contact_store import SAPContactStore
 from utils.logger import get_logger
+from functools import lru_cache
+import numpy as np
 import pandas as pd
 import hashlib
 
@@ -10,7 +13,7 @@ Logger = get_logger("email_resolver")
 class EmailResolver:
     """
     This class resolves the next:
-    1. Check if User has email in SAP data (self.sap_email_data)
+    1. Check if User has email in SAP data (contact_store)
     2. If yes, it check if email ends with @kn.com, 
         2.1 If yes then it's anonymized and shouldn't be updated
         2.2 If No then next step
@@ -32,59 +35,122 @@ class EmailResolver:
     def __init__(self):
         self.sap_cache = SAPDataCache()
         self.oracle_cache = OracleDataCache()
-        self.users_to_be_excluded = USERS_TO_BE_EXCLUDED
-        
-    def resolve_user_email(self, userid: str, pdm_row: pd.Series, hr_global_users:set, sap_email_data: pd.DataFrame) -> dict:
+        # Convert from list of int to set of str (once, not per resolved user)
+        self.users_to_be_excluded = EmailResolver._excluded_user_ids()
+
+    @staticmethod
+    @lru_cache(maxsize=1)
+    def _excluded_user_ids() -> frozenset:
+        return frozenset(str(uid).strip() for uid in USERS_TO_BE_EXCLUDED)
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def anonymize(uid: str) -> str:
+        """Anonymized address of a user, memoized (the MD5 of a user id never changes)."""
+        hash_value = hashlib.md5(uid.encode()).hexdigest()
+        return f"user{hash_value}@kn.com"
+
+    @staticmethod
+    def _build_sap_primary_emails(store: SAPContactStore) -> dict:
+        """
+        First SAP primary ('Y') email address per person id, in table order.
+        Keys are the person ids as stored in SAP: the lowercased PDM user id must match them
+        exactly. A missing (None/NaN) or empty address is stored as None, i.e. no SAP email.
+        """
+        primary_emails = {}
+        for rows in store.persons().values():
+            for row in rows:
+                if row['isprimary'] == 'Y':
+                    address = row['emailaddress']
+                    primary_emails.setdefault(
+                        row['personidexternal'], address if isinstance(address, str) and address else None
+                    )
+        return primary_emails
+
+    def _sap_primary_emails(self, contact_store: SAPContactStore) -> dict:
+        return contact_store.get_derived("primary_emails", self._build_sap_primary_emails)
+
+    def resolve_emails(self, pdm_data: pd.DataFrame, hr_global_users: set, contact_store: SAPContactStore) -> pd.DataFrame:
+        """
+        Resolves the safe emails of all users of a PDM DataFrame in one vectorized pass.
+
+        Args:
+            pdm_data (pd.DataFrame): PDM rows; user ids are read from the 'userid' column, or the index if absent
+            hr_global_users (set): Lowercased user ids of HR Global users
+            contact_store (SAPContactStore): SAP email data (peremail_df) grouped per person
+
+        Returns:
+            pd.DataFrame: business_email and private_email columns, one row per PDM row,
+            indexed by the normalized (stripped, lowercased) user id
+        """
+        raw_ids = pdm_data["userid"] if "userid" in pdm_data.columns else pdm_data.index.to_series()
+        user_ids = raw_ids.astype(str).str.strip().str.lower().to_numpy(dtype=object)
+
+        def pdm_column(name):
+            if name in pdm_data.columns:
+                return pdm_data[name].to_numpy(dtype=object)
+            return np.full(len(pdm_data), None, dtype=object)
+
+        pdm_email = pdm_column("email")
+        private_email = pdm_column("private_email")
+
+        allowed_ids = set(hr_global_users) | self.users_to_be_excluded
+        is_allowed_real_email = np.array([uid in allowed_ids for uid in user_ids], dtype=bool)
+
+        primary_emails = self._sap_primary_emails(contact_store)
+        sap_email = np.array([primary_emails.get(uid) for uid in user_ids], dtype=object)
+        sap_email_lower = pd.Series(sap_email, dtype=object).str.lower()
+        # SAP primary already anonymized -> kept as is
+        sap_anonymized = sap_email_lower.str.endswith('@kn.com').fillna(False).astype(bool).to_numpy()
+        # SAP primary real email -> used for non allowed users instead of the anonymized one
+        use_sap_email = (~sap_anonymized) & np.array([email is not None for email in sap_email], dtype=bool)
+
+        anonymized = np.array([self.anonymize(uid) for uid in user_ids], dtype=object)
+        business_email = np.where(
+            sap_anonymized, sap_email,
+            np.where(
+                is_allowed_real_email, pdm_email,
+                np.where(use_sap_email, sap_email_lower.to_numpy(dtype=object), anonymized)
+            )
+        )
+        resolved_private = np.where(
+            sap_anonymized, None,
+            np.where(is_allowed_real_email, private_email, anonymized)
+        )
+        sap_used = int((use_sap_email & ~is_allowed_real_email).sum())
+        if sap_used:
+            Logger.info(f"Using SAP email for {sap_used} users")
+
+        return pd.DataFrame(
+            {"business_email": business_email, "private_email": resolved_private},
+            index=pd.Index(user_ids, name="userid"),
+            dtype=object,
+        )
+
+    def resolve_user_email(self, userid: str, pdm_row: pd.Series, hr_global_users:set, contact_store: SAPContactStore) -> dict:
         """
-        Returns safe emails for the user:
+        Returns safe emails for the user (single-user path of resolve_emails, same rules):
         {
             "business_email": str | None,
             "private_email": str | None
         }
         """
-        user_id = userid.strip().lower()
-        pdm_email = pdm_row.get("email")
-        private_email = pdm_row.get("private_email")
-        # Convert from list of int to list of str
-        self.users_to_be_excluded = set(str(uid).strip() for uid in self.users_to_be_excluded)
-
-        is_allowed_real_email = (
-            user_id in hr_global_users
-            or user_id in self.users_to_be_excluded
-        )
-        sap_user_emails = sap_email_data[sap_email_data['personidexternal'] == user_id]
-        primary = sap_user_emails[sap_user_emails['isprimary'] == 'Y']
-        if not primary.empty:
-            sap_email = primary.iloc[0]['emailaddress']
-            if sap_email.lower().endswith('@kn.com'):
-                return {
-                    "business_email": sap_email,
-                    "private_email": None
-                }
-        def anonymize(uid):
-            hash_value = hashlib.md5(uid.encode()).hexdigest()
-            return f"user{hash_value}@kn.com"
-        # Default: anonymize
-        resolved_business = anonymize(user_id)
-        resolved_private = anonymize(user_id)
-
-        # If allowed → use PDM values
-        if is_allowed_real_email:
+        user_id = str(userid).strip().lower()
+        sap_email = self._sap_primary_emails(contact_store).get(user_id)
+
+        # SAP primary already anonymized -> kept as is
+        if sap_email and sap_email.lower().endswith('@kn.com'):
+            return {"business_email": sap_email, "private_email": None}
+
+        if user_id in hr_global_users or user_id in self.users_to_be_excluded:
             return {
-                "business_email": pdm_email,
-                "private_email": private_email
+                "business_email": pdm_row.get("email"),
+                "private_email": pdm_row.get("private_email"),
             }
 
-        # If SAP has a non-anonymized primary email, allow it
-        if sap_email_data is not None and not sap_email_data.empty:
-            sap_user_emails = sap_email_data[sap_email_data['personidexternal'] == user_id]
-            primary = sap_user_emails[sap_user_emails['isprimary'] == 'Y']
-            if not primary.empty:
-                sap_email = primary.iloc[0]['emailaddress']
-                if sap_email and not sap_email.lower().endswith('@kn.com'):
-                    resolved_business = sap_email.lower()
-                    Logger.info(f"Using SAP email for user {userid}: {resolved_business}")
-        return {
-            "business_email": resolved_business,
-            "private_email": resolved_private
-        }
\ No newline at end of file
+        anonymized = self.anonymize(user_id)
+        if sap_email:
+            # SAP primary real email -> used instead of the anonymized one
+            Logger.info(f"Using SAP email for user {userid}")
+            return {"business_email": sap_email.lower(), "private_email": anonymized}
+        return {"business_email": anonymized, "private_email": anonymized}
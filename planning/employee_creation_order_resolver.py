@@ -1,6 +1,6 @@
 from utils.logger import get_logger
-from typing import Dict, List, Set, Tuple
-from collections import defaultdict, deque
+from typing import Dict, List, Set
+import numpy as np
 import pandas as pd
 
 logger = get_logger("employee_creation_order_resolver")
@@ -9,7 +9,8 @@ logger = get_logger("employee_creation_order_resolver")
 class EmployeeCreationOrderResolver:
     """
     Resolves the creation order for new employees based on HARD dependencies.
-    Uses level-based topological sorting (Kahn’s algorithm).
+    Uses level-based topological sorting (Kahn’s algorithm) on a graph built once
+    from integer-encoded employee ids.
 
     HARD dependencies:
       - manager
@@ -19,7 +20,7 @@ class EmployeeCreationOrderResolver:
       - hr
 
     Enhancements:
-      - Detects real cycle groups using SCC (Tarjan algorithm)
+      - Detects real cycle groups using SCC (iterative Tarjan algorithm)
       - Provides separate circular dependency groups (only hard deps)
     """
 
@@ -52,6 +53,16 @@ class EmployeeCreationOrderResolver:
             else set()
         )
 
+        # Employees encoded as integer ids (rows of the same userid share one id)
+        self._codes, self._ids = (
+            pd.factorize(self.new_employees["userid"])
+            if not self.new_employees.empty
+            else (np.array([], dtype=np.int64), pd.Index([]))
+        )
+        self._codes = self._codes.astype(np.int64)
+        self._ids = pd.Index(self._ids)
+        self._graph = None
+
         # This is IMPORTANT: we store soft dependency candidates here
         # so downstream pipeline can decide to defer HR relationship updates.
         self.hr_retry_candidates: Set[str] = set()
@@ -60,154 +71,177 @@ class EmployeeCreationOrderResolver:
     # Dependency extraction
     # -------------------------------------------------------------------------
 
-    def _extract_hard_dependencies(self, row) -> Set[str]:
+    def _encode_dependencies(self, field: str) -> np.ndarray:
         """
-        Extract HARD dependencies for a single employee.
-        HARD deps affect ordering.
+        Integer id (position in self._ids) of the NEW employee referenced by `field`, per row.
+        -1 when there is no dependency.
 
         A dependency exists only if:
           - The dependency userid is also a NEW employee
           - The dependency is not self
         """
-        deps = set()
-
-        for field in self.HARD_DEPENDENCY_FIELDS:
-            if not hasattr(row, field):
-                continue
-
-            value = getattr(row, field)
-            if pd.isna(value) or value in ("", "None", None):
-                continue
-
-            dep_id = str(value).lower()
-
-            if dep_id in self.new_ids and dep_id != row.userid:
-                deps.add(dep_id)
-
-        return deps
-
-    def _extract_soft_hr_dependency(self, row) -> str | None:
-        """
-        Extract HR dependency (soft).
-        This does NOT block ordering, but if HR points to a NEW employee,
-        then this user needs HR retry later.
-        """
-        if not hasattr(row, "hr"):
-            return None
-
-        value = getattr(row, "hr")
-        if pd.isna(value) or value in ("", "None", None):
-            return None
-
-        hr_id = str(value).lower()
+        if field not in self.new_employees.columns:
+            return np.full(len(self.new_employees), -1, dtype=np.int64)
 
-        if hr_id in self.new_ids and hr_id != row.userid:
-            return hr_id
-
-        return None
+        values = self.new_employees[field]
+        present = (values.notna() & ~values.isin(["", "None"])).to_numpy(dtype=bool)
+        dep_codes = self._ids.get_indexer(values.astype(str).str.lower()).astype(np.int64)
+        dep_codes[~present] = -1
+        dep_codes[dep_codes == self._codes] = -1
+        return dep_codes
 
     # -------------------------------------------------------------------------
     # Graph build (HARD deps only)
     # -------------------------------------------------------------------------
 
-    def _build_graph(self) -> Tuple[Dict[str, Set[str]], Dict[str, int]]:
+    def _build_graph(self) -> dict:
         """
-        Build adjacency graph and in-degree map for Kahn sorting.
-
-        graph[A] = {B, C} means A must be created before B and C.
+        Build the HARD dependency graph once, on integer employee ids:
+        dependents of a node in CSR form (indptr/dependents: node A must be created before
+        dependents[indptr[A]:indptr[A + 1]]) and the in-degree of every node.
+        Also collects the HR retry candidates (HR points to another NEW employee).
         """
-        graph: Dict[str, Set[str]] = defaultdict(set)
-        in_degree: Dict[str, int] = {uid: 0 for uid in self.new_ids}
-
-        for row in self.new_employees.itertuples(index=False):
-            hard_deps = self._extract_hard_dependencies(row)
-            in_degree[row.userid] = len(hard_deps)
-
-            for dep in hard_deps:
-                graph[dep].add(row.userid)
+        if self._graph is not None:
+            return self._graph
 
-            # Track HR retry candidates
-            hr_dep = self._extract_soft_hr_dependency(row)
-            if hr_dep is not None:
-                self.hr_retry_candidates.add(row.userid)
+        node_count = len(self._ids)
+        sources, targets = [], []
+        for field in self.HARD_DEPENDENCY_FIELDS:
+            dep_codes = self._encode_dependencies(field)
+            has_dep = dep_codes >= 0
+            sources.append(dep_codes[has_dep])
+            targets.append(self._codes[has_dep])
+        edges = np.stack([np.concatenate(sources), np.concatenate(targets)], axis=1)
+        # The same dependency through manager and matrix_manager counts once
+        edges = np.unique(edges, axis=0) if len(edges) else edges
+
+        dependency, dependent = edges[:, 0], edges[:, 1]
+        indptr = np.zeros(node_count + 1, dtype=np.int64)
+        np.cumsum(np.bincount(dependency, minlength=node_count), out=indptr[1:])
+        self._graph = {
+            "indptr": indptr,
+            # np.unique sorted the edges by dependency already
+            "dependents": dependent,
+            "in_degree": np.bincount(dependent, minlength=node_count),
+        }
 
-        return graph, in_degree
+        hr_codes = self._encode_dependencies("hr")
+        needs_hr_retry = np.zeros(node_count, dtype=bool)
+        needs_hr_retry[self._codes[hr_codes >= 0]] = True
+        self._graph["needs_hr_retry"] = needs_hr_retry
+        self.hr_retry_candidates = set(self._ids[needs_hr_retry].tolist())
+        return self._graph
 
-    def _build_dependency_map(self) -> Dict[str, Set[str]]:
+    def _compute_levels(self) -> np.ndarray:
         """
-        Build a dependency map (HARD deps only):
-
-        deps_map[uid] = {manager_uid, matrix_uid}
-
-        This is used for SCC cycle detection.
+        Creation level of every node (Kahn's algorithm, level by level): 0 without HARD
+        dependencies, else one more than the deepest dependency. -1 for nodes in or behind a cycle.
         """
-        deps_map: Dict[str, Set[str]] = {uid: set() for uid in self.new_ids}
-
-        for row in self.new_employees.itertuples(index=False):
-            deps_map[row.userid] = self._extract_hard_dependencies(row)
+        graph = self._build_graph()
+        indptr = graph["indptr"].tolist()
+        dependents = graph["dependents"].tolist()
+        in_degree = graph["in_degree"].tolist()
+        levels = [-1] * len(in_degree)
+
+        frontier = [node for node, degree in enumerate(in_degree) if degree == 0]
+        level = 0
+        while frontier:
+            next_frontier = []
+            for node in frontier:
+                levels[node] = level
+                for dependent in dependents[indptr[node]:indptr[node + 1]]:
+                    in_degree[dependent] -= 1
+                    if in_degree[dependent] == 0:
+                        next_frontier.append(dependent)
+            frontier = next_frontier
+            level += 1
 
-        return deps_map
+        return np.array(levels, dtype=np.int64)
 
     # -------------------------------------------------------------------------
     # Cycle detection (HARD deps only)
     # -------------------------------------------------------------------------
 
-    def _find_cycle_groups(self) -> List[List[str]]:
+    def _strongly_connected_components(self, nodes: np.ndarray) -> List[List[int]]:
         """
-        Finds real circular dependency groups using Tarjan SCC.
-
-        Returns:
-            List of SCC groups where size > 1 (real cycles)
-            or size == 1 with a self-loop.
+        Iterative Tarjan SCC over the subgraph of the given nodes (no recursion, so long
+        manager chains do not hit the recursion limit).
         """
-        deps_map = self._build_dependency_map()
+        graph = self._build_graph()
+        indptr, dependents = graph["indptr"].tolist(), graph["dependents"].tolist()
+        in_subgraph = np.zeros(len(self._ids), dtype=bool)
+        in_subgraph[nodes] = True
+        in_subgraph = in_subgraph.tolist()
+
+        def neighbors(v: int) -> List[int]:
+            return [w for w in dependents[indptr[v]:indptr[v + 1]] if in_subgraph[w]]
 
         index = 0
-        stack: List[str] = []
-        on_stack: Set[str] = set()
-        indices: Dict[str, int] = {}
-        lowlink: Dict[str, int] = {}
-        sccs: List[List[str]] = []
-
-        def strongconnect(v: str):
-            nonlocal index
-            indices[v] = index
-            lowlink[v] = index
+        indices = [-1] * len(in_subgraph)
+        lowlink = [0] * len(in_subgraph)
+        on_stack = [False] * len(in_subgraph)
+        stack: List[int] = []
+        sccs: List[List[int]] = []
+
+        for root in nodes.tolist():
+            if indices[root] >= 0:
+                continue
+            indices[root] = lowlink[root] = index
             index += 1
-
-            stack.append(v)
-            on_stack.add(v)
-
-            for w in deps_map.get(v, set()):
-                if w not in indices:
-                    strongconnect(w)
-                    lowlink[v] = min(lowlink[v], lowlink[w])
-                elif w in on_stack:
-                    lowlink[v] = min(lowlink[v], indices[w])
-
-            if lowlink[v] == indices[v]:
-                scc = []
-                while True:
-                    w = stack.pop()
-                    on_stack.remove(w)
-                    scc.append(w)
-                    if w == v:
+            stack.append(root)
+            on_stack[root] = True
+            work = [(root, iter(neighbors(root)))]
+
+            while work:
+                v, pending = work[-1]
+                descended = False
+                for w in pending:
+                    if indices[w] < 0:
+                        indices[w] = lowlink[w] = index
+                        index += 1
+                        stack.append(w)
+                        on_stack[w] = True
+                        work.append((w, iter(neighbors(w))))
+                        descended = True
                         break
-                sccs.append(scc)
+                    if on_stack[w]:
+                        lowlink[v] = min(lowlink[v], indices[w])
+                if descended:
+                    continue
+
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[v])
 
-        for uid in self.new_ids:
-            if uid not in indices:
-                strongconnect(uid)
+                if lowlink[v] == indices[v]:
+                    scc = []
+                    while True:
+                        w = stack.pop()
+                        on_stack[w] = False
+                        scc.append(w)
+                        if w == v:
+                            break
+                    sccs.append(scc)
 
-        cycle_groups = []
-        for group in sccs:
-            if len(group) > 1:
-                cycle_groups.append(sorted(group))
-            elif len(group) == 1:
-                u = group[0]
-                if u in deps_map.get(u, set()):
-                    cycle_groups.append([u])
+        return sccs
+
+    def _find_cycle_groups(self) -> List[List[str]]:
+        """
+        Finds real circular dependency groups using Tarjan SCC.
 
+        Returns:
+            List of SCC groups where size > 1 (real cycles).
+            Self references are not dependencies, so there are no single-node cycles.
+        """
+        # Cycle members never get a level; nodes that did cannot be part of a cycle
+        unresolved = np.flatnonzero(self._compute_levels() < 0)
+
+        cycle_groups = [
+            sorted(self._ids[group].tolist())
+            for group in self._strongly_connected_components(unresolved)
+            if len(group) > 1
+        ]
         cycle_groups.sort(key=len, reverse=True)
         return cycle_groups
 
@@ -227,41 +261,29 @@ class EmployeeCreationOrderResolver:
         if self.new_employees.empty:
             return []
 
-        graph, original_in_degree = self._build_graph()
-        in_degree = original_in_degree.copy()
-
-        queue = deque(uid for uid, deg in in_degree.items() if deg == 0)
-        processed: Set[str] = set()
+        graph = self._build_graph()
+        # Creation level of every row, computed once; batches are the rows of each level
+        levels = self._compute_levels()
+        row_levels = levels[self._codes]
+        needs_hr_retry = graph["needs_hr_retry"][self._codes]
         batches: List[pd.DataFrame] = []
 
-        while queue:
-            level_size = len(queue)
-            current_batch_ids = []
-
-            for _ in range(level_size):
-                uid = queue.popleft()
-                processed.add(uid)
-                current_batch_ids.append(uid)
-
-                for dependent in graph.get(uid, []):
-                    in_degree[dependent] -= 1
-                    if in_degree[dependent] == 0:
-                        queue.append(dependent)
-
-            batch_df = self.new_employees[
-                self.new_employees["userid"].isin(current_batch_ids)
-            ].copy()
-
+        # Rows sorted once by level (stable, so frame order within a level); each batch is a slice
+        resolved = np.flatnonzero(row_levels >= 0)
+        order = resolved[np.argsort(row_levels[resolved], kind="stable")]
+        by_level = self.new_employees.iloc[order]
+        if "needs_hr_retry" not in by_level.columns:
             # Mark HR retry candidates in the batch df (super useful downstream)
-            if "needs_hr_retry" not in batch_df.columns:
-                batch_df["needs_hr_retry"] = batch_df["userid"].isin(
-                    self.hr_retry_candidates
-                )
-
-            batches.append(batch_df)
-
-        remaining = self.new_ids - processed
-        if remaining:
+            by_level = by_level.assign(needs_hr_retry=needs_hr_retry[order])
+        bounds = np.flatnonzero(np.diff(row_levels[order])) + 1
+        for start, end in zip(np.r_[0, bounds], np.r_[bounds, len(order)]):
+            if end > start:
+                batches.append(by_level.iloc[start:end].copy())
+
+        unresolved = np.flatnonzero(row_levels < 0)
+        if len(unresolved):
+            positions = unresolved
+            remaining = set(self._ids[levels < 0].tolist())
             cycle_groups = self._find_cycle_groups()
 
             logger.warning(
@@ -276,28 +298,21 @@ class EmployeeCreationOrderResolver:
                 "Manager/matrix references referencing cycle members will be temporarily cleared"
             )
 
-            cycle_df = self.new_employees[
-                self.new_employees["userid"].isin(remaining)
-            ].copy()
+            cycle_df = self.new_employees.iloc[positions].copy()
 
             # Only clear HARD dependency fields (NOT HR!)
             for field in self.HARD_DEPENDENCY_FIELDS:
                 if field not in cycle_df.columns:
                     continue
 
-                cycle_df[field] = cycle_df.apply(
-                    lambda r: None
-                    if pd.notna(r[field])
-                    and str(r[field]).lower() in remaining
-                    else r[field],
-                    axis=1,
-                )
+                # References to a cycle member (or to a user behind a cycle), self references included
+                referenced = self._ids.get_indexer(cycle_df[field].astype(str).str.lower())
+                references_cycle = cycle_df[field].notna().to_numpy() & (referenced >= 0) & (levels[referenced] < 0)
+                cycle_df[field] = cycle_df[field].astype(object).mask(references_cycle, None).infer_objects()
 
             # Mark HR retry candidates
             if "needs_hr_retry" not in cycle_df.columns:
-                cycle_df["needs_hr_retry"] = cycle_df["userid"].isin(
-                    self.hr_retry_candidates
-                )
+                cycle_df["needs_hr_retry"] = needs_hr_retry[positions]
 
             batches.append(cycle_df)
 
@@ -326,48 +341,40 @@ class EmployeeCreationOrderResolver:
                 "hr_retry_candidate_count": 0,
             }
 
-        graph, in_degree = self._build_graph()
-
-        no_deps = sum(1 for d in in_degree.values() if d == 0)
+        graph = self._build_graph()
+        levels = self._compute_levels()
 
-        queue = deque(uid for uid, deg in in_degree.items() if deg == 0)
-        processed: Set[str] = set()
-
-        while queue:
-            uid = queue.popleft()
-            processed.add(uid)
-
-            for dependent in graph.get(uid, []):
-                in_degree[dependent] -= 1
-                if in_degree[dependent] == 0:
-                    queue.append(dependent)
-
-        hard_cycles = self.new_ids - processed
+        no_deps = int((graph["in_degree"] == 0).sum())
+        hard_cycles = set(self._ids[levels < 0].tolist())
 
         hard_cycle_groups = self._find_cycle_groups()
         hard_cycle_userids = sorted(list(hard_cycles))
 
-        # Missing HARD dependencies only
+        # Missing HARD dependencies only (neither a new nor an existing employee), in row order
+        missing_parts = []
+        existing_ids = pd.Index(sorted(self.existing_ids))
+        for field_order, field in enumerate(self.HARD_DEPENDENCY_FIELDS):
+            if field not in self.new_employees.columns:
+                continue
+            values = self.new_employees[field]
+            dep_ids = values.astype(str).str.lower()
+            is_missing = (
+                (values.notna() & ~values.isin(["", "None"])).to_numpy(dtype=bool)
+                & (self._ids.get_indexer(dep_ids) < 0)
+                & (existing_ids.get_indexer(dep_ids) < 0)
+            )
+            positions = np.flatnonzero(is_missing)
+            missing_parts.append(pd.DataFrame({
+                "position": positions,
+                "field_order": field_order,
+                "userid": self.new_employees["userid"].to_numpy()[positions],
+                "field": field,
+                "missing_dependency": dep_ids.to_numpy()[positions],
+            }))
         missing = []
-        for row in self.new_employees.itertuples(index=False):
-            for field in self.HARD_DEPENDENCY_FIELDS:
-                if not hasattr(row, field):
-                    continue
-
-                value = getattr(row, field)
-                if pd.isna(value) or value in ("", "None", None):
-                    continue
-
-                dep_id = str(value).lower()
-
-                if dep_id not in self.new_ids and dep_id not in self.existing_ids:
-                    missing.append(
-                        {
-                            "userid": row.userid,
-                            "field": field,
-                            "missing_dependency": dep_id,
-                        }
-                    )
+        if missing_parts:
+            missing_df = pd.concat(missing_parts).sort_values(["position", "field_order"], kind="stable")
+            missing = missing_df[["userid", "field", "missing_dependency"]].to_dict("records")
 
         return {
             "total_new_employees": len(self.new_ids),
@@ -91,7 +91,8 @@ class StandardUsersUpdatesRetriever(BaseUsersUpdatesRetriever):
                         is_im_user=False
                     )
 
-            # Email logic stays per user since it has many sap rules behind for each user
+            # Contact decisions are computed for all users at once, then emitted per user
+            self.prepare_contact_decisions(pdm_common)
             for userid in common_users:
                 yield from self._control_email_updates(
                     userid=userid,
@@ -99,7 +99,8 @@ class SCM_IM_UpdatesRetriever(BaseUsersUpdatesRetriever):
                         is_im_user=userid in im_users
                     )
 
-            # Email logic stays per user since it has many sap rules behind for each user
+            # Contact decisions are computed for all users at once, then emitted per user
+            self.prepare_contact_decisions(pdm_common, include_phones=True)
             for userid in common_users:
                 yield from self._control_email_updates(
                     userid=userid,
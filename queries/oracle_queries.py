@@ -198,3 +198,40 @@ extract_pdm_inactive_records_query = """
                 AND DATE_OF_LEAVE <= TRUNC(SYSDATE)
                 AND ADD_MONTHS(DATE_OF_LEAVE, 60) >= TRUNC(SYSDATE)
             """
+
+# Incremental PDM extraction: ORA_ROWSCN is used as the change watermark
+extract_pdm_max_scn_query = """
+                SELECT MAX(ORA_ROWSCN) AS MAX_SCN
+                FROM STAGING.M_HR_PERSON_V2
+            """
+
+# Users whose own PDM row changed, whose direct/matrix/HR manager row changed
+# (the manager start dates and the manager columns are read from the manager rows),
+# or the direct managers of changed rows (a manager qualifies through the IM flag of a report,
+# see the imlookup join). ORA_ROWSCN only sees rows that still exist, with their current values:
+# deleted rows and a report moved away from its previous manager are only picked up by the
+# periodic full extraction (see CacheDataExtractor).
+extract_pdm_changed_userids_query = """
+                WITH changed AS (
+                    SELECT PDM_UID, DIS_PDM_UID
+                    FROM STAGING.M_HR_PERSON_V2
+                    WHERE ORA_ROWSCN > {since_scn}
+                )
+                SELECT TO_CHAR(PDM_UID) AS USERID FROM changed
+                UNION
+                SELECT TO_CHAR(DIS_PDM_UID) AS USERID FROM changed
+                WHERE DIS_PDM_UID IS NOT NULL
+                UNION
+                SELECT TO_CHAR(MHP.PDM_UID) AS USERID
+                FROM STAGING.M_HR_PERSON_V2 MHP
+                WHERE MHP.DIS_PDM_UID IN (SELECT PDM_UID FROM changed)
+                   OR MHP.TEC_PDM_UID IN (SELECT PDM_UID FROM changed)
+                   OR MHP.HRRES_PDM_UID IN (SELECT PDM_UID FROM changed)
+            """
+
+# PDM records of a list of users only: the ids are bound once as a SYS.ODCIVARCHAR2LIST collection
+# (:user_ids) and filtered in the outer query, so base_query still sees every active user
+# (manager columns) while the per-user joins only run for the requested users
+extract_pdm_records_for_user_ids_query = extract_pdm_records_query.rstrip() + """
+  AND MHP.PDM_UID IN (SELECT COLUMN_VALUE FROM TABLE(:user_ids))
+"""
@@ -0,0 +1,94 @@
+"""
+Benchmark of the bulk load paths of BulkInsertEmployeeFieldChanges: 'insert' (execute_values)
+against 'copy' (COPY into a staging table + one merge statement).
+
+Both paths load the same synthetic field changes into a scratch copy of employee_field_changes
+(CREATE TABLE ... (LIKE ... INCLUDING ALL): no batch foreign key, ids drawn from the source
+table sequence), dropped at the end, so the pipeline tables are never written. Each size is
+loaded into an empty table, best of --repeat runs per path.
+
+Usage:
+    python -m test.benchmark_bulk_load
+    python -m test.benchmark_bulk_load --rows 1000 10000 100000 --repeat 3
+"""
+
+import argparse
+import time
+import uuid
+
+from config.db import postgres_url
+from config.tables_names import regular_field_changes_tables
+from db.psycopg2_connection import Psycopg2DatabaseConnection
+from loader.bulk_insert_employee_field_changes import BulkInsertEmployeeFieldChanges
+from utils.logger import get_logger
+
+logger = get_logger('benchmark_bulk_load')
+
+
+def build_field_changes(row_count: int) -> list:
+    """Synthetic field changes: one batch, 5 fields per user, some NULL EC values."""
+    batch_id = str(uuid.uuid4())
+    fields = ['email', 'firstname', 'lastname', 'manager', 'jobcode']
+    return [
+        {
+            "batch_id": batch_id,
+            "userid": str(100000 + i // len(fields)),
+            "field_name": fields[i % len(fields)],
+            "ec_value": None if i % 7 == 0 else f"old value {i}",
+            "pdm_value": f"new value {i}",
+        }
+        for i in range(row_count)
+    ]
+
+
+def run_statement(postgres_connector, statement: str):
+    connection = postgres_connector.get_postgres_db_connection()
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(statement)
+        connection.commit()
+    finally:
+        connection.close()
+
+
+def benchmark(row_counts: list, repeat: int):
+    postgres_connector = Psycopg2DatabaseConnection(postgres_url)
+    source_table = regular_field_changes_tables['employee_field_changes']
+    scratch_table = f"{source_table}_bench_{uuid.uuid4().hex[:8]}"
+    table_names = {**regular_field_changes_tables, 'employee_field_changes': scratch_table}
+
+    run_statement(postgres_connector, f"CREATE TABLE {scratch_table} (LIKE {source_table} INCLUDING ALL)")
+    results = []
+    try:
+        for row_count in row_counts:
+            buffer = build_field_changes(row_count)
+            timings = {}
+            for load_method in ('insert', 'copy'):
+                loader = BulkInsertEmployeeFieldChanges(postgres_connector, table_names, load_method=load_method)
+                best = None
+                for _ in range(repeat):
+                    run_statement(postgres_connector, f"TRUNCATE {scratch_table}")
+                    start = time.perf_counter()
+                    loader.bulk_insert_employee_field_changes(buffer)
+                    elapsed = time.perf_counter() - start
+                    best = elapsed if best is None else min(best, elapsed)
+                timings[load_method] = best
+            results.append((row_count, timings['insert'], timings['copy']))
+    finally:
+        run_statement(postgres_connector, f"DROP TABLE IF EXISTS {scratch_table}")
+
+    logger.info(f"{'rows':>10} {'insert (s)':>12} {'copy (s)':>12} {'speedup':>8}")
+    for row_count, insert_time, copy_time in results:
+        logger.info(
+            f"{row_count:>10} {insert_time:>12.3f} {copy_time:>12.3f} "
+            f"{insert_time / copy_time if copy_time else 0:>7.1f}x"
+        )
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    benchmark(args.rows, args.repeat)
@@ -0,0 +1,93 @@
+"""
+Benchmark of the PDM date conversion: Series.apply(convert_to_unix_timestamp) against the
+vectorized convert_series_to_unix_timestamp.
+
+Synthetic PDM frame with the six date columns of convert_pdm_data: each column mostly holds one
+DATE_FORMATS entry, with some values in other formats, missing values and garbage. Both paths
+convert the same frame and must give identical columns; best of --repeat runs per path.
+
+Usage:
+    python -m test.benchmark_date_conversion
+    python -m test.benchmark_date_conversion --rows 1000 10000 100000 --repeat 3
+"""
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from utils.date_converter import DATE_FORMATS, convert_series_to_unix_timestamp, convert_to_unix_timestamp
+from utils.logger import get_logger
+
+logger = get_logger('benchmark_date_conversion')
+
+DATE_COLUMNS = [
+    'date_of_birth',
+    'date_of_hire',
+    'date_of_position',
+    'hr_position_start_date',
+    'matrix_manager_position_start_date',
+    'manager_position_start_date',
+]
+
+
+def build_pdm_dates(row_count: int, seed: int = 7) -> pd.DataFrame:
+    """Six date columns, 90% in the column's main format, the rest mixed / missing / invalid."""
+    rng = random.Random(seed)
+    start = datetime(1950, 1, 1)
+    columns = {}
+    for i, column in enumerate(DATE_COLUMNS):
+        main_format = DATE_FORMATS[i % len(DATE_FORMATS)]
+        values = []
+        for _ in range(row_count):
+            moment = start + timedelta(days=rng.randrange(75 * 365))
+            draw = rng.random()
+            if draw < 0.9:
+                values.append(moment.strftime(main_format))
+            elif draw < 0.95:
+                values.append(moment.strftime(rng.choice(DATE_FORMATS)))
+            elif draw < 0.99:
+                values.append(None)
+            else:
+                values.append("n/a")
+        columns[column] = pd.Series(values, dtype=object)
+    return pd.DataFrame(columns)
+
+
+def best_time(convert, df: pd.DataFrame, repeat: int):
+    best, converted = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        converted = {column: convert(df[column]) for column in DATE_COLUMNS}
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, converted
+
+
+def benchmark(row_counts: list, repeat: int):
+    results = []
+    for row_count in row_counts:
+        df = build_pdm_dates(row_count)
+        apply_time, expected = best_time(lambda dates: dates.apply(convert_to_unix_timestamp), df, repeat)
+        vectorized_time, converted = best_time(convert_series_to_unix_timestamp, df, repeat)
+        for column in DATE_COLUMNS:
+            pd.testing.assert_series_equal(converted[column], expected[column])
+        results.append((row_count, apply_time, vectorized_time))
+
+    logger.info(f"{'rows':>10} {'apply (s)':>12} {'vectorized (s)':>15} {'speedup':>8}")
+    for row_count, apply_time, vectorized_time in results:
+        logger.info(
+            f"{row_count:>10} {apply_time:>12.3f} {vectorized_time:>15.3f} "
+            f"{apply_time / vectorized_time if vectorized_time else 0:>7.1f}x"
+        )
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    benchmark(args.rows, args.repeat)
@@ -0,0 +1,91 @@
+"""
+Unit tests for APIClient pagination: __next links (iter_pages) and concurrent $skip/$top
+pages (iter_pages_partitioned). Requests are answered from an in-memory OData entity set.
+"""
+
+import random
+import threading
+import time
+
+import pytest
+
+from api.api_client import APIClient
+
+RECORDS = [{"userId": f"u{i:04d}"} for i in range(2345)]
+
+
+class FakeODataClient(APIClient):
+    def __init__(self, records, with_count=True, jitter=False):
+        super().__init__("https://sap.example")
+        self.records = records
+        self.with_count = with_count
+        self.jitter = jitter
+        self.requests = []
+        self._lock = threading.Lock()
+
+    def _request_with_retry(self, method, url, slot=None, params=None, **kwargs):
+        with self._lock:
+            self.requests.append((url, dict(params or {})))
+        if self.jitter:
+            # Concurrent pages complete out of order
+            time.sleep(random.uniform(0, 0.005))
+        if "skiptoken=" in url:
+            skip = int(url.rsplit("=", 1)[1])
+            top = 1000
+        else:
+            skip, top = int(params.get("$skip", 0)), int(params.get("$top", 1000))
+        page = self.records[skip:skip + top]
+        d = {"results": page}
+        if params and params.get("$inlinecount") == "allpages" and self.with_count:
+            d["__count"] = str(len(self.records))
+        if skip + top < len(self.records):
+            d["__next"] = f"{self.base_url}/odata/v2/User?$skiptoken={skip + top}"
+        return {"d": d}
+
+
+def test_iter_pages_follows_next_links():
+    client = FakeODataClient(RECORDS)
+
+    pages = list(client.iter_pages("/odata/v2/User", params={"$top": 1000}))
+
+    assert [len(page) for page in pages] == [1000, 1000, 345]
+    assert [record for page in pages for record in page] == RECORDS
+
+
+def test_partitioned_pages_are_yielded_in_skip_order():
+    client = FakeODataClient(RECORDS, jitter=True)
+
+    pages = list(client.iter_pages_partitioned(
+        "/odata/v2/User", params={"$orderby": "userId"}, page_size=100, max_workers=4
+    ))
+
+    assert [record for page in pages for record in page] == RECORDS
+    skips = sorted(params["$skip"] for _, params in client.requests)
+    assert skips == list(range(0, len(RECORDS), 100))
+    # Only the first request asks for the total
+    assert [params["$inlinecount"] for _, params in client.requests].count("allpages") == 1
+
+
+def test_partitioned_fetch_requires_orderby():
+    client = FakeODataClient(RECORDS)
+
+    with pytest.raises(ValueError):
+        list(client.iter_pages_partitioned("/odata/v2/User", params={"$filter": "status eq 't'"}))
+
+
+def test_partitioned_fetch_without_count_follows_next_links():
+    client = FakeODataClient(RECORDS, with_count=False)
+
+    pages = list(client.iter_pages_partitioned("/odata/v2/User", params={"$orderby": "userId"}, page_size=1000))
+
+    assert [record for page in pages for record in page] == RECORDS
+    assert len(client.requests) == 3
+
+
+def test_single_page_needs_no_further_requests():
+    client = FakeODataClient(RECORDS[:10])
+
+    pages = list(client.iter_pages_partitioned("/odata/v2/User", params={"$orderby": "userId"}, page_size=100))
+
+    assert pages == [RECORDS[:10]]
+    assert len(client.requests) == 1
@@ -0,0 +1,180 @@
+"""
+Unit tests for the content-addressed ArtifactStore: fingerprints, code versions, save/load
+round trip and reuse of step outputs by run_step.
+"""
+
+import importlib
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import cache.artifact_store as artifact_store_module
+from cache.artifact_store import ArtifactStore, code_version, fingerprint
+
+DF = pd.DataFrame({"userid": ["u1", "u2"], "salary": [10, 20], "ratio": [0.5, np.nan]}, index=[3, 4])
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ArtifactStore(str(tmp_path))
+
+
+def test_fingerprint_follows_content():
+    assert fingerprint(DF) == fingerprint(DF.copy())
+    assert fingerprint(DF) != fingerprint(DF.assign(salary=[10, 21]))
+    assert fingerprint(DF) != fingerprint(DF.rename(columns={"ratio": "rate"}))
+    assert fingerprint(DF) != fingerprint(DF.astype({"salary": "float64"}))
+    assert fingerprint(DF) != fingerprint(DF.set_axis([5, 6]))
+
+    assert fingerprint([DF, {"b": 1, "a": 2}]) == fingerprint([DF.copy(), {"a": 2, "b": 1}])
+    assert fingerprint([DF]) != fingerprint((DF, DF))
+    assert fingerprint({"a": [1]}) != fingerprint({"a": [2]})
+    # Unhashable cells are hashed through their string form
+    lists = pd.DataFrame({"ids": [["a"], ["b"]]})
+    assert fingerprint(lists) == fingerprint(lists.copy())
+    assert fingerprint(lists) != fingerprint(pd.DataFrame({"ids": [["a"], ["c"]]}))
+
+
+def test_frames_and_other_values_round_trip(store):
+    summary = {"batches": [["u1"], ["u2"]], "count": 2}
+
+    store.save("users", "k1", DF)
+    store.save("summary", "k1", summary)
+
+    pd.testing.assert_frame_equal(store.load("users"), DF)
+    assert store.load("summary") == summary
+    assert store.load("users", key="k1") is not None
+    assert store.load("users", key="other") is None
+    assert store.load("never_saved") is None
+
+
+def test_a_new_version_replaces_the_previous_file(store):
+    store.save("users", "a" * 64, DF)
+    store.save("users", "b" * 64, DF.head(1))
+
+    files = os.listdir(os.path.join(store.root_dir, ArtifactStore.ARTIFACT_DIR))
+    assert files == [f"users-{'b' * 16}.arrow"]
+    assert len(store.load("users")) == 1
+
+
+def test_missing_file_or_unreadable_manifest_is_a_miss(store):
+    store.save("users", "k1", DF)
+    os.remove(os.path.join(store.artifact_dir, "users-k1.arrow"))
+    assert store.load("users") is None
+
+    store.save("summary", "k1", {"a": 1})
+    with open(store._entry_path("summary"), "w") as f:
+        f.write("{not json")
+    assert store.load("summary") is None
+
+
+class Step:
+    def __init__(self):
+        self.calls = 0
+        self.replayed = []
+
+    def compute(self, users, threshold):
+        self.calls += 1
+        return users[users["salary"] > threshold], {"threshold": threshold}
+
+    def replay(self, *outputs):
+        self.replayed.append(outputs)
+
+
+def test_run_step_reuses_outputs_of_the_same_inputs(store):
+    step = Step()
+    run = lambda users, threshold: store.run_step(
+        "filter", ("kept", "meta"), {"users": users, "threshold": threshold}, step.compute, replay=step.replay
+    )
+
+    kept, meta = run(DF, 15)
+    assert step.calls == 1 and step.replayed == []
+
+    # A rerun (e.g. a retried task) with equal inputs, even from another store instance
+    store = ArtifactStore(store.root_dir)
+    reused_kept, reused_meta = run(DF.copy(), 15)
+    assert step.calls == 1
+    pd.testing.assert_frame_equal(reused_kept, kept)
+    assert reused_meta == meta
+    assert len(step.replayed) == 1
+    pd.testing.assert_frame_equal(step.replayed[0][0], kept)
+
+    run(DF, 5)
+    assert step.calls == 2
+
+
+def test_run_step_with_a_single_output(store):
+    calls = []
+
+    def compute(value):
+        calls.append(value)
+        return [value]
+
+    assert store.run_step("wrap", ("wrapped",), {"value": "x"}, compute) == ["x"]
+    assert store.run_step("wrap", ("wrapped",), {"value": "x"}, compute) == ["x"]
+    assert calls == ["x"]
+
+
+def test_none_outputs_are_recorded_and_reused(store):
+    calls = []
+
+    def compute(new_employees_df):
+        # e.g. resolve_creation_order without new employees
+        calls.append(len(new_employees_df))
+        return None, None
+
+    for _ in range(3):
+        assert store.run_step("resolve", ("batches", "summary"), {"new_employees_df": DF.head(0)}, compute) == (None, None)
+    assert calls == [0]
+    assert store.load("batches") is None
+    assert os.listdir(store.manifest_dir) and not os.path.exists(store.artifact_dir)
+
+
+def test_a_value_replaced_by_none_drops_its_file(store):
+    store.save("batches", "a" * 64, [["u1"]])
+    store.save("batches", "b" * 64, None)
+
+    assert os.listdir(store.artifact_dir) == []
+    assert store.load("batches") is None
+    assert store.load("batches", key="a" * 64) is None
+
+
+def test_loaded_value_modified_in_place_gets_a_new_key(store):
+    store.save("users", "k1", DF)
+    users = store.load("users")
+    before = store.step_key("next", {"users": users})
+
+    users.loc[3, "salary"] = 99
+
+    assert store.step_key("next", {"users": users}) != before
+    assert store.step_key("next", {"users": store.load("users")}) == before
+
+
+@pytest.fixture
+def project_package(tmp_path, monkeypatch):
+    """A throwaway package treated as project code."""
+    monkeypatch.setattr(artifact_store_module, "PROJECT_ROOT", str(tmp_path))
+    monkeypatch.syspath_prepend(str(tmp_path))
+    package = tmp_path / "steps_pkg"
+    package.mkdir()
+    (package / "__init__.py").write_text("")
+    (package / "helper.py").write_text("def rate():\n    return 1\n")
+    (package / "step.py").write_text("from steps_pkg.helper import rate\n\ndef run():\n    return rate()\n")
+    yield package
+    for name in ("steps_pkg", "steps_pkg.helper", "steps_pkg.step"):
+        sys.modules.pop(name, None)
+
+
+def test_code_version_covers_imported_project_modules(project_package):
+    step = importlib.import_module("steps_pkg.step")
+    before = code_version(step.run)
+    assert code_version(step.run) == before
+
+    (project_package / "helper.py").write_text("def rate():\n    return 2\n")
+    assert code_version(step.run) != before
+
+    # Third-party code is not hashed
+    assert code_version(pd.DataFrame) == code_version()
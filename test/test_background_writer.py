@@ -0,0 +1,120 @@
+"""
+Unit tests for BackgroundWriter: chunks are written in order by one worker thread, the queue
+bounds the producer, and a write error is raised again instead of being lost.
+"""
+
+import threading
+
+import pytest
+
+from loader.background_writer import BackgroundWriter
+
+
+class Recorder:
+    def __init__(self, fail_on=None, gate=None):
+        self.chunks = []
+        self.threads = set()
+        self.fail_on = fail_on
+        self.gate = gate
+
+    def write(self, chunk):
+        if self.gate is not None:
+            self.gate.wait()
+        self.threads.add(threading.current_thread().name)
+        if chunk == self.fail_on:
+            raise RuntimeError(f"cannot write {chunk}")
+        self.chunks.append(chunk)
+
+
+def test_chunks_are_written_in_order_by_the_worker():
+    recorder = Recorder()
+
+    with BackgroundWriter(recorder.write, name="test-writer") as writer:
+        for i in range(50):
+            writer.submit([i])
+
+    assert recorder.chunks == [[i] for i in range(50)]
+    assert recorder.threads == {"test-writer"}
+    assert not writer._thread.is_alive()
+
+
+def test_flush_waits_for_the_queued_chunks():
+    recorder = Recorder()
+    writer = BackgroundWriter(recorder.write)
+    for i in range(5):
+        writer.submit([i])
+
+    writer.flush()
+    assert len(recorder.chunks) == 5
+    assert writer._thread.is_alive()
+
+    writer.submit([5])
+    writer.close()
+    assert len(recorder.chunks) == 6
+    assert not writer._thread.is_alive()
+
+
+def test_producer_blocks_while_max_pending_chunks_wait():
+    gate = threading.Event()
+    recorder = Recorder(gate=gate)
+    writer = BackgroundWriter(recorder.write, max_pending=2)
+    submitted = []
+
+    def produce():
+        for i in range(6):
+            writer.submit([i])
+            submitted.append(i)
+
+    producer = threading.Thread(target=produce)
+    producer.start()
+    producer.join(timeout=0.2)
+    # One chunk held by the worker, two waiting in the queue, the producer blocked on the next
+    assert producer.is_alive()
+    assert len(submitted) == 3
+
+    gate.set()
+    producer.join(timeout=5)
+    writer.close()
+    assert recorder.chunks == [[i] for i in range(6)]
+
+
+def test_write_error_is_raised_by_flush():
+    writer = BackgroundWriter(Recorder(fail_on=[1]).write)
+    writer.submit([0])
+    writer.submit([1])
+
+    with pytest.raises(RuntimeError, match=r"cannot write \[1\]"):
+        writer.flush()
+    # And again by the next submit
+    with pytest.raises(RuntimeError):
+        writer.submit([2])
+    with pytest.raises(RuntimeError):
+        writer.close()
+    assert not writer._thread.is_alive()
+
+
+def test_write_error_is_raised_by_close_and_stops_writing():
+    recorder = Recorder(fail_on=[3])
+
+    with pytest.raises(RuntimeError, match=r"cannot write \[3\]"):
+        with BackgroundWriter(recorder.write) as writer:
+            for i in range(3, 8):
+                try:
+                    writer.submit([i])
+                except RuntimeError:
+                    break
+
+    # Nothing is written after the failed chunk
+    assert recorder.chunks == []
+    assert not writer._thread.is_alive()
+
+
+def test_producer_error_is_kept_and_the_worker_stopped():
+    recorder = Recorder(fail_on=[0])
+
+    with pytest.raises(ValueError, match="producer"):
+        with BackgroundWriter(recorder.write) as writer:
+            writer.submit([0])
+            raise ValueError("producer failed")
+
+    assert not writer._thread.is_alive()
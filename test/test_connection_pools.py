@@ -0,0 +1,147 @@
+"""
+Unit tests for the pooled PostgreSQL checkout (idle-time health checks) and the DAG task
+wrapper closing the pools (no database needed: the pool and its connections are faked).
+"""
+
+import pytest
+
+import db.psycopg2_connection as psycopg2_connection
+from db.connection_pools import with_connection_pools
+from db.psycopg2_connection import Psycopg2DatabaseConnection
+
+POSTGRES_URL = {
+    "host": "localhost", "port": 5432, "database": "db", "user": "user", "password": "pw", "schema": "public",
+}
+
+
+class FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, query):
+        self.connection.queries.append(query)
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = 0
+        self.queries = []
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def rollback(self):
+        pass
+
+
+class FakePool:
+    instances = []
+
+    def __init__(self, minconn, maxconn, **kwargs):
+        self._pool = []
+        self._used = {}
+        self.opened = []
+        self.closed_all = False
+        FakePool.instances.append(self)
+
+    def getconn(self):
+        connection = self._pool.pop() if self._pool else FakeConnection()
+        if connection not in self.opened:
+            self.opened.append(connection)
+        self._used[id(connection)] = connection
+        return connection
+
+    def putconn(self, connection, close=False):
+        self._used.pop(id(connection), None)
+        if not close:
+            self._pool.append(connection)
+
+    def closeall(self):
+        self.closed_all = True
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    FakePool.instances = []
+    monkeypatch.setattr(psycopg2_connection, "ThreadedConnectionPool", FakePool)
+    monkeypatch.setattr(psycopg2_connection.time, "monotonic", clock)
+    monkeypatch.setattr(Psycopg2DatabaseConnection, "_pools", {})
+    return clock
+
+
+def test_recently_used_connection_is_not_pinged(clock):
+    provider = Psycopg2DatabaseConnection(POSTGRES_URL, ping_interval=60)
+
+    with provider.connection():
+        pass
+    clock.now += 5
+    with provider.connection():
+        pass
+
+    connection = FakePool.instances[0].opened[0]
+    assert len(FakePool.instances[0].opened) == 1
+    assert connection.queries == []
+    assert provider.pool_metrics()["pings"] == 0
+    assert provider.pool_metrics()["checkouts"] == 2
+
+
+def test_idle_connection_is_pinged(clock):
+    provider = Psycopg2DatabaseConnection(POSTGRES_URL, ping_interval=60)
+
+    with provider.connection():
+        pass
+    clock.now += 61
+    with provider.connection():
+        pass
+
+    assert FakePool.instances[0].opened[0].queries == ["SELECT 1"]
+    assert provider.pool_metrics()["pings"] == 1
+
+
+def test_closed_connection_is_discarded_without_ping(clock):
+    provider = Psycopg2DatabaseConnection(POSTGRES_URL, ping_interval=60)
+
+    with provider.connection():
+        pass
+    pool = FakePool.instances[0]
+    broken = pool.opened[0]
+    broken.closed = 2  # the server went away while it was idle in the pool
+
+    with provider.connection():
+        pass
+
+    assert len(pool.opened) == 2
+    assert broken not in pool._pool
+    assert broken.queries == []
+    assert provider.pool_metrics()["discarded"] == 1
+
+
+def test_task_wrapper_closes_pools_when_the_task_fails(clock):
+    provider = Psycopg2DatabaseConnection(POSTGRES_URL)
+
+    @with_connection_pools
+    def task():
+        with provider.connection():
+            pass
+        raise RuntimeError("task failed")
+
+    with pytest.raises(RuntimeError):
+        task()
+
+    assert FakePool.instances[0].closed_all
+    assert Psycopg2DatabaseConnection._pools == {}
@@ -0,0 +1,118 @@
+"""
+Unit tests for ContactDecisionEngine: its decisions for many users at once must equal the
+per-user EmailValidator.decide() / PhoneValidator.decide() outcomes.
+"""
+
+import random
+
+import pandas as pd
+import pytest
+
+from planning.base_users_updates_retriever import BaseUsersUpdatesRetriever
+from validator.person.contact_decisions import ContactDecisionEngine
+from validator.person.email_validator import EmailValidator
+from validator.person.phone_validator import PhoneValidator
+
+EMAIL = dict(
+    validator=EmailValidator, for_engine=ContactDecisionEngine.for_emails,
+    value_col="emailaddress", type_col="emailtype",
+    private_col="private_email", business_col="email", private_only_col="is_private_email",
+    values=["a@x.com", "B@x.com", "c@x.com", "d@x.com"],
+)
+PHONE = dict(
+    validator=PhoneValidator, for_engine=ContactDecisionEngine.for_phones,
+    value_col="phoneaddress", type_col="phonetype",
+    private_col="biz_mobile", business_col="biz_phone", private_only_col="is_private_phone",
+    values=["+41 1", "+41 2", "+41 3", "+41 4"],
+)
+
+
+def random_population(kind: dict, seed: int, users: int = 60):
+    """Random SAP contact rows and PDM records covering matches by value, by type and primaries."""
+    rng = random.Random(seed)
+    validator = kind["validator"]
+    types = [validator.BUSINESS_TYPE, validator.PRIVATE_TYPE, 99999]
+    sap_rows, records = [], {}
+    for i in range(users):
+        userid = f"U{i}" if i % 3 else f"u{i}"
+        for _ in range(rng.randint(0, 3)):
+            sap_rows.append({
+                "userid": userid,
+                kind["value_col"]: rng.choice(kind["values"]),
+                kind["type_col"]: str(rng.choice(types)),
+                "isprimary": rng.choice(["true", "false", "Y"]),
+            })
+        records[userid.lower()] = {
+            kind["private_col"]: rng.choice([None, ""] + kind["values"]),
+            kind["business_col"]: rng.choice([None] + kind["values"]),
+            kind["private_only_col"]: rng.choice(["true", "false", "TRUE", None]),
+        }
+    sap = pd.DataFrame(sap_rows, columns=["userid", kind["value_col"], kind["type_col"], "isprimary"])
+    return sap, records
+
+
+def validator_decisions(kind: dict, sap: pd.DataFrame, records: dict) -> dict:
+    return {
+        # object dtype keeps None as is (a string Series would turn it into NaN)
+        userid: kind["validator"](pd.Series(record, dtype=object), sap, userid).decide()
+        for userid, record in records.items()
+    }
+
+
+def engine_decisions(kind: dict, sap: pd.DataFrame, records: dict) -> dict:
+    engine = kind["for_engine"](sap)
+    incoming = {
+        userid: engine.incoming_contacts(
+            private=record[kind["private_col"]],
+            business=record[kind["business_col"]],
+            is_private_only=str(record[kind["private_only_col"]]).lower() == "true",
+        )
+        for userid, record in records.items()
+    }
+    return engine.decide(incoming)
+
+
+@pytest.mark.parametrize("kind", [EMAIL, PHONE], ids=["email", "phone"])
+@pytest.mark.parametrize("seed", range(5))
+def test_engine_matches_validators(kind, seed):
+    sap, records = random_population(kind, seed)
+
+    assert engine_decisions(kind, sap, records) == validator_decisions(kind, sap, records)
+
+
+@pytest.mark.parametrize("kind", [EMAIL, PHONE], ids=["email", "phone"])
+@pytest.mark.parametrize("sap", [
+    pd.DataFrame(),
+    pd.DataFrame({"userid": ["other"], "emailaddress": ["z@x.com"], "phoneaddress": ["+41 9"],
+                  "emailtype": ["18242"], "phonetype": ["18258"], "isprimary": ["true"]}),
+], ids=["empty_table", "no_matching_user"])
+def test_users_without_existing_contacts(kind, sap):
+    _, records = random_population(kind, seed=0, users=12)
+
+    decisions = engine_decisions(kind, sap, records)
+
+    assert decisions == validator_decisions(kind, sap, records)
+    for actions in decisions.values():
+        assert actions["delete"] == [] and actions["update_type"] == []
+        assert all(isinstance(item["type"], int) for item in actions["insert"])
+
+
+def test_retriever_phone_decisions_match_validator():
+    sap, records = random_population(PHONE, seed=7)
+    retriever = BaseUsersUpdatesRetriever.__new__(BaseUsersUpdatesRetriever)
+    retriever.sap_email_data = sap
+    retriever._phone_decisions = {}
+    pdm_common = pd.DataFrame.from_dict(records, orient="index")
+
+    retriever._prepare_phone_decisions(pdm_common)
+
+    assert retriever._phone_decisions == validator_decisions(PHONE, sap, records)
+
+
+def test_missing_values_of_string_columns_are_no_contact():
+    engine = ContactDecisionEngine.for_phones(pd.DataFrame())
+
+    assert engine.incoming_contacts(private=float("nan"), business=pd.NA, is_private_only=False) == {}
+    assert engine.incoming_contacts(private=float("nan"), business="+41 1", is_private_only=False) == {
+        PhoneValidator.BUSINESS_TYPE: "+41 1",
+    }
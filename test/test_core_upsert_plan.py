@@ -0,0 +1,111 @@
+"""
+Unit tests for the concurrent upsert plan of CoreProcessor (max_parallel_upserts > 1).
+
+The processor is built without __init__ (no authentication, no caches) and talks to a fake
+UpsertClient, so only the scheduling and bookkeeping of _execute_batch_upserts are exercised.
+"""
+
+import threading
+from threading import RLock
+
+from orchestrator.core_processing import CoreProcessor
+from orchestrator.user_context import UserExecutionContext, UserResults
+
+
+class FakeUpsertClient:
+    """Answers every upsert with SUCCESS and records the entities it was called for."""
+
+    def __init__(self, on_upsert=None):
+        self.calls = []
+        self.on_upsert = on_upsert
+        self._lock = threading.Lock()
+
+    def upsert_entity_for_users(self, entity_name, user_payloads):
+        with self._lock:
+            self.calls.append((entity_name, sorted(user_payloads)))
+        if self.on_upsert:
+            self.on_upsert(entity_name)
+        return {user_id: {"status": "SUCCESS"} for user_id in user_payloads}
+
+
+def make_processor(max_parallel_upserts, upsert_client):
+    processor = CoreProcessor.__new__(CoreProcessor)
+    processor.max_parallel_upserts = max_parallel_upserts
+    processor._results_lock = RLock()
+    processor.upsert_client = upsert_client
+    processor._reset_collected_payloads()
+    return processor
+
+
+def make_results(processor, user_ids):
+    results = UserResults()
+    for user_id in user_ids:
+        ctx = UserExecutionContext(user_id)
+        ctx.runtime["entity_status"] = {
+            entity: "PENDING" for entity, _ in processor.EXECUTION_PLAN
+        }
+        ctx.runtime["original_row"] = {"userid": user_id}
+        for entity, key in processor.EXECUTION_PLAN:
+            ctx.payloads[key] = {"entity": entity, "user": user_id}
+        results[user_id] = ctx
+        processor._collect_payloads(ctx)
+    return results
+
+
+def run_plan(max_parallel_upserts):
+    client = FakeUpsertClient()
+    processor = make_processor(max_parallel_upserts, client)
+    results = make_results(processor, ["u1", "u2"])
+    processor._execute_batch_upserts(results=results, batch_user_ids={"u1", "u2"})
+    return client, results
+
+
+def test_concurrent_plan_matches_serial_plan():
+    serial_client, serial_results = run_plan(1)
+    concurrent_client, concurrent_results = run_plan(4)
+
+    assert sorted(serial_client.calls) == sorted(concurrent_client.calls)
+    for user_id in ("u1", "u2"):
+        assert (
+            concurrent_results[user_id].runtime["entity_status"]
+            == serial_results[user_id].runtime["entity_status"]
+        )
+        assert set(concurrent_results[user_id].runtime["entity_status"].values()) == {
+            "SUCCESS"
+        }
+
+
+def test_concurrent_plan_respects_upsert_ordering():
+    client, _ = run_plan(4)
+    position = {entity: i for i, (entity, _) in enumerate(client.calls)}
+
+    for entity, deps in CoreProcessor.UPSERT_ORDERING.items():
+        for dep in deps:
+            assert position[dep] < position[entity], f"{entity} sent before {dep}"
+    for entity, deps in CoreProcessor.ENTITY_DEPENDENCIES.items():
+        for dep in deps:
+            assert position[dep] < position[entity], f"{entity} sent before {dep}"
+
+
+def test_barrier_does_not_block_sibling_upserts():
+    # The Position barrier shares a level with PerPersonal/PerEmail/PerPhone: it must not hold
+    # the results lock while it runs, or those upserts could not filter/record their users.
+    sibling_upserted = threading.Event()
+    observed = {}
+
+    def on_upsert(entity_name):
+        if entity_name == "PerEmail":
+            sibling_upserted.set()
+
+    client = FakeUpsertClient(on_upsert=on_upsert)
+    processor = make_processor(4, client)
+    results = make_results(processor, ["u1"])
+
+    def slow_barrier(results, batch_user_ids):
+        observed["sibling_ran"] = sibling_upserted.wait(timeout=5)
+
+    processor._retry_position_dependent_entities = slow_barrier
+    processor._execute_batch_upserts(results=results, batch_user_ids={"u1"})
+
+    assert observed["sibling_ran"]
+    assert results["u1"].runtime["entity_status"]["PerEmail"] == "SUCCESS"
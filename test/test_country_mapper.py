@@ -0,0 +1,82 @@
+"""
+Unit tests for the country and phone mapping: normalize_phone / PhoneNumberInfo, the ISO2 to
+ISO3 conversion and its column version, with cached results matching uncached ones.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from mapper.country_mapper import (
+    PhoneNumberInfo, _lookup_iso3, _parse_phone, get_country_code_from_phone, get_iso3_from_phone,
+    get_iso3_numeric, get_iso3_numeric_column, get_national_number, normalize_phone,
+)
+from mapper.phone_mapper import build_per_phone_payload
+
+PHONES = [
+    "+14155552671", "+442071234567", "+33 1 42 68 53 00", "+49 (30) 123456",
+    "+999123456",      # unassigned calling code
+    "4155552671",      # no calling code
+    "+80012345678",    # non-geographic calling code: no country
+    "not a phone",
+]
+
+
+def test_normalize_phone_parses_every_field_once():
+    assert normalize_phone("+14155552671") == PhoneNumberInfo(
+        country_code="+1", region_code="US", iso3="USA", national_number="4155552671"
+    )
+    info = normalize_phone("+33 1 42 68 53 00")
+    assert (info.country_code, info.region_code, info.iso3, info.national_number) == ("+33", "FR", "FRA", "142685300")
+
+
+@pytest.mark.parametrize("phone", ["+999123456", "4155552671", "not a phone", "", None, np.nan])
+def test_invalid_or_missing_numbers(phone):
+    assert normalize_phone(phone) is None
+    assert get_iso3_from_phone(phone) is None
+    assert get_country_code_from_phone(phone) is None
+    assert get_national_number(phone) is None
+
+
+def test_calling_code_without_a_country():
+    info = normalize_phone("+80012345678")
+
+    assert info.country_code == "+800" and info.iso3 is None
+    # No PerPhone payload without a country
+    assert build_per_phone_payload("P1", "+80012345678", "BIZ_PHONE") is None
+
+
+def test_cached_results_match_uncached_ones():
+    for phone in PHONES * 2:
+        assert normalize_phone(phone) == _parse_phone(phone)
+    for code in ["US", "gb", "FR", "XX", "001", "US"]:
+        assert get_iso3_numeric(code) == _lookup_iso3(code)
+
+
+def test_per_phone_payload_uses_the_normalized_fields():
+    payload = build_per_phone_payload("P1", "+442071234567", "BIZ_MOBILE")
+
+    assert payload["countryCode"] == "+44"
+    assert payload["customString1"] == "GBR"
+    assert payload["phoneNumber"] == "2071234567"
+    assert payload["phoneType"] == "18257"
+
+
+def test_iso3_of_unknown_or_missing_countries():
+    assert get_iso3_numeric("US") == "USA"
+    assert get_iso3_numeric("us") == "USA"
+    assert get_iso3_numeric("XX") is None
+    assert get_iso3_numeric("") is None
+    assert get_iso3_numeric(None) is None
+    assert get_iso3_numeric(np.nan) is None
+
+
+def test_iso3_column_matches_the_scalar_conversion():
+    codes = pd.Series(["US", "GB", None, "XX", "US", np.nan, "de"], index=[5, 6, 7, 8, 9, 10, 11], name="country")
+
+    result = get_iso3_numeric_column(codes)
+
+    expected = codes.map(lambda code: None if pd.isna(code) else get_iso3_numeric(code))
+    assert result.index.equals(codes.index)
+    assert [None if pd.isna(v) else v for v in result] == [None if pd.isna(v) else v for v in expected]
+    assert list(result.dropna()) == ["USA", "GBR", "USA", "DEU"]
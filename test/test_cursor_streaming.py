@@ -0,0 +1,99 @@
+"""
+Unit tests for utils.cursor_streaming.fetch_dataframe: the frame built from fetchmany()
+batches must match the one built from fetchall() rows (dtypes, None/NaN values, columns).
+"""
+
+from datetime import date, datetime
+from decimal import Decimal
+
+import pandas as pd
+
+from utils.cursor_streaming import fetch_dataframe
+
+
+class FakeCursor:
+    """DB-API cursor over fixed rows; description is only set once fetching started,
+    like a named (server-side) psycopg2 cursor."""
+
+    def __init__(self, columns, rows):
+        self._columns = columns
+        self._rows = list(rows)
+        self._position = 0
+        self.description = None
+
+    def _describe(self):
+        self.description = [(name, None, None, None, None, None, None) for name in self._columns]
+
+    def fetchmany(self, size):
+        self._describe()
+        batch = self._rows[self._position:self._position + size]
+        self._position += len(batch)
+        return batch
+
+    def fetchall(self):
+        self._describe()
+        batch = self._rows[self._position:]
+        self._position = len(self._rows)
+        return batch
+
+
+COLUMNS = [
+    "USERID", "AGE", "MANAGER", "SALARY", "AMOUNT", "HIRED_AT", "BIRTH_DATE", "ACTIVE", "EMPTY",
+]
+ROWS = [
+    ("1", 30, "10", 1.5, Decimal("1.10"), datetime(2024, 1, 2, 3, 4), date(1990, 1, 1), True, None),
+    ("2", None, None, None, Decimal("2.20"), None, None, False, None),
+    ("3", 41, "", 2.0, None, datetime(2024, 5, 6), date(1985, 7, 8), None, None),
+    ("4", 25, "11", float("nan"), Decimal("0"), datetime(2023, 1, 1), None, True, None),
+    ("5", 52, "12", 3.25, Decimal("5.5"), None, date(2000, 2, 29), False, None),
+]
+
+
+def fetchall_dataframe(columns, rows) -> pd.DataFrame:
+    """The former extraction path: fetchall() rows into a DataFrame, lowercase columns."""
+    cursor = FakeCursor(columns, rows)
+    data = cursor.fetchall()
+    return pd.DataFrame(data, columns=[desc[0].lower() for desc in cursor.description])
+
+
+def test_matches_fetchall_frame_across_batch_sizes():
+    expected = fetchall_dataframe(COLUMNS, ROWS)
+
+    for batch_size in (1, 2, 3, len(ROWS), 100):
+        df = fetch_dataframe(FakeCursor(COLUMNS, ROWS), batch_size)
+        pd.testing.assert_frame_equal(df, expected)
+        assert df.dtypes.to_dict() == expected.dtypes.to_dict()
+
+
+def test_missing_values_keep_their_fetchall_form():
+    expected = fetchall_dataframe(COLUMNS, ROWS)
+    df = fetch_dataframe(FakeCursor(COLUMNS, ROWS), 2)
+
+    for column in ("manager", "amount", "empty", "active"):
+        assert [value is None for value in df[column]] == [value is None for value in expected[column]]
+    # The empty string is kept as is, not turned into a missing value
+    assert df.loc[2, "manager"] == ""
+
+
+def test_empty_result_keeps_columns():
+    expected = fetchall_dataframe(COLUMNS, [])
+    df = fetch_dataframe(FakeCursor(COLUMNS, []), 10)
+
+    assert list(df.columns) == list(expected.columns)
+    assert df.empty
+
+
+def test_duplicated_column_names_are_kept():
+    columns = ["USERID", "EMAIL", "EMAIL"]
+    rows = [("1", "a@x.com", "b@x.com"), ("2", None, "c@x.com")]
+
+    df = fetch_dataframe(FakeCursor(columns, rows), 1)
+
+    assert list(df.columns) == ["userid", "email", "email"]
+    pd.testing.assert_frame_equal(df, fetchall_dataframe(columns, rows))
+
+
+def test_column_names_can_keep_their_case():
+    df = fetch_dataframe(FakeCursor(["USERID"], [("1",)]), 10, lowercase_columns=False)
+
+    assert list(df.columns) == ["USERID"]
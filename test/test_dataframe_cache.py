@@ -0,0 +1,176 @@
+"""
+Unit tests for DataFrameCache: disk round trip, LRU memory budget, pinned keys,
+taking back evicted frames still held by callers, and derived structure invalidation.
+"""
+
+import gc
+
+import pandas as pd
+import pytest
+
+from cache.dataframe_cache import DataFrameCache
+
+
+class _TestCache(DataFrameCache):
+    NAMESPACE = "test"
+    CACHE_DIR = None
+    PINNED_KEYS = ("pinned_df",)
+
+
+def frame(n: int = 1000, offset: int = 0) -> pd.DataFrame:
+    return pd.DataFrame({"id": range(offset, offset + n), "value": [f"v{i}" for i in range(n)]})
+
+
+def frame_size(df: pd.DataFrame) -> int:
+    return int(df.memory_usage(deep=True).sum())
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    for namespace in DataFrameCache._namespaces:
+        namespace.reset_singleton()
+    monkeypatch.setattr(_TestCache, "CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(DataFrameCache, "_memory_budget", None)
+    monkeypatch.setattr(_TestCache, "_stats", {"hits": 0, "misses": 0, "evictions": 0, "readopted": 0})
+    yield _TestCache()
+    _TestCache.reset_singleton()
+
+
+def test_set_then_get_from_disk(cache):
+    df = frame()
+    cache.set("a_df", df)
+    cache.clear()
+
+    loaded = cache.get("a_df")
+    pd.testing.assert_frame_equal(loaded, df)
+    assert cache.get("missing_df") is None
+
+
+def test_column_projection_loads_the_frame_once(cache, monkeypatch):
+    cache.set("a_df", frame())
+    cache.clear()
+    reads = []
+    real_load = _TestCache._load_frame
+    monkeypatch.setattr(_TestCache, "_load_frame", lambda self, key: reads.append(key) or real_load(self, key))
+
+    for columns in (["id"], ["value", "id"], ["value"]):
+        pd.testing.assert_frame_equal(cache.get("a_df", columns=columns), frame()[columns])
+
+    assert reads == ["a_df"]
+    assert "a_df" in _TestCache._data
+
+
+def test_least_recently_used_frame_is_evicted_over_budget(cache, monkeypatch):
+    size = frame_size(frame())
+    monkeypatch.setattr(DataFrameCache, "_memory_budget", int(size * 2.5))
+
+    cache.set("a_df", frame())
+    cache.set("b_df", frame())
+    cache.get("a_df")  # b_df is now the least recently used
+    cache.set("c_df", frame())
+
+    assert set(_TestCache._data) == {"a_df", "c_df"}
+    assert _TestCache.stats()["evictions"] == 1
+    # Reloaded from disk by the next get()
+    pd.testing.assert_frame_equal(cache.get("b_df"), frame())
+
+
+def test_pinned_keys_are_never_evicted(cache, monkeypatch):
+    size = frame_size(frame())
+    monkeypatch.setattr(DataFrameCache, "_memory_budget", int(size * 1.5))
+
+    cache.set("pinned_df", frame())
+    cache.set("a_df", frame())
+    cache.set("b_df", frame())
+
+    assert "pinned_df" in _TestCache._data
+    assert "a_df" not in _TestCache._data
+
+
+def test_keys_pinned_at_runtime_survive_the_budget_until_unpinned(cache, monkeypatch):
+    size = frame_size(frame())
+    monkeypatch.setattr(DataFrameCache, "_memory_budget", int(size * 1.5))
+
+    cache.pin("a_df")
+    cache.set("a_df", frame())
+    for key in ("b_df", "c_df", "d_df"):
+        cache.set(key, frame())
+        assert "a_df" in _TestCache._data
+
+    cache.unpin("a_df")
+    # Back under the budget as soon as it is unpinned
+    assert "a_df" not in _TestCache._data
+    assert set(_TestCache._data) == {"d_df"}
+    # Static pins cannot be unpinned
+    cache.unpin("pinned_df")
+    assert _TestCache._is_pinned("pinned_df")
+
+
+def test_evicted_frame_still_held_is_taken_back(cache, monkeypatch):
+    size = frame_size(frame())
+    monkeypatch.setattr(DataFrameCache, "_memory_budget", int(size * 1.5))
+
+    cache.set("a_df", frame())
+    held = cache.get("a_df")
+    cache.set("b_df", frame())
+    assert "a_df" not in _TestCache._data
+
+    assert cache.get("a_df") is held
+    assert _TestCache.stats()["readopted"] == 1
+
+
+def test_evicted_frame_released_is_reloaded(cache, monkeypatch):
+    size = frame_size(frame())
+    monkeypatch.setattr(DataFrameCache, "_memory_budget", int(size * 1.5))
+
+    cache.set("a_df", frame())
+    cache.set("b_df", frame())
+    gc.collect()
+
+    reloaded = cache.get("a_df")
+    pd.testing.assert_frame_equal(reloaded, frame())
+    assert _TestCache.stats()["readopted"] == 0
+
+
+def test_replaced_frame_is_not_taken_back(cache, monkeypatch):
+    size = frame_size(frame())
+    monkeypatch.setattr(DataFrameCache, "_memory_budget", int(size * 1.5))
+
+    cache.set("a_df", frame())
+    held = cache.get("a_df")
+    cache.set("b_df", frame())
+    # A new version of a_df is written while the old one is evicted but still held
+    cache.set("a_df", frame(offset=10))
+    _TestCache.clear_key("a_df")
+
+    current = cache.get("a_df")
+    assert current is not held
+    assert current["id"].iloc[0] == 10
+
+
+def test_derived_structures_built_once_and_invalidated(cache, monkeypatch):
+    builds = []
+
+    def build(df):
+        builds.append(df)
+        return set(df["id"])
+
+    cache.set("a_df", frame(3))
+    assert cache.get_derived("a_df", "ids", build) == {0, 1, 2}
+    assert cache.get_derived("a_df", "ids", build) == {0, 1, 2}
+    assert len(builds) == 1
+
+    # Replacing the frame drops what was derived from it
+    cache.set("a_df", frame(3, offset=5))
+    assert cache.get_derived("a_df", "ids", build) == {5, 6, 7}
+    assert len(builds) == 2
+
+    # So does evicting it
+    size = frame_size(frame(3))
+    monkeypatch.setattr(DataFrameCache, "_memory_budget", int(size * 1.5))
+    cache.set("b_df", frame(3))
+    assert "a_df" not in _TestCache._derived
+    assert cache.get_derived("a_df", "ids", build) == {5, 6, 7}
+    assert len(builds) == 3
+
+    assert cache.get_derived("missing_df", "ids", build) is None
@@ -0,0 +1,89 @@
+"""
+Unit tests for convert_series_to_unix_timestamp: the vectorized conversion must give the same
+result as Series.apply(convert_to_unix_timestamp) for every value.
+"""
+
+import random
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.date_converter import DATE_FORMATS, convert_series_to_unix_timestamp, convert_to_unix_timestamp
+
+
+def assert_same_as_apply(values, **series_kwargs):
+    dates = pd.Series(values, name="date_of_hire", **series_kwargs)
+
+    pd.testing.assert_series_equal(
+        convert_series_to_unix_timestamp(dates), dates.apply(convert_to_unix_timestamp)
+    )
+
+
+@pytest.mark.parametrize("fmt", DATE_FORMATS)
+def test_every_date_format(fmt):
+    moments = [datetime(1999, 12, 31, 23, 59, 58), datetime(2024, 2, 29, 8, 5, 0), datetime(2031, 7, 4)]
+
+    assert_same_as_apply([moment.strftime(fmt) for moment in moments], dtype=object)
+
+
+def test_formats_keep_their_priority_on_ambiguous_values():
+    # 03/04 parses as mm/dd first, 25/12 only as dd/mm, 2024-02-30 with no format
+    values = ["03/04/2024", "25/12/2024", "12-25-2024", "2024/12/25", "2024-02-30"]
+
+    assert_same_as_apply(values, dtype=object)
+    assert convert_series_to_unix_timestamp(pd.Series(values, dtype=object))[0] == "/Date(1709510400000)/"  # 2024-03-04
+
+
+def test_missing_empty_and_garbage_values():
+    assert_same_as_apply(
+        [None, np.nan, pd.NaT, "", " ", "not a date", "2024-13-45", "31.12.2024", 20240101, "/Date(86400000)/"],
+        dtype=object,
+    )
+    result = convert_series_to_unix_timestamp(pd.Series(["/Date(86400000)/", "", None, "garbage"], dtype=object))
+    assert result[0] == "/Date(86400000)/"
+    assert result[1:].isna().all()
+
+
+def test_datetime_and_timestamp_objects():
+    values = [
+        datetime(2024, 1, 1, 12, 30),
+        pd.Timestamp("1969-12-31 23:59:59.999500"),  # before the epoch: truncated toward zero
+        pd.Timestamp("2024-06-30 10:00", tz="Europe/Paris"),  # wall clock taken as UTC
+        datetime(1500, 1, 1),
+        "2024-01-01",
+        None,
+    ]
+    assert_same_as_apply(values, dtype=object)
+
+
+def test_datetime64_columns():
+    naive = pd.to_datetime(["2024-01-01 12:30:00", None, "1969-12-31 23:59:59.9995", "1960-05-05"], format="ISO8601")
+    assert_same_as_apply(naive)
+    assert_same_as_apply(naive.tz_localize("America/New_York"))
+
+
+def test_string_dtype_and_empty_columns():
+    assert_same_as_apply(["2024-01-01", None, "01/31/2024"], dtype="str")
+    assert_same_as_apply([], dtype=object)
+    assert_same_as_apply([None, None], dtype=object)
+
+
+def test_random_mixed_columns_match_apply():
+    rng = random.Random(17)
+    start = datetime(1950, 1, 1)
+    values = []
+    for _ in range(3000):
+        moment = start + timedelta(seconds=rng.randrange(100 * 365 * 24 * 3600))
+        choice = rng.random()
+        if choice < 0.7:
+            values.append(moment.strftime(rng.choice(DATE_FORMATS)))
+        elif choice < 0.8:
+            values.append(rng.choice([None, np.nan, "", "n/a", "2024-00-10"]))
+        elif choice < 0.9:
+            values.append(moment.replace(tzinfo=timezone.utc) if rng.random() < 0.5 else moment)
+        else:
+            values.append(pd.Timestamp(moment))
+
+    assert_same_as_apply(values, dtype=object)
@@ -0,0 +1,116 @@
+"""
+Unit tests for EmailResolver: the vectorized pass (resolve_emails) and the single-user path
+(resolve_user_email) must resolve every user to the same safe emails.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from cache.sap_contact_store import SAPContactStore
+from config.excluded_users_emails import USERS_TO_BE_EXCLUDED
+from orchestrator.core_processing import CoreProcessor
+from planning.email_resolver import EmailResolver
+
+EXCLUDED_ID = str(USERS_TO_BE_EXCLUDED[0])
+
+
+@pytest.fixture
+def resolver():
+    return EmailResolver()
+
+
+def sap_emails():
+    return SAPContactStore(pd.DataFrame({
+        "personidexternal": ["10", "11", "11", "12", "13", "A14", "15", "16", EXCLUDED_ID],
+        "emailaddress": [
+            "user123@kn.com", "other@x.com", "Real.Person@X.com", "secondary@x.com",
+            np.nan, "upper@x.com", "", "hr.sap@x.com", "excluded.sap@x.com",
+        ],
+        "emailtype": ["18242"] * 9,
+        "isprimary": ["Y", "N", "Y", "N", "Y", "Y", "Y", "Y", "Y"],
+    }))
+
+
+def pdm_users():
+    return pd.DataFrame({
+        "userid": ["10", "11", "12", "13", "a14", "15", "16", EXCLUDED_ID, " 17 ", "18"],
+        "email": [f"pdm{i}@x.com" for i in range(9)] + [None],
+        "private_email": [f"private{i}@x.com" for i in range(8)] + [None, np.nan],
+    })
+
+
+HR_GLOBAL_USERS = {"16"}
+
+
+def test_vectorized_and_single_user_paths_agree(resolver):
+    store = sap_emails()
+    users = pdm_users()
+
+    resolved = resolver.resolve_emails(users, HR_GLOBAL_USERS, store)
+
+    assert list(resolved.index) == ["10", "11", "12", "13", "a14", "15", "16", EXCLUDED_ID, "17", "18"]
+    for position, (_, row) in enumerate(users.iterrows()):
+        single = resolver.resolve_user_email(row["userid"], row, HR_GLOBAL_USERS, store)
+        vectorized = resolved.iloc[position].to_dict()
+        assert vectorized.keys() == single.keys()
+        for key, value in single.items():
+            assert (pd.isna(value) and pd.isna(vectorized[key])) or vectorized[key] == value, (row["userid"], key)
+
+
+def test_resolution_rules(resolver):
+    resolved = resolver.resolve_emails(pdm_users(), HR_GLOBAL_USERS, sap_emails())
+
+    # SAP primary already anonymized: kept, no private email
+    assert resolved.loc["10"].to_dict() == {"business_email": "user123@kn.com", "private_email": None}
+    # SAP primary real email (lowercased) instead of the anonymized one
+    assert resolved.loc["11", "business_email"] == "real.person@x.com"
+    assert resolved.loc["11", "private_email"] == EmailResolver.anonymize("11")
+    # HR Global and excluded users keep their PDM emails
+    assert resolved.loc["16", "business_email"] == "pdm6@x.com"
+    assert resolved.loc[EXCLUDED_ID, "business_email"] == "pdm7@x.com"
+
+
+def test_missing_sap_email_is_absent(resolver):
+    """A primary SAP row without address (NaN or empty) counts as no SAP email on both paths."""
+    store = sap_emails()
+    users = pdm_users()
+    resolved = resolver.resolve_emails(users, HR_GLOBAL_USERS, store)
+
+    for user_id in ("12", "13", "15", "17"):
+        expected = EmailResolver.anonymize(user_id)
+        assert resolved.loc[user_id].to_dict() == {"business_email": expected, "private_email": expected}
+        row = users[users["userid"].str.strip() == user_id].iloc[0]
+        assert resolver.resolve_user_email(row["userid"], row, HR_GLOBAL_USERS, store) == {
+            "business_email": expected, "private_email": expected,
+        }
+
+
+def test_person_ids_match_sap_exactly_after_lowercasing(resolver):
+    """The PDM id is lowercased, the SAP id is not: 'A14' in SAP does not match PDM 'a14'."""
+    store = sap_emails()
+    resolved = resolver.resolve_emails(pdm_users(), HR_GLOBAL_USERS, store)
+
+    assert resolved.loc["a14", "business_email"] == EmailResolver.anonymize("a14")
+    assert resolver.resolve_user_email("A14", pd.Series({"email": "x@x.com"}), HR_GLOBAL_USERS, store) == {
+        "business_email": EmailResolver.anonymize("a14"), "private_email": EmailResolver.anonymize("a14"),
+    }
+
+
+def test_processor_drops_previous_batch_emails(monkeypatch):
+    processor = CoreProcessor.__new__(CoreProcessor)
+    processor.hr_global_users = HR_GLOBAL_USERS
+    processor.sap_contact_store = sap_emails()
+    processor._prepare_resolved_emails(pdm_users().iloc[:2])
+    assert set(processor._resolved_emails) == {"10", "11"}
+
+    processor._prepare_resolved_emails(pdm_users().iloc[2:4])
+    assert set(processor._resolved_emails) == {"12", "13"}
+
+    # A failed batch pass leaves nothing behind: its users are resolved one by one
+    def fail(*args, **kwargs):
+        raise ValueError("boom")
+
+    monkeypatch.setattr(EmailResolver, "resolve_emails", fail)
+    processor._prepare_resolved_emails(pdm_users().iloc[4:6])
+    assert processor._resolved_emails == {}
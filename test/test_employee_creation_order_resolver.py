@@ -0,0 +1,146 @@
+"""
+Unit tests for EmployeeCreationOrderResolver: Kahn levels (creation batches), Tarjan cycle
+groups, HR soft dependencies and missing dependencies.
+"""
+
+import random
+
+import pandas as pd
+
+from planning.employee_creation_order_resolver import EmployeeCreationOrderResolver
+
+
+def employees(rows):
+    return pd.DataFrame(rows, columns=["userid", "manager", "matrix_manager", "hr"])
+
+
+def batch_ids(batches):
+    return [list(batch["userid"]) for batch in batches]
+
+
+def test_batches_follow_manager_and_matrix_manager_levels():
+    new = employees([
+        ("C", "b", None, None),
+        ("B", "A", None, None),
+        ("A", "boss", None, None),  # existing manager: no dependency between new employees
+        ("D", None, "a", None),
+        ("E", "", "None", None),
+    ])
+    existing = pd.DataFrame({"userid": ["BOSS"]})
+
+    resolver = EmployeeCreationOrderResolver(new, existing)
+
+    assert batch_ids(resolver.get_ordered_batches()) == [["a", "e"], ["b", "d"], ["c"]]
+    summary = resolver.get_dependency_summary()
+    assert summary["employees_with_no_dependencies"] == 2
+    assert summary["missing_dependencies_hard_only"] == []
+
+
+def test_cycles_are_grouped_and_batched_last_with_cleared_references():
+    new = employees([
+        ("x", "y", None, None),
+        ("y", None, "x", None),
+        ("z", "x", None, None),    # behind the cycle, not part of it
+        ("s", "s", None, None),    # self reference: no dependency
+        ("p", "q", None, None),
+        ("q", "r", None, None),
+        ("r", "p", None, None),
+    ])
+
+    resolver = EmployeeCreationOrderResolver(new, pd.DataFrame(columns=["userid"]))
+    batches = resolver.get_ordered_batches()
+
+    assert batch_ids(batches) == [["s"], ["x", "y", "z", "p", "q", "r"]]
+    cycle_batch = batches[-1].set_index("userid")
+    assert cycle_batch["manager"].isna().all()
+    assert cycle_batch["matrix_manager"].isna().all()
+
+    summary = resolver.get_dependency_summary()
+    assert summary["hard_cycle_groups"] == [["p", "q", "r"], ["x", "y"]]
+    assert summary["hard_cycle_userids"] == ["p", "q", "r", "x", "y", "z"]
+
+
+def test_hr_is_a_soft_dependency():
+    new = employees([
+        ("a", None, None, "b"),
+        ("b", None, None, "a"),
+        ("c", None, None, "someone_existing"),
+    ])
+
+    resolver = EmployeeCreationOrderResolver(new, pd.DataFrame({"userid": ["someone_existing"]}))
+    batches = resolver.get_ordered_batches()
+
+    assert batch_ids(batches) == [["a", "b", "c"]]
+    assert list(batches[0]["needs_hr_retry"]) == [True, True, False]
+    assert resolver.get_dependency_summary()["hr_retry_candidates"] == ["a", "b"]
+
+
+def test_missing_hard_dependencies_are_reported_in_row_order():
+    new = employees([("a", "ghost", "phantom", "nobody"), ("b", "a", None, None)])
+
+    summary = EmployeeCreationOrderResolver(new, pd.DataFrame({"userid": []})).get_dependency_summary()
+
+    assert summary["missing_dependencies_hard_only"] == [
+        {"userid": "a", "field": "manager", "missing_dependency": "ghost"},
+        {"userid": "a", "field": "matrix_manager", "missing_dependency": "phantom"},
+    ]
+
+
+def test_long_chains_and_cycles_need_no_recursion():
+    size = 20000
+    chain = employees([(f"u{i}", f"u{i - 1}" if i else None, None, None) for i in range(size)])
+    ring = employees([(f"r{i}", f"r{(i + 1) % size}", None, None) for i in range(size)])
+
+    assert len(EmployeeCreationOrderResolver(chain, pd.DataFrame()).get_ordered_batches()) == size
+    summary = EmployeeCreationOrderResolver(ring, pd.DataFrame()).get_dependency_summary()
+    assert [len(group) for group in summary["hard_cycle_groups"]] == [size]
+
+
+def reference_levels(edges: dict, nodes: list) -> dict:
+    """Naive levels: a node is placed once all its dependencies are; cycles never are."""
+    levels, level = {}, 0
+    while True:
+        ready = [n for n in nodes if n not in levels and all(d in levels for d in edges.get(n, ()))]
+        if not ready:
+            return levels
+        for n in ready:
+            levels[n] = level
+        level += 1
+
+
+def reachable(edges: dict, start: str) -> set:
+    seen, todo = set(), [start]
+    while todo:
+        for dep in edges.get(todo.pop(), ()):
+            if dep not in seen:
+                seen.add(dep)
+                todo.append(dep)
+    return seen
+
+
+def test_random_graphs_match_a_naive_resolution():
+    rng = random.Random(11)
+    for _ in range(20):
+        nodes = [f"n{i}" for i in range(40)]
+        rows, edges = [], {}
+        for node in nodes:
+            manager = rng.choice(nodes + [None] * 10)
+            matrix = rng.choice(nodes + [None] * 20)
+            rows.append((node, manager, matrix, None))
+            edges[node] = {dep for dep in (manager, matrix) if dep and dep != node}
+
+        resolver = EmployeeCreationOrderResolver(employees(rows), pd.DataFrame())
+        batches = resolver.get_ordered_batches()
+        levels = reference_levels(edges, nodes)
+
+        expected = [[n for n in nodes if levels.get(n) == level] for level in range(max(levels.values(), default=-1) + 1)]
+        unresolved = [n for n in nodes if n not in levels]
+        assert batch_ids(batches) == expected + ([unresolved] if unresolved else [])
+
+        reach = {n: reachable(edges, n) for n in nodes}
+        expected_groups = {
+            frozenset([n] + [m for m in reach[n] if n in reach[m]])
+            for n in nodes if n in reach[n]
+        }
+        groups = resolver.get_dependency_summary()["hard_cycle_groups"]
+        assert {frozenset(group) for group in groups} == expected_groups
@@ -0,0 +1,129 @@
+"""
+Unit tests for the on-disk frame format of the caches: Arrow write/read round trip, column
+projection, legacy Parquet snapshots and atomic replacement of the files.
+"""
+
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from cache.frame_store import (
+    frame_exists, frame_path, read_frame, remove_frames, replace_atomically, write_frame, PARQUET_SUFFIX,
+)
+
+DF = pd.DataFrame({
+    "userid": ["u1", "u2", None],
+    "salary": [10, 20, 30],
+    "ratio": [0.5, np.nan, 1.5],
+    "active": [True, False, True],
+    "startdate": pd.to_datetime(["2024-01-01", None, "2025-06-30"]),
+})
+
+
+def test_round_trip_keeps_values_dtypes_and_nulls(tmp_path):
+    path = write_frame(str(tmp_path), "users_df", DF)
+
+    assert path == frame_path(str(tmp_path), "users_df")
+    assert frame_exists(str(tmp_path), "users_df")
+    pd.testing.assert_frame_equal(read_frame(str(tmp_path), "users_df"), DF)
+
+
+def test_index_is_dropped_unless_preserved(tmp_path):
+    indexed = DF.set_index(pd.Index([7, 8, 9], name="row"))
+
+    write_frame(str(tmp_path), "dropped", indexed)
+    write_frame(str(tmp_path), "kept", indexed, preserve_index=True)
+
+    pd.testing.assert_frame_equal(read_frame(str(tmp_path), "dropped"), DF)
+    pd.testing.assert_frame_equal(read_frame(str(tmp_path), "kept"), indexed)
+
+
+def test_column_projection(tmp_path):
+    write_frame(str(tmp_path), "users_df", DF)
+
+    projected = read_frame(str(tmp_path), "users_df", columns=["ratio", "userid"])
+
+    pd.testing.assert_frame_equal(projected, DF[["ratio", "userid"]])
+
+
+def test_missing_key(tmp_path):
+    assert read_frame(str(tmp_path), "nothing") is None
+    assert not frame_exists(str(tmp_path), "nothing")
+
+
+def test_legacy_parquet_snapshot_is_read_then_superseded(tmp_path):
+    parquet_path = frame_path(str(tmp_path), "users_df", PARQUET_SUFFIX)
+    DF.to_parquet(parquet_path, index=False)
+
+    assert frame_exists(str(tmp_path), "users_df")
+    pd.testing.assert_frame_equal(read_frame(str(tmp_path), "users_df", columns=["salary"]), DF[["salary"]])
+
+    write_frame(str(tmp_path), "users_df", DF.head(1))
+    assert not os.path.exists(parquet_path)
+    assert len(read_frame(str(tmp_path), "users_df")) == 1
+
+
+def test_a_failed_write_keeps_the_previous_file(tmp_path):
+    write_frame(str(tmp_path), "users_df", DF)
+
+    def broken_write(tmp_file):
+        with open(tmp_file, "wb") as f:
+            f.write(b"partial")
+        raise OSError("disk full")
+
+    with pytest.raises(OSError):
+        replace_atomically(frame_path(str(tmp_path), "users_df"), broken_write)
+
+    pd.testing.assert_frame_equal(read_frame(str(tmp_path), "users_df"), DF)
+    assert sorted(os.listdir(tmp_path)) == ["users_df.arrow"]
+
+
+def test_replaced_file_has_the_usual_permissions(tmp_path):
+    path = write_frame(str(tmp_path), "users_df", DF)
+
+    assert os.stat(path).st_mode & 0o777 == 0o644
+
+
+def test_concurrent_writers_never_share_a_temp_file(tmp_path):
+    frames = [DF.assign(salary=DF["salary"] * i) for i in range(1, 9)]
+    errors = []
+
+    def write(df):
+        try:
+            for _ in range(10):
+                write_frame(str(tmp_path), "users_df", df)
+        except Exception as exc:  # pragma: no cover - reported below
+            errors.append(exc)
+
+    threads = [threading.Thread(target=write, args=(df,)) for df in frames]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert sorted(os.listdir(tmp_path)) == ["users_df.arrow"]
+    result = read_frame(str(tmp_path), "users_df")
+    assert any(result.equals(df) for df in frames)
+
+
+def test_a_frame_read_before_a_replacement_is_unaffected(tmp_path):
+    write_frame(str(tmp_path), "users_df", DF)
+    before = read_frame(str(tmp_path), "users_df")
+
+    write_frame(str(tmp_path), "users_df", DF.head(1))
+
+    pd.testing.assert_frame_equal(before, DF)
+    assert len(read_frame(str(tmp_path), "users_df")) == 1
+
+
+def test_remove_frames_only_removes_frame_files(tmp_path):
+    write_frame(str(tmp_path), "a", DF)
+    DF.to_parquet(frame_path(str(tmp_path), "b", PARQUET_SUFFIX), index=False)
+    (tmp_path / "state.json").write_text("{}")
+
+    assert remove_frames(str(tmp_path)) == 2
+    assert os.listdir(tmp_path) == ["state.json"]
@@ -0,0 +1,92 @@
+"""
+Unit tests for the job mapping index of JobExistenceValidator: found / unknown / duplicate job
+codes, NaN or missing fields, and the index being built once per job titles table.
+"""
+
+import gc
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import validator.employment.job_validator as job_validator_module
+from cache.postgres_cache import PostgresDataCache
+from validator.employment.job_validator import JobExistenceValidator, JobMapping, build_job_mapping_index
+
+JOBS = pd.DataFrame({
+    "jobcode": ["J1", "j2", "J2", "J3", "J3", None],
+    "bufu_id": [10.0, 20.0, 21.0, 30.0, np.nan, 40.0],
+    "cust_geographicalscope": ["G1", "G2", "G2b", "G3", "G3", "G4"],
+    "cust_subunit": ["S1", "S2", "S2b", np.nan, "S3", "S4"],
+})
+
+
+@pytest.fixture
+def postgres_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(PostgresDataCache, "CACHE_DIR", str(tmp_path))
+    PostgresDataCache.reset_singleton()
+    yield PostgresDataCache()
+    PostgresDataCache.reset_singleton()
+
+
+def test_found_job_code_is_cleaned_and_case_insensitive(postgres_cache):
+    mapping = JobExistenceValidator(JOBS, "j1").get_job_mapping()
+
+    assert mapping == JobMapping(
+        jobcode="j1", bufu_id="10", cust_geographicalscope="G1", cust_subunit="S1",
+        columns=("bufu_id", "cust_geographicalscope", "cust_subunit"), missing_fields=(),
+    )
+    assert mapping.is_valid
+
+
+def test_unknown_job_code(postgres_cache):
+    assert JobExistenceValidator(JOBS, "nope").get_job_mapping() is None
+    with pytest.raises(ValueError, match="not found"):
+        JobExistenceValidator(JOBS, "nope", raise_if_missing=True).get_job_mapping()
+
+
+def test_duplicate_job_codes_use_their_first_row():
+    mapping = build_job_mapping_index(JOBS)["j2"]
+
+    assert (mapping.bufu_id, mapping.cust_geographicalscope, mapping.cust_subunit) == ("20", "G2", "S2")
+
+
+def test_nan_on_any_row_of_a_code_makes_the_field_missing(postgres_cache):
+    mapping = build_job_mapping_index(JOBS)["j3"]
+
+    assert mapping.missing_fields == ("bufu_id", "cust_subunit")
+    # Raw values are kept when a field is missing
+    assert mapping.bufu_id == 30.0 and pd.isna(mapping.cust_subunit)
+    assert not mapping.is_valid
+    with pytest.raises(ValueError, match="bufu_id, cust_subunit"):
+        JobExistenceValidator(JOBS, "J3", raise_if_missing=True).get_job_mapping()
+    assert JobExistenceValidator(JOBS, "J3").get_job_mapping() == mapping
+
+
+def test_missing_column_and_null_job_codes():
+    index = build_job_mapping_index(JOBS.drop(columns="cust_subunit"))
+
+    assert index["j1"].missing_fields == ("cust_subunit",)
+    assert index["j1"].cust_subunit is None
+    # Null job codes never match a lookup
+    assert set(index) == {"j1", "j2", "j3"}
+
+
+def test_index_is_built_once_per_table(postgres_cache, monkeypatch):
+    builds = []
+    real_build = job_validator_module.build_job_mapping_index
+    monkeypatch.setattr(job_validator_module, "build_job_mapping_index", lambda df: builds.append(df) or real_build(df))
+
+    postgres_cache.set(JobExistenceValidator.CACHE_KEY, JOBS)
+    cached = postgres_cache.get(JobExistenceValidator.CACHE_KEY)
+    filtered = cached[cached["jobcode"].notna()].copy()
+    for _ in range(3):
+        assert JobExistenceValidator(cached, "J1").get_job_mapping().bufu_id == "10"
+        assert JobExistenceValidator(filtered, "J1").get_job_mapping().bufu_id == "10"
+    assert len(builds) == 2
+
+    # The index of a frame goes away with it
+    filtered_id = id(filtered)
+    del filtered, builds[:]
+    gc.collect()
+    assert filtered_id not in job_validator_module._job_mapping_indexes
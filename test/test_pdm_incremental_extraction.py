@@ -0,0 +1,94 @@
+"""
+Unit tests for the incremental PDM extraction of CacheDataExtractor (no database needed).
+"""
+
+from datetime import datetime, timezone
+import json
+
+import pandas as pd
+
+import extractor.cache_data_extractor as cache_data_extractor
+from extractor.cache_data_extractor import CacheDataExtractor
+
+
+class FakeOracleExtractor:
+    def __init__(self, changed_user_ids, delta_df):
+        self.changed_user_ids = changed_user_ids
+        self.delta_df = delta_df
+        self.user_id_queries = []
+
+    def extract_data(self, query):
+        return [(uid,) for uid in self.changed_user_ids], ["USERID"]
+
+    def extract_data_for_user_ids(self, query, user_ids):
+        self.user_id_queries.append((query, list(user_ids)))
+        return self.delta_df
+
+
+class FakeOracleCache:
+    snapshot = None
+
+    def get(self, key):
+        return self.snapshot
+
+
+def make_extractor(tmp_path, monkeypatch, state, snapshot, changed, delta_df, **kwargs):
+    state_file = tmp_path / "_pdm_extraction_state.json"
+    state_file.write_text(json.dumps(state))
+    monkeypatch.setattr(CacheDataExtractor, "STATE_FILE", str(state_file))
+    FakeOracleCache.snapshot = snapshot
+    monkeypatch.setattr(cache_data_extractor, "OracleDataCache", FakeOracleCache)
+    oracle = FakeOracleExtractor(changed, delta_df)
+    extractor = CacheDataExtractor(
+        postgres_extractor=None,
+        oracle_extractor=oracle,
+        extract_pdm_records_query="full query",
+        extract_ec_records_query="",
+        extract_jobs_titles_records_query="",
+        extract_different_userid_personid_query="",
+        incremental=True,
+        extract_pdm_records_for_user_ids_query="filtered query",
+        **kwargs,
+    )
+    return extractor, oracle
+
+
+def recent_state(**extra):
+    return {"scn": 100, "last_full_refresh": datetime.now(timezone.utc).isoformat(), **extra}
+
+
+def test_incremental_merge_replaces_and_removes_changed_users(tmp_path, monkeypatch):
+    snapshot = pd.DataFrame({"userid": ["1", "2", "3"], "firstname": ["a", "b", "c"]})
+    # User 2 changed, user 3 changed and no longer qualifies (absent from the delta)
+    delta = pd.DataFrame({"userid": ["2"], "firstname": ["B"]})
+    extractor, oracle = make_extractor(
+        tmp_path, monkeypatch, recent_state(), snapshot, ["2", "3"], delta
+    )
+
+    merged = extractor._extract_pdm_data_incremental(scn=200)
+
+    assert oracle.user_id_queries == [("filtered query", ["2", "3"])]
+    assert merged.sort_values("userid")["firstname"].tolist() == ["a", "B"]
+
+
+def test_full_extraction_forced_after_incremental_runs(tmp_path, monkeypatch):
+    snapshot = pd.DataFrame({"userid": ["1"]})
+    extractor, oracle = make_extractor(
+        tmp_path, monkeypatch, recent_state(incremental_runs=3), snapshot, ["1"], snapshot,
+        full_reconciliation_every_runs=3,
+    )
+
+    assert extractor._extract_pdm_data_incremental(scn=200) is None
+    assert oracle.user_id_queries == []
+
+
+def test_incremental_runs_counter_reset_by_full_extraction(tmp_path, monkeypatch):
+    extractor, _ = make_extractor(
+        tmp_path, monkeypatch, recent_state(incremental_runs=2), None, [], None
+    )
+
+    extractor._save_pdm_state(300, full_refresh=False)
+    assert extractor._load_pdm_state()["incremental_runs"] == 3
+    extractor._save_pdm_state(400, full_refresh=True)
+    assert extractor._load_pdm_state()["incremental_runs"] == 0
+    assert extractor._load_pdm_state()["scn"] == 400
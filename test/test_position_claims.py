@@ -0,0 +1,122 @@
+"""
+Unit tests for the position claims of UserResults (is_position_claimed) and for the position
+match index, compared with the row filter it replaced.
+"""
+
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from orchestrator.user_context import UserExecutionContext, UserResults, is_position_claimed
+from validator.position.position_validator import build_position_match_index, position_match_key
+
+
+def context(user_id, position_code=None):
+    ctx = UserExecutionContext(user_id)
+    ctx.position_code = position_code
+    return ctx
+
+
+@pytest.fixture(params=[UserResults, dict])
+def results(request):
+    """Claims tracked by UserResults, and the scan fallback of plain dicts."""
+    return request.param({"U1": context("U1", "P1"), "u2": context("u2"), "u3": context("u3", "p3")})
+
+
+def test_claimed_code_is_skipped_for_another_user_but_allowed_for_its_owner(results):
+    assert is_position_claimed(results, "P1")
+    assert is_position_claimed(results, " p1 ", exclude_user_id="u2")
+    assert not is_position_claimed(results, "P1", exclude_user_id="u1")
+    assert not is_position_claimed(results, "P1", exclude_user_id=" U1 ")
+    assert not is_position_claimed(results, "P9")
+
+
+def test_claims_follow_position_code_changes(results):
+    results["u2"].position_code = "P1"
+    assert is_position_claimed(results, "P1", exclude_user_id="U1")
+
+    results["U1"].position_code = "P4"
+    results["u2"].position_code = None
+    assert not is_position_claimed(results, "P1")
+    assert is_position_claimed(results, "p4", exclude_user_id="u3")
+
+
+def test_claims_follow_removed_and_replaced_contexts():
+    results = UserResults({"u1": context("u1", "P1"), "u2": context("u2", "P2")})
+
+    removed = results.pop("u1")
+    assert not results.is_position_claimed("P1")
+    # A context no longer held by the results does not claim anything there
+    removed.position_code = "P2"
+    assert not results.is_position_claimed("P2", exclude_user_id="u2")
+
+    results["u2"] = context("u2", "P3")
+    assert not results.is_position_claimed("P2")
+    assert results.is_position_claimed("P3")
+
+    results.setdefault("u4", context("u4", "P4"))
+    del results["u2"]
+    assert results.is_position_claimed("P4") and not results.is_position_claimed("P3")
+    results.clear()
+    assert not results.is_position_claimed("P4")
+
+
+def test_a_context_held_by_two_results_updates_both():
+    ctx = context("u1", "P1")
+    first, second = UserResults({"u1": ctx}), UserResults({"u1": ctx})
+
+    ctx.position_code = "P2"
+
+    for results in (first, second):
+        assert results.is_position_claimed("P2") and not results.is_position_claimed("P1")
+
+
+def old_position_matches(pos_data: pd.DataFrame, record) -> list:
+    """The row filter used before the match index (critical positions excluded)."""
+    job_code = str(record.get('jobcode')).strip().lower()
+    location_code = str(record.get('address_code')).strip().lower()
+    cost_center = str(record.get('cost_center')).strip().lower()
+    company = str(record.get('company')).strip().lower()
+    if 'positioncriticality' in pos_data.columns:
+        is_critical = pd.to_numeric(pos_data['positioncriticality'], errors='coerce').fillna(0).astype(int) == 1
+    else:
+        is_critical = pd.Series(False, index=pos_data.index)
+    mask = (
+        (pos_data['jobcode'].astype(str).str.lower() == job_code)
+        & (pos_data['location'].astype(str).str.lower() == location_code)
+        & (pos_data['costcenter'].astype(str).str.lower() == cost_center)
+        & (pos_data['company'].astype(str).str.lower() == company)
+        & (~is_critical)
+    )
+    return list(pos_data[mask]['code'])
+
+
+def random_positions(rng, count, with_criticality=True):
+    values = lambda options: [rng.choice(options) for _ in range(count)]
+    data = {
+        "code": [f"P{i}" for i in range(count)],
+        "jobcode": values(["J1", "j1", "J2", np.nan]),
+        "location": values(["L1", "l1", "L2"]),
+        "costcenter": values(["C1", "C2", None]),
+        "company": values(["X", "x"]),
+    }
+    if with_criticality:
+        data["positioncriticality"] = values(["1", 1, "0", 0, None, "n/a", 2])
+    return pd.DataFrame(data)
+
+
+@pytest.mark.parametrize("with_criticality", [True, False])
+def test_match_index_picks_the_same_positions_as_the_row_filter(with_criticality):
+    rng = random.Random(5)
+    pos_data = random_positions(rng, 400, with_criticality)
+    index = build_position_match_index(pos_data)
+
+    for jobcode in ["J1", " j1 ", "J2", "J9", None]:
+        for address_code in ["L1", "l2"]:
+            for cost_center in ["C1", "c2", None]:
+                record = pd.Series({
+                    "jobcode": jobcode, "address_code": address_code, "cost_center": cost_center, "company": "X",
+                }, dtype=object)
+                assert list(index.get(position_match_key(record), ())) == old_position_matches(pos_data, record)
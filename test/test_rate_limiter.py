@@ -0,0 +1,133 @@
+"""
+Unit tests for the shared AIMD RateLimiter (token bucket, throttling, Retry-After, backoff).
+time.monotonic / time.sleep are replaced by a fake clock, so nothing actually waits.
+"""
+
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+
+import api.rate_limiter as rate_limiter_module
+from api.rate_limiter import RateLimiter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        if len(self.sleeps) > 10_000:
+            raise AssertionError("acquire() never gets a token")
+        # Like a real sleep, never shorter than the timer granularity
+        self.now += max(seconds, 1e-6)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limiter_module.time, "monotonic", clock.monotonic)
+    monkeypatch.setattr(rate_limiter_module.time, "sleep", clock.sleep)
+    RateLimiter.reset_singleton()
+    yield clock
+    RateLimiter.reset_singleton()
+
+
+def test_is_a_process_wide_singleton(clock):
+    assert RateLimiter() is RateLimiter()
+
+
+def test_burst_is_bounded_by_the_bucket(clock):
+    limiter = RateLimiter()
+
+    for _ in range(int(RateLimiter.INITIAL_RATE)):
+        limiter.acquire()
+    assert clock.sleeps == []
+
+    # The bucket is empty: the next request waits for one token at the current rate
+    limiter.acquire()
+    assert sum(clock.sleeps) == pytest.approx(1 / RateLimiter.INITIAL_RATE)
+    assert limiter.metrics()["requests"] == RateLimiter.INITIAL_RATE + 1
+
+
+def test_rate_grows_additively_and_is_cut_on_throttle(clock):
+    limiter = RateLimiter()
+
+    clock.now += RateLimiter.INCREASE_INTERVAL
+    limiter.handle_response_status(200)
+    assert limiter.metrics()["current_rate"] == RateLimiter.INITIAL_RATE + RateLimiter.ADDITIVE_INCREASE
+    # At most one increase per INCREASE_INTERVAL
+    limiter.handle_response_status(200)
+    assert limiter.metrics()["current_rate"] == RateLimiter.INITIAL_RATE + RateLimiter.ADDITIVE_INCREASE
+
+    clock.now += RateLimiter.DECREASE_COOLDOWN
+    limiter.handle_response_status(429)
+    halved = (RateLimiter.INITIAL_RATE + RateLimiter.ADDITIVE_INCREASE) * RateLimiter.DECREASE_FACTOR
+    assert limiter.metrics()["current_rate"] == halved
+    # A burst of 429s within the cooldown only halves the rate once
+    limiter.handle_response_status(503)
+    assert limiter.metrics()["current_rate"] == halved
+    assert limiter.metrics()["throttled_count"] == 2
+
+
+def test_rate_never_drops_below_minimum(clock):
+    limiter = RateLimiter()
+
+    for _ in range(20):
+        clock.now += RateLimiter.DECREASE_COOLDOWN
+        limiter.on_throttle()
+
+    assert limiter.metrics()["current_rate"] == RateLimiter.MIN_RATE
+
+
+def test_retry_after_pauses_every_caller(clock):
+    limiter = RateLimiter()
+
+    retry_after = limiter.handle_response_status(429, {"Retry-After": "7"})
+    assert retry_after == 7.0
+
+    limiter.acquire()
+    assert sum(clock.sleeps) == pytest.approx(7.0)
+
+
+def test_parse_retry_after():
+    assert RateLimiter.parse_retry_after(None) is None
+    assert RateLimiter.parse_retry_after("12") == 12.0
+    assert RateLimiter.parse_retry_after("-3") == 0.0
+    assert RateLimiter.parse_retry_after("not a date") is None
+
+    in_a_minute = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=60), usegmt=True)
+    assert 55 <= RateLimiter.parse_retry_after(in_a_minute) <= 60
+
+
+def test_backoff_uses_retry_after_or_capped_jittered_exponential(clock):
+    limiter = RateLimiter()
+
+    assert limiter.backoff(1, retry_after=3.0) == 3.0
+    assert limiter.backoff(1, retry_after=1000.0) == RateLimiter.MAX_BACKOFF
+
+    for attempt in (1, 3, 10):
+        base = min(2 ** attempt, RateLimiter.MAX_BACKOFF)
+        delay = limiter.backoff(attempt)
+        assert base / 2 <= delay <= base
+
+    assert limiter.metrics()["wait_seconds"] == pytest.approx(sum(clock.sleeps), abs=0.01)
+
+
+def test_acquire_still_returns_at_the_minimum_rate(clock):
+    limiter = RateLimiter()
+    for _ in range(20):
+        clock.now += RateLimiter.DECREASE_COOLDOWN
+        limiter.on_throttle()
+    assert limiter.metrics()["current_rate"] == RateLimiter.MIN_RATE < 1
+
+    for _ in range(3):
+        start = clock.now
+        limiter.acquire()
+        # Below 1 req/s the bucket must still reach the one token acquire() waits for
+        assert clock.now - start <= 1 / RateLimiter.MIN_RATE + 1e-3
@@ -0,0 +1,59 @@
+"""
+Unit tests for SAPDataCache.lookup: indexed, case-insensitive matching by default and exact
+(case-sensitive) matching on the columns the callers compared with ==.
+"""
+
+import pandas as pd
+import pytest
+
+from cache.sap_cache import SAPDataCache
+
+
+@pytest.fixture
+def sap_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(SAPDataCache, "CACHE_DIR", str(tmp_path))
+    SAPDataCache.reset_singleton()
+    cache = SAPDataCache()
+    cache.set("empjobrelationships_df", pd.DataFrame({
+        "userid": ["U1", "u1", "U1", "u2"],
+        "relationshiptype": ["hr manager", "HR Manager", "HR Manager", "hr manager"],
+        "reluserid": ["m1", "m2", "m3", "m4"],
+    }))
+    yield cache
+    SAPDataCache.reset_singleton()
+
+
+def test_lookup_is_case_insensitive_by_default(sap_cache):
+    rows = sap_cache.lookup("empjobrelationships_df", ("userid", "relationshiptype"), ("u1", "hr manager"))
+
+    assert list(rows["reluserid"]) == ["m1", "m2", "m3"]
+
+
+def test_exact_columns_match_as_stored(sap_cache):
+    rows = sap_cache.lookup(
+        "empjobrelationships_df", ("userid", "relationshiptype"), ("u1", "HR Manager"), exact="relationshiptype"
+    )
+    assert list(rows["reluserid"]) == ["m2", "m3"]
+
+    rows = sap_cache.lookup("empjobrelationships_df", "userid", "U1", exact="userid")
+    assert list(rows["reluserid"]) == ["m1", "m3"]
+
+    rows = sap_cache.lookup("empjobrelationships_df", "userid", "U2", exact=("userid",))
+    assert rows.empty
+
+
+def test_exact_lookup_equals_the_equality_filter(sap_cache):
+    df = sap_cache.get("empjobrelationships_df")
+
+    for user_id in ("U1", "u1", "u2", "u3"):
+        for relation_type in ("hr manager", "HR Manager"):
+            expected = df[(df["userid"].str.lower() == user_id.lower()) & (df["relationshiptype"] == relation_type)]
+            rows = sap_cache.lookup(
+                "empjobrelationships_df", ("userid", "relationshiptype"), (user_id, relation_type),
+                exact="relationshiptype",
+            )
+            pd.testing.assert_frame_equal(rows, expected)
+
+
+def test_lookup_of_uncached_frame_is_none(sap_cache):
+    assert sap_cache.lookup("missing_df", "userid", "u1") is None
@@ -0,0 +1,83 @@
+"""
+Unit tests for the concurrent entity extraction of SAPInfoCacheHandler
+(no SAP tenant needed: the API client serves in-memory pages).
+"""
+
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from cache.sap_cache import SAPDataCache
+from extractor.sap_info_cache_handler import SAPInfoCacheHandler
+
+CREDENTIALS = {"client_id": "id", "assertion": "secret", "grant_type": "grant", "company_id": "company"}
+ENTITIES = ["positions", "employees", "perPerson", "perPersonal", "perEmail", "empJobRelationships"]
+
+
+class FakeAPIClient:
+    """Two pages per entity; records the number of entities fetched at the same time."""
+
+    def __init__(self, fail=()):
+        self.fail = set(fail)
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def iter_pages(self, endpoint, params=None):
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            time.sleep(0.02)
+            if any(entity in endpoint for entity in self.fail):
+                raise RuntimeError(f"{endpoint} unavailable")
+            yield [{"Id": f"{endpoint}-1", "Name": "a"}]
+            yield [{"Id": f"{endpoint}-2", "Name": "b"}]
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+@pytest.fixture
+def handler(tmp_path, monkeypatch):
+    monkeypatch.setattr(SAPDataCache, "CACHE_DIR", str(tmp_path))
+    SAPDataCache.reset_singleton()
+    yield SAPInfoCacheHandler("https://sap.example", "/oauth/token", CREDENTIALS, max_workers=3)
+    SAPDataCache.reset_singleton()
+
+
+def test_entities_are_fetched_concurrently_and_cached(handler):
+    api_client = FakeAPIClient()
+
+    handler._fetch_entities_concurrently(ENTITIES, api_client)
+
+    assert 1 < api_client.max_active <= 3
+    for entity in ENTITIES:
+        df = SAPDataCache().get(f"{entity.lower()}_df")
+        assert list(df.columns) == ["id", "name"]
+        assert list(df["name"]) == ["a", "b"]
+
+
+def test_failed_entity_is_reported_after_the_others_finished(handler, monkeypatch):
+    # In delta mode a failed page stream is raised instead of caching a partial extract
+    monkeypatch.setattr(handler, "delta_mode", True)
+    api_client = FakeAPIClient(fail={"PerEmail"})
+
+    with pytest.raises(RuntimeError, match="perEmail"):
+        handler._fetch_entities_concurrently(ENTITIES, api_client)
+
+    cache = SAPDataCache()
+    assert cache.get("peremail_df") is None
+    for entity in ENTITIES:
+        if entity != "perEmail":
+            assert len(cache.get(f"{entity.lower()}_df")) == 2
+
+
+def test_pages_become_one_frame(handler):
+    df = handler._fetch_pages_to_dataframe("positions", FakeAPIClient(), {})
+
+    pd.testing.assert_frame_equal(df, pd.DataFrame({
+        "Id": ["/odata/v2/Position-1", "/odata/v2/Position-2"], "Name": ["a", "b"],
+    }))
@@ -0,0 +1,66 @@
+"""
+Unit tests for SAPContactStore (per-person view of the SAP peremail_df cache frame).
+"""
+
+import pandas as pd
+import pytest
+
+from cache.sap_cache import SAPDataCache
+from cache.sap_contact_store import SAPContactStore
+
+
+@pytest.fixture
+def sap_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(SAPDataCache, "CACHE_DIR", str(tmp_path))
+    SAPDataCache.reset_singleton()
+    yield SAPDataCache()
+    SAPDataCache.reset_singleton()
+
+
+def contacts():
+    return pd.DataFrame({
+        "personidexternal": ["A1", "b2", "a1"],
+        "emailaddress": ["one@x.com", "two@x.com", "three@x.com"],
+        "emailtype": ["18242", "18240", "18240"],
+        "isprimary": ["Y", "Y", "N"],
+    })
+
+
+def test_rows_grouped_per_person_in_table_order():
+    store = SAPContactStore(contacts())
+
+    assert [row["emailaddress"] for row in store.rows(" a1 ")] == ["one@x.com", "three@x.com"]
+    assert store.rows("missing") == ()
+    assert len(store) == 2
+
+
+def test_from_cache_is_built_once_per_frame_version(sap_cache):
+    sap_cache.set("peremail_df", contacts())
+
+    store = SAPContactStore.from_cache()
+    assert SAPContactStore.from_cache() is store
+
+    sap_cache.set("peremail_df", contacts().iloc[:1])
+    rebuilt = SAPContactStore.from_cache()
+    assert rebuilt is not store
+    assert len(rebuilt) == 1
+
+
+def test_from_cache_without_frame_is_empty(sap_cache):
+    store = SAPContactStore.from_cache()
+
+    assert len(store) == 0
+    assert store.rows("a1") == ()
+
+
+def test_derived_structures_live_with_the_store():
+    store = SAPContactStore(contacts())
+    calls = []
+
+    def build(s):
+        calls.append(s)
+        return len(s)
+
+    assert store.get_derived("count", build) == 2
+    assert store.get_derived("count", build) == 2
+    assert len(calls) == 1
@@ -0,0 +1,123 @@
+"""
+Unit tests for the SAP delta extraction: merge of delta records into the cached snapshot
+on record identity (_latest_per_identity) and the full refresh rules of the state file.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+import pytest
+
+from cache.sap_cache import SAPDataCache
+from extractor.sap_info_cache_handler import SAPInfoCacheHandler
+
+CREDENTIALS = {"client_id": "id", "assertion": "secret", "grant_type": "grant", "company_id": "company"}
+
+
+def date(ms: int) -> str:
+    return f"/Date({ms})/"
+
+
+def test_delta_record_replaces_the_record_of_its_identity():
+    snapshot = pd.DataFrame({
+        "personidexternal": ["1", "1", "2"],
+        "emailtype": ["18242", "18240", "18242"],
+        "emailaddress": ["old@x.com", "private@x.com", "two@x.com"],
+    })
+    delta = pd.DataFrame({"personidexternal": ["1", "3"], "emailtype": ["18242", "18242"],
+                          "emailaddress": ["new@x.com", "three@x.com"]})
+
+    merged = SAPInfoCacheHandler._latest_per_identity("perEmail", pd.concat([snapshot, delta], ignore_index=True))
+
+    assert merged.to_dict("records") == [
+        {"personidexternal": "1", "emailtype": "18240", "emailaddress": "private@x.com"},
+        {"personidexternal": "2", "emailtype": "18242", "emailaddress": "two@x.com"},
+        {"personidexternal": "1", "emailtype": "18242", "emailaddress": "new@x.com"},
+        {"personidexternal": "3", "emailtype": "18242", "emailaddress": "three@x.com"},
+    ]
+
+
+def test_latest_effective_record_wins_over_an_older_delta_record():
+    snapshot = pd.DataFrame({
+        "userid": ["1", "2"],
+        "startdate": [date(2_000_000), date(1_000_000)],
+        "seqnumber": ["1", "1"],
+        "position": ["current", "p2"],
+    })
+    # A back-dated change of user 1 and a same-day second sequence of user 2
+    delta = pd.DataFrame({
+        "userid": ["1", "2"],
+        "startdate": [date(500_000), date(1_000_000)],
+        "seqnumber": ["1", "2"],
+        "position": ["back-dated", "p2-seq2"],
+    })
+
+    merged = SAPInfoCacheHandler._latest_per_identity("employees", pd.concat([snapshot, delta], ignore_index=True))
+
+    assert dict(zip(merged["userid"], merged["position"])) == {"1": "current", "2": "p2-seq2"}
+
+
+def test_effective_dates_compare_as_numbers_not_text():
+    values = pd.Series([date(900), date(10_000), "3", None])
+
+    assert list(SAPInfoCacheHandler._effective_sort_value(values)[:3]) == [900, 10_000, 3]
+    assert pd.isna(SAPInfoCacheHandler._effective_sort_value(values)[3])
+
+
+class DeltaAPIClient:
+    def __init__(self, records):
+        self.records = records
+        self.params = []
+
+    def iter_pages(self, endpoint, params=None):
+        self.params.append(params)
+        yield self.records
+
+
+@pytest.fixture
+def handler(tmp_path, monkeypatch):
+    monkeypatch.setattr(SAPDataCache, "CACHE_DIR", str(tmp_path))
+    SAPDataCache.reset_singleton()
+    yield SAPInfoCacheHandler(
+        "https://sap.example", "/oauth/token", CREDENTIALS, delta_mode=True, full_refresh_every_runs=2
+    )
+    SAPDataCache.reset_singleton()
+
+
+def test_delta_fetch_filters_on_the_high_water_mark_and_merges(handler):
+    SAPDataCache().set("perperson_df", pd.DataFrame({"personidexternal": ["1", "2"], "name": ["a", "b"]}))
+    last_run = datetime.now(timezone.utc).replace(microsecond=0) - timedelta(hours=1)
+    handler._update_entity_state("perPerson", last_run, full_refresh=True)
+    api_client = DeltaAPIClient([{"personIdExternal": "2", "name": "b2"}])
+
+    handler._fetch_entity("perPerson", api_client)
+
+    # Changes made shortly before the previous run are read again
+    since = (last_run - SAPInfoCacheHandler.DELTA_OVERLAP).strftime("%Y-%m-%dT%H:%M:%SZ")
+    assert f"lastModifiedDateTime gt datetimeoffset'{since}'" in api_client.params[0]["$filter"]
+    assert SAPDataCache().get("perperson_df").to_dict("records") == [
+        {"personidexternal": "1", "name": "a"}, {"personidexternal": "2", "name": "b2"},
+    ]
+    assert handler._load_state()["perPerson"]["delta_runs"] == 1
+
+
+def test_full_refresh_is_forced_periodically(handler):
+    SAPDataCache().set("perperson_df", pd.DataFrame({"personidexternal": ["1"]}))
+    now = datetime.now(timezone.utc)
+    handler._update_entity_state("perPerson", now, full_refresh=True)
+    assert handler._entity_high_water_mark("perPerson") == now
+
+    # After full_refresh_every_runs delta runs
+    handler._update_entity_state("perPerson", now, full_refresh=False)
+    handler._update_entity_state("perPerson", now, full_refresh=False)
+    assert handler._entity_high_water_mark("perPerson") is None
+
+    # Once the time interval since the last full refresh has passed
+    handler._update_entity_state("perPerson", now - timedelta(days=2), full_refresh=True)
+    assert handler._entity_high_water_mark("perPerson") is None
+
+    # Without a cached snapshot
+    handler._update_entity_state("perPerson", now, full_refresh=True)
+    SAPDataCache().clear_cache_files()
+    SAPDataCache.reset_singleton()
+    assert handler._entity_high_water_mark("perPerson") is None
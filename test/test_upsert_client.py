@@ -0,0 +1,97 @@
+"""
+Unit tests for UpsertClient chunk dispatching and its global in-flight request slots
+(no SAP tenant needed: the HTTP session is faked).
+"""
+
+from threading import BoundedSemaphore
+
+import pytest
+
+from api.api_client import APIClient
+from api.rate_limiter import RateLimiter
+from api.upsert_client import UpsertClient
+
+
+class FakeResponse:
+    def __init__(self, status_code, body=None):
+        self.status_code = status_code
+        self.headers = {}
+        self.text = ""
+        self._body = body or {}
+
+    def json(self):
+        return self._body
+
+
+class FakeSession:
+    """Returns the queued responses in order and records the free in-flight slots per call."""
+
+    def __init__(self, responses, slots):
+        self.responses = list(responses)
+        self.slots = slots
+        self.free_slots_during_requests = []
+
+    def request(self, method, url, **kwargs):
+        self.free_slots_during_requests.append(self.slots._value)
+        return self.responses.pop(0)
+
+
+@pytest.fixture
+def rate_limiter(monkeypatch):
+    RateLimiter.reset_singleton()
+    limiter = RateLimiter()
+    monkeypatch.setattr(limiter, "acquire", lambda: None)
+    yield limiter
+    RateLimiter.reset_singleton()
+
+
+@pytest.fixture
+def slots(monkeypatch):
+    slots = BoundedSemaphore(2)
+    monkeypatch.setattr(UpsertClient, "_in_flight", slots)
+    return slots
+
+
+def ok_body(count):
+    return {"d": [{"index": i, "status": "OK", "httpCode": 200} for i in range(count)]}
+
+
+def test_chunks_are_sent_one_after_the_other_by_default():
+    client = UpsertClient(api_client=None)
+
+    assert client.max_concurrent_chunks == 1
+
+
+def test_in_flight_slot_is_released_during_retry_backoff(rate_limiter, slots, monkeypatch):
+    api_client = APIClient("https://sap.example")
+    api_client.session = FakeSession([FakeResponse(503), FakeResponse(200, ok_body(1))], slots)
+    free_slots_during_backoff = []
+
+    def backoff(attempt, retry_after=None):
+        free_slots_during_backoff.append(slots._value)
+        return 0.0
+
+    monkeypatch.setattr(rate_limiter, "backoff", backoff)
+
+    results = UpsertClient(api_client).upsert_entity_for_users("PerPerson", {"u1": {"personIdExternal": "u1"}})
+
+    assert results["u1"]["status"] == "SUCCESS"
+    # One slot taken while each request is on the wire, none held while backing off
+    assert api_client.session.free_slots_during_requests == [1, 1]
+    assert free_slots_during_backoff == [2]
+    assert slots._value == 2
+
+
+def test_users_are_never_split_across_concurrent_chunks(monkeypatch):
+    monkeypatch.setattr(UpsertClient, "MAX_CHUNK_SIZE", 3)
+    client = UpsertClient(api_client=None)
+    payloads = ["a1", "a2", "b1", "b2", "c1", "c2", "c3", "c4"]
+    users = ["a", "a", "b", "b", "c", "c", "c", "c"]
+
+    groups = client._chunk_by_user(payloads, users)
+
+    assert groups == [
+        [(["a1", "a2"], ["a", "a"])],
+        [(["b1", "b2"], ["b", "b"])],
+        [(["c1", "c2", "c3"], ["c", "c", "c"]), (["c4"], ["c"])],
+    ]
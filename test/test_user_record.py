@@ -0,0 +1,140 @@
+"""
+Unit tests for ColumnarFrame / UserRecord: a record must read like the pd.Series row of
+iterrows() it replaces in the processing path.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from cache.postgres_cache import PostgresDataCache
+from cache.sap_cache import SAPDataCache
+from orchestrator.user_context import UserExecutionContext, UserResults
+from orchestrator.user_record import ColumnarFrame, UserRecord
+from payload_builders.position._position import PositionPayloadBuilder
+
+DF = pd.DataFrame(
+    {
+        "userid": ["U1", "u2", "U3", "u1"],
+        "firstname": ["Ann", None, "Cid", "Dup"],
+        "salary": [10, 20, 30, 40],
+        "ratio": [0.5, np.nan, 1.5, 2.5],
+        "active": [True, False, True, False],
+    },
+    index=[10, 20, 30, 40],
+)
+
+
+def same(left, right) -> bool:
+    return (pd.isna(left) and pd.isna(right)) or left == right
+
+
+def test_records_read_like_iterrows_rows():
+    records = list(ColumnarFrame(DF))
+
+    assert len(records) == len(DF)
+    for record, (label, row) in zip(records, DF.iterrows()):
+        assert record.name == label
+        assert list(record.keys()) == list(row.index) == list(record.index)
+        for column in DF.columns:
+            assert same(record[column], row[column])
+            assert same(record.get(column), row.get(column))
+            assert (column in record) == (column in row)
+        assert all(same(record.to_dict()[k], v) for k, v in row.to_dict().items())
+        assert not record.empty
+
+
+def test_missing_keys_behave_like_a_series():
+    record = ColumnarFrame(DF).record(0)
+    row = DF.iloc[0]
+
+    assert record.get("missing") is row.get("missing") is None
+    assert record.get("missing", "fallback") == row.get("missing", "fallback")
+    assert ("missing" in record) == ("missing" in row)
+    with pytest.raises(KeyError):
+        record["missing"]
+    with pytest.raises(KeyError):
+        row["missing"]
+
+
+def test_assignment_on_a_copy_leaves_the_frame_and_the_original_untouched():
+    frame = ColumnarFrame(DF)
+    record = frame.record(1)
+    row = DF.iloc[1]
+
+    record_copy, row_copy = record.copy(), row.copy()
+    for target in (record_copy, row_copy):
+        target["firstname"] = "Bea"
+        target["email"] = "bea@x.com"
+
+    assert record_copy["firstname"] == row_copy["firstname"] == "Bea"
+    assert list(record_copy.keys()) == list(row_copy.index)
+    assert all(same(record_copy.to_dict()[k], v) for k, v in row_copy.to_dict().items())
+    assert pd.isna(record["firstname"]) and "email" not in record
+    assert pd.isna(frame.record(1)["firstname"])
+    # A copy of a modified record keeps its own overrides
+    second_copy = record_copy.copy()
+    second_copy["firstname"] = "Other"
+    assert record_copy["firstname"] == "Bea"
+
+
+def test_find_is_case_insensitive_and_returns_the_first_row():
+    frame = ColumnarFrame(DF)
+
+    assert frame.find("u1").name == 10
+    assert frame.find("U2")["salary"] == 20
+    assert frame.position_of("u3") == 2
+    assert frame.find("nobody") is None
+    assert isinstance(frame.find("u1"), UserRecord)
+
+
+def test_other_id_column_and_missing_id_column():
+    frame = ColumnarFrame(DF, id_column="firstname")
+    assert frame.find("cid").name == 30
+
+    no_ids = ColumnarFrame(DF.drop(columns="userid"))
+    assert no_ids.find("u1") is None
+
+
+def test_empty_frame():
+    frame = ColumnarFrame(DF.iloc[0:0])
+
+    assert len(frame) == 0
+    assert list(frame) == []
+    assert frame.find("u1") is None
+
+
+@pytest.fixture
+def position_caches(tmp_path, monkeypatch):
+    monkeypatch.setattr(SAPDataCache, "CACHE_DIR", str(tmp_path / "sap"))
+    monkeypatch.setattr(PostgresDataCache, "CACHE_DIR", str(tmp_path / "postgres"))
+    SAPDataCache.reset_singleton()
+    PostgresDataCache.reset_singleton()
+    sap_cache = SAPDataCache()
+    sap_cache.set("positions_df", pd.DataFrame({
+        "code": ["P1", "P2"], "jobcode": ["J1", "J1"], "location": ["L1", "L1"],
+        "costcenter": ["C1", "C1"], "company": ["X", "X"],
+    }))
+    sap_cache.set("employees_df", pd.DataFrame({"userid": ["someone"], "position": ["P9"]}))
+    yield
+    SAPDataCache.reset_singleton()
+    PostgresDataCache.reset_singleton()
+
+
+def test_position_builder_reads_a_user_record_like_a_series(position_caches):
+    users = pd.DataFrame({
+        "userid": ["U1"], "jobcode": ["J1"], "address_code": ["L1"], "cost_center": ["C1"], "company": ["X"],
+    })
+    results = UserResults()
+    # P1 is already held by U1 itself, P2 by another user of the batch
+    for user_id, code in (("u1", "P1"), ("u2", "P2")):
+        results[user_id] = UserExecutionContext(user_id)
+        results[user_id].position_code = code
+
+    found = []
+    for row in (users.iloc[0], ColumnarFrame(users).record(0)):
+        builder = PositionPayloadBuilder(row, job_mappings=None, results=results, ec_user_id="U1")
+        assert builder.user_id == "U1"
+        found.append(builder._get_position_code_from_positions(row))
+
+    assert found == ["P1", "P1"]
@@ -0,0 +1,109 @@
+"""
+Unit tests for UserIdMapping: the dictionary lookups must resolve ids exactly like the
+DataFrame filters on different_userid_personid_data_df they replaced.
+"""
+
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from cache.postgres_cache import PostgresDataCache
+from mapper.retrieve_person_id_external import UserIdMapping, get_userid_from_personid
+
+MAPPING = pd.DataFrame({
+    "userid": ["EC1", "ec2", "EC3", "EC4", None],
+    "person_id_external": ["P1", "P2", "P2", np.nan, "P5"],
+})
+
+
+def old_userid_for(df, person_id):
+    match = df[df["person_id_external"] == person_id]
+    return match["userid"].values[0] if not match.empty else person_id
+
+
+def old_personid_for(df, user_id):
+    match = df[df["userid"] == user_id]
+    return match["person_id_external"].values[0] if not match.empty else user_id
+
+
+def old_resolve(df, any_id):
+    match = df[(df["person_id_external"] == any_id) | (df["userid"] == any_id)]
+    if match.empty:
+        return {"userId": any_id, "personIdExternal": any_id}
+    return {"userId": match["userid"].values[0], "personIdExternal": match["person_id_external"].values[0]}
+
+
+def same(left, right) -> bool:
+    return (pd.isna(left) and pd.isna(right)) or left == right
+
+
+@pytest.mark.parametrize("any_id", ["P1", "P2", "EC1", "ec2", "EC4", "P5", "unknown", "p1", " P1", "P1 ", "ec1"])
+def test_lookups_match_the_row_filters(any_id):
+    mapping = UserIdMapping(MAPPING)
+
+    assert same(mapping.userid_for(any_id), old_userid_for(MAPPING, any_id))
+    assert same(mapping.personid_for(any_id), old_personid_for(MAPPING, any_id))
+    resolved, expected = mapping.resolve(any_id), old_resolve(MAPPING, any_id)
+    assert resolved.keys() == expected.keys()
+    assert all(same(resolved[key], expected[key]) for key in expected)
+
+
+def test_known_unknown_and_variant_ids():
+    mapping = UserIdMapping(MAPPING)
+
+    assert mapping.userid_for("P1") == "EC1"
+    assert mapping.personid_for("EC1") == "P1"
+    # First row of a duplicated id wins
+    assert mapping.userid_for("P2") == "ec2"
+    assert mapping.resolve("EC3") == {"userId": "EC3", "personIdExternal": "P2"}
+    # Unknown ids, case and whitespace variants are not mapped (exact matching)
+    for variant in ("P9", "p1", " P1", "P1 ", "ec1"):
+        assert mapping.userid_for(variant) == variant
+        assert mapping.personid_for(variant) == variant
+        assert mapping.resolve(variant) == {"userId": variant, "personIdExternal": variant}
+    # Null ids never match
+    assert mapping.userid_for(None) is None
+    assert mapping.personid_for(None) is None
+
+
+def test_random_tables_match_the_row_filters():
+    rng = random.Random(3)
+    ids = ["a", "A", "b", "c", " c", "d", None]
+    for _ in range(20):
+        df = pd.DataFrame({
+            "userid": [rng.choice(ids) for _ in range(15)],
+            "person_id_external": [rng.choice(ids) for _ in range(15)],
+        }, dtype=object)
+        mapping = UserIdMapping(df)
+        for any_id in ids[:-1] + ["zz"]:
+            assert same(mapping.userid_for(any_id), old_userid_for(df, any_id))
+            assert same(mapping.personid_for(any_id), old_personid_for(df, any_id))
+            assert mapping.resolve(any_id) == old_resolve(df, any_id)
+
+
+def test_empty_or_missing_table_maps_ids_to_themselves():
+    for mapping in (UserIdMapping(None), UserIdMapping(MAPPING.iloc[0:0])):
+        assert mapping.userid_for("P1") == "P1"
+        assert mapping.resolve("P1") == {"userId": "P1", "personIdExternal": "P1"}
+
+
+@pytest.fixture
+def postgres_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(PostgresDataCache, "CACHE_DIR", str(tmp_path))
+    PostgresDataCache.reset_singleton()
+    yield PostgresDataCache()
+    PostgresDataCache.reset_singleton()
+
+
+def test_mapping_of_the_cached_table_is_built_once(postgres_cache):
+    assert get_userid_from_personid("P1") == "P1"
+
+    postgres_cache.set(UserIdMapping.CACHE_KEY, MAPPING)
+    assert UserIdMapping.from_cache() is UserIdMapping.from_cache(postgres_cache)
+    assert get_userid_from_personid("P1") == "EC1"
+
+    # Replacing the table drops the mapping built on it
+    postgres_cache.set(UserIdMapping.CACHE_KEY, MAPPING.assign(userid=["X1", "X2", "X3", "X4", None]))
+    assert get_userid_from_personid("P1") == "X1"
@@ -0,0 +1,49 @@
+"""
+Cursor Streaming Utility:
+
+Builds a DataFrame from a DB-API cursor by fetching fixed-size batches with fetchmany() and
+accumulating them column by column, so the full list of row tuples returned by fetchall()
+never exists in memory next to the final DataFrame.
+
+"""
+import pandas as pd
+from utils.logger import get_logger
+
+logger = get_logger('cursor_streaming')
+
+
+def fetch_dataframe(cursor, batch_size: int = 10000, lowercase_columns: bool = True) -> pd.DataFrame:
+    """
+    Fetch every remaining row of an executed cursor into a DataFrame.
+    Column dtypes are inferred once on the complete columns, exactly as for a DataFrame
+    built from fetchall() results. Batches are not converted to Arrow record batches: the
+    frames keep the None/NaN semantics the downstream `if value:` / `is not None` checks rely
+    on, and are only converted to Arrow when written to the caches (cache/frame_store.py).
+
+    Args:
+        cursor: Executed DB-API cursor (oracledb cursor, psycopg2 client or named cursor)
+        batch_size: Number of rows per fetchmany() call
+        lowercase_columns: Lowercase the column names
+
+    Returns:
+        DataFrame with one column per cursor column
+    """
+    batch = cursor.fetchmany(batch_size)
+    # Named (server-side) psycopg2 cursors only expose description after the first fetch
+    columns = [desc[0].lower() if lowercase_columns else desc[0] for desc in cursor.description]
+    column_values = [[] for _ in columns]
+    row_count = 0
+    batch_count = 0
+
+    while batch:
+        for values, batch_column in zip(column_values, zip(*batch)):
+            values.extend(batch_column)
+        row_count += len(batch)
+        batch_count += 1
+        batch = cursor.fetchmany(batch_size)
+
+    logger.info(f"Fetched {row_count} rows in {batch_count} batches of up to {batch_size} rows.")
+    # Positional keys keep duplicated column names (e.g. two aliases of the same name) apart
+    df = pd.DataFrame(dict(enumerate(column_values)), columns=range(len(columns)))
+    df.columns = columns
+    return df
@@ -1,4 +1,5 @@
 from datetime import datetime, timezone
+import numpy as np
 import pandas as pd
 from typing import Optional, Union
 from utils.logger import get_logger
@@ -12,6 +13,16 @@ Provides functions to convert various date formats (Oracle, PostgreSQL, datetime
 
 logger = get_logger('date_converter')
 
+# String formats tried in order: the first one that parses a value wins
+DATE_FORMATS = [
+    "%Y-%m-%d %H:%M:%S",      # PostgreSQL datetime
+    "%Y-%m-%d",                # ISO format / PostgreSQL date
+    "%m/%d/%Y",                # Oracle format
+    "%m-%d-%Y",                # Alternative format
+    "%d/%m/%Y",                # European format
+    "%Y/%m/%d"                 # Alternative ISO
+]
+
 def convert_to_unix_timestamp(date_input: Union[str, datetime, None]) -> Optional[str]:
     """ 
     Convert a date string or datetime object to /Date(XXXXXX)/ format.
@@ -42,16 +53,7 @@ def convert_to_unix_timestamp(date_input: Union[str, datetime, None]) -> Optiona
         return f"/Date({unix_timestamp})/"
 
     # Try parsing string with various formats
-    formats = [
-        "%Y-%m-%d %H:%M:%S",      # PostgreSQL datetime
-        "%Y-%m-%d",                # ISO format / PostgreSQL date
-        "%m/%d/%Y",                # Oracle format
-        "%m-%d-%Y",                # Alternative format
-        "%d/%m/%Y",                # European format
-        "%Y/%m/%d"                 # Alternative ISO
-    ]
-
-    for fmt in formats:
+    for fmt in DATE_FORMATS:
         try:
             dt = datetime.strptime(str(date_input), fmt)
             unix_timestamp = int(dt.replace(tzinfo=timezone.utc).timestamp() * 1000)
@@ -60,4 +62,76 @@ def convert_to_unix_timestamp(date_input: Union[str, datetime, None]) -> Optiona
             continue  # Try the next format
 
     logger.warning(f"Unable to parse date format: {date_input}. Returning None.")
-    return None
\ No newline at end of file
+    return None
+
+
+def _to_sap_dates(naive: np.ndarray) -> np.ndarray:
+    """/Date(ms)/ strings of naive datetime64 values (no missing values), wall clock taken as UTC."""
+    # Microseconds hold every parsed unit (ns range and the s/us units used for years outside it)
+    microseconds = naive.astype("datetime64[us]").astype(np.int64)
+    # Truncate toward zero like int(timestamp * 1000)
+    milliseconds = np.where(microseconds >= 0, microseconds // 1_000, -((-microseconds) // 1_000))
+    return ("/Date(" + pd.Series(milliseconds).astype(str) + ")/").to_numpy(dtype=object)
+
+
+def convert_series_to_unix_timestamp(dates: pd.Series) -> pd.Series:
+    """
+    Vectorized convert_to_unix_timestamp for a whole column, with the same result per value.
+
+    datetime64 columns are converted with integer arithmetic. String values are parsed with
+    pd.to_datetime one DATE_FORMATS entry at a time, in priority order, over the values not
+    parsed yet (so ambiguous dd/mm vs mm/dd values resolve as before). Anything left over
+    (other types, unparseable strings) goes through convert_to_unix_timestamp row by row.
+
+    Args:
+        dates: Series of date strings, datetime objects or None
+
+    Returns:
+        Series of /Date(XXXXXX)/ strings (missing where the input is missing or invalid)
+    """
+    converted = np.full(len(dates), None, dtype=object)
+
+    if pd.api.types.is_datetime64_any_dtype(dates.dtype):
+        naive = dates.dt.tz_localize(None) if dates.dt.tz is not None else dates
+        present = naive.notna().to_numpy()
+        converted[present] = _to_sap_dates(naive.to_numpy()[present])
+        return pd.Series(converted.tolist(), index=dates.index, name=dates.name)
+
+    values = dates.to_numpy(dtype=object)
+    is_string = np.fromiter((isinstance(value, str) for value in values), dtype=bool, count=len(values))
+    string_positions = np.flatnonzero(is_string)
+    strings = pd.Series(values[string_positions], dtype=object)
+
+    # Already in /Date(...)/ format
+    already_converted = (strings.str.startswith('/Date(') & strings.str.endswith(')/')).to_numpy(dtype=bool)
+    converted[string_positions[already_converted]] = strings[already_converted].to_numpy(dtype=object)
+
+    pending = ~already_converted & (strings != "").to_numpy(dtype=bool)
+    # A format can only parse strings containing its separators: skip the others instead of
+    # letting pd.to_datetime fail on them (this keeps the usual single-format columns at one pass)
+    has_separator = {
+        separator: strings.str.contains(separator, regex=False).to_numpy(dtype=bool)
+        for separator in ("-", "/", ":")
+    }
+    for fmt in DATE_FORMATS:
+        candidates = pending.copy()
+        for separator, present in has_separator.items():
+            if separator in fmt:
+                candidates &= present
+        if not candidates.any():
+            continue
+        parsed = pd.to_datetime(strings[candidates], format=fmt, errors="coerce")
+        matched = parsed.notna().to_numpy()
+        if matched.any():
+            positions = np.flatnonzero(candidates)[matched]
+            converted[string_positions[positions]] = _to_sap_dates(parsed.to_numpy()[matched])
+            pending[positions] = False
+
+    # Stragglers: non-string values and strings no format could parse vectorized
+    leftover = ~is_string & ~pd.isna(values)
+    leftover[string_positions[pending]] = True
+    for position in np.flatnonzero(leftover):
+        converted[position] = convert_to_unix_timestamp(values[position])
+
+    # Same dtype inference as Series.apply(convert_to_unix_timestamp)
+    return pd.Series(converted.tolist(), index=dates.index, name=dates.name)
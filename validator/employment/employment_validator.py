@@ -12,8 +12,9 @@ class EmploymentExistenceValidator:
     """
 
     def __init__(self, user_id: str, ec_user_id: str, results: dict, raise_if_missing=False):
-        self.emp_data = SAPDataCache().get("employees_df")
-        self.pos_data = SAPDataCache().get("positions_df")
+        self.sap_cache = SAPDataCache()
+        self.emp_data = self.sap_cache.get("employees_df")
+        self.pos_data = self.sap_cache.get("positions_df")
         self.user_id = user_id
         self.ec_user_id = ec_user_id
         self.results = results
@@ -28,8 +29,7 @@ class EmploymentExistenceValidator:
             if the user ID does not exist and raise_if_missing is False, returns an empty DataFrame.
         """
         try:
-            mask = self.emp_data['userid'].astype(str).str.lower().eq(self.ec_user_id.lower())
-            result = self.emp_data[mask].copy()
+            result = self.sap_cache.lookup('employees_df', 'userid', self.ec_user_id).copy()
 
             if result.empty:
                 msg = f"User ID {self.user_id} not found in employment data."
@@ -48,7 +48,7 @@ class EmploymentExistenceValidator:
         employees_df = self.emp_data
         try:
             if employees_df is not None:
-                match = employees_df[employees_df["position"] == position_code]
+                match = self.sap_cache.lookup("employees_df", "position", position_code, exact="position")
                 if not match.empty:
                     job_code = match["jobcode"].values[0]
                     division = match["division"].values[0]
@@ -76,9 +76,8 @@ class EmploymentExistenceValidator:
             str: The position code if it exists, else an empty string.
         """
         try:
-            mask = self.emp_data['userid'].astype(str).str.lower().eq(self.ec_user_id.lower())
-            result = self.emp_data[mask]
-            if not result.empty:
+            result = self.sap_cache.lookup('employees_df', 'userid', self.ec_user_id)
+            if result is not None and not result.empty:
                 position_code = result['position'].values[0]
                 return position_code
             return None
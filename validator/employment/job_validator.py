@@ -1,45 +1,121 @@
+from cache.postgres_cache import PostgresDataCache
 from utils.logger import get_logger
+from typing import NamedTuple
+import weakref
 import pandas as pd
 
 logger = get_logger('job_existence_validator')
 
+JOB_MAPPING_FIELDS = ('bufu_id', 'cust_geographicalscope', 'cust_subunit')
+
+
+class JobMapping(NamedTuple):
+    """
+    Job mapping of one job code. Values are cleaned strings when every required field is filled,
+    the raw cached values otherwise (None for a field missing from the job titles table).
+    """
+    jobcode: str
+    bufu_id: object
+    cust_geographicalscope: object
+    cust_subunit: object
+    columns: tuple
+    missing_fields: tuple
+
+    @property
+    def is_valid(self) -> bool:
+        return not self.missing_fields
+
+
+def build_job_mapping_index(job_mappings: pd.DataFrame) -> dict:
+    """
+    Map each lowercased job code to its JobMapping (first row of the code in the job titles table).
+    A field is missing for a code if the column does not exist or is NaN on any row of the code.
+    """
+    codes = job_mappings['jobcode'].astype(str).str.lower()
+    columns = tuple(field for field in JOB_MAPPING_FIELDS if field in job_mappings.columns)
+    # Null job codes never match a lookup
+    is_first = ~codes.duplicated() & codes.notna()
+    first_codes = codes[is_first].tolist()
+    first_rows = job_mappings.loc[is_first, list(columns)]
+
+    nan_by_code = job_mappings[list(columns)].isna().groupby(codes.to_numpy(), sort=False).any().to_dict('index')
+    raw_values = {field: first_rows[field].tolist() for field in columns}
+    # Force all values to strings and clean .0 endings
+    cleaned_values = {
+        field: first_rows[field].astype(str).str.replace(r'\.0$', '', regex=True).tolist()
+        for field in columns
+    }
+
+    index = {}
+    for position, code in enumerate(first_codes):
+        nan_fields = nan_by_code.get(code, {})
+        missing_fields = tuple(
+            field for field in JOB_MAPPING_FIELDS if field not in columns or nan_fields[field]
+        )
+        values = raw_values if missing_fields else cleaned_values
+        fields = {field: values[field][position] if field in columns else None for field in JOB_MAPPING_FIELDS}
+        index[code] = JobMapping(jobcode=code, columns=columns, missing_fields=missing_fields, **fields)
+    logger.info(f"Built job mapping index: {len(index)} job codes")
+    return index
+
+
+# Indexes of job titles frames other than the cached one (e.g. a filtered copy), by frame identity.
+# An entry is dropped when its frame is garbage collected.
+_job_mapping_indexes = {}
+
+
+def _job_mapping_index_of(job_mappings: pd.DataFrame) -> dict:
+    """Index of a job titles frame that is not the cached one, built once per frame."""
+    frame_id = id(job_mappings)
+    entry = _job_mapping_indexes.get(frame_id)
+    if entry is not None and entry[0]() is job_mappings:
+        return entry[1]
+    index = build_job_mapping_index(job_mappings)
+    frame_ref = weakref.ref(job_mappings, lambda _ref: _job_mapping_indexes.pop(frame_id, None))
+    _job_mapping_indexes[frame_id] = (frame_ref, index)
+    return index
+
+
 class JobExistenceValidator:
     """
-    Existence Validator class to check the existence of job codes in SAP system 
+    Existence Validator class to check the existence of job codes in SAP system
     from the cached job mappings.
     """
+    CACHE_KEY = 'jobs_titles_data_df'
 
     def __init__(self, job_mappings: pd.DataFrame,job_code: str, raise_if_missing=False):
         self.job_mappings = job_mappings
         self.job_code = job_code
         self.raise_if_missing = raise_if_missing
-        self.requested_fields = ['bufu_id', 'cust_geographicalscope', 'cust_subunit']
+        self.requested_fields = list(JOB_MAPPING_FIELDS)
 
-    def get_job_mapping(self) -> pd.DataFrame:
+    def _job_mapping_index(self) -> dict:
+        """Precompiled index of the job mappings: built once per job titles table."""
+        postgres_cache = PostgresDataCache()
+        if self.job_mappings is postgres_cache.get(self.CACHE_KEY):
+            return postgres_cache.get_derived(self.CACHE_KEY, 'job_mapping_index', build_job_mapping_index)
+        return _job_mapping_index_of(self.job_mappings)
+
+    def get_job_mapping(self) -> JobMapping | None:
         """
         Retrieves the job mapping for the specified job code and ensures required fields are present and not NaN.
         Returns:
-            pd.DataFrame: DataFrame containing the job mapping. 
+            JobMapping: The job mapping of the job code.
             if the job code does not exist and raise_if_missing is True, raises a ValueError.
-            if the job code does not exist and raise_if_missing is False, returns an empty DataFrame.
+            if the job code does not exist and raise_if_missing is False, returns None.
         """
-        job_titles_code = self.job_mappings['jobcode'].astype(str).str.lower()
-        mask = job_titles_code.eq(self.job_code.lower())
-        result = self.job_mappings[mask].copy()
-        
-        if result.empty:
+        result = self._job_mapping_index().get(self.job_code.lower())
+
+        if result is None:
             msg = f"Job code {self.job_code} not found in job mappings."
             if self.raise_if_missing:
                 logger.error(msg)
                 raise ValueError(msg)
+            return None
         # Check if required fields exist and have no NaN values
-        missing_fields = [field for field in self.requested_fields if field not in result.columns or result[field].isna().any()]
-        if missing_fields:
-            msg = f"Missing or NaN required fields for job code {self.job_code}: {', '.join(missing_fields)}"
+        if result.missing_fields:
+            msg = f"Missing or NaN required fields for job code {self.job_code}: {', '.join(result.missing_fields)}"
             if self.raise_if_missing:
                 logger.error(msg)
                 raise ValueError(msg)
-        else:
-            # Force all values to strings and clean .0 endings
-            result = result[self.requested_fields].astype(str).replace(r'\.0$', '', regex=True)
-        return result
\ No newline at end of file
+        return result
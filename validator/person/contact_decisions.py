@@ -0,0 +1,180 @@
+from validator.person.email_validator import EmailValidator
+from validator.person.phone_validator import PhoneValidator
+import pandas as pd
+
+
+class ContactDecisionEngine:
+    """
+    Set-based equivalent of EmailValidator.decide() / PhoneValidator.decide() for many users.
+
+    The SAP contact table is normalized once and joined with the incoming PDM contacts of all
+    users; insert / delete / update_type / primary decisions are then computed as DataFrame
+    operations. decide() returns, per user, the same structure (and item order) as the
+    validators' decide().
+
+    Args:
+        contacts (pd.DataFrame): SAP contact rows (person id, address, type, isprimary)
+        value_col (str): Address column in contacts ('emailaddress' / 'phoneaddress')
+        type_col (str): Type column in contacts ('emailtype' / 'phonetype')
+        value_key (str): Key used in the decision items ('email' / 'phone')
+        business_type (int): Business contact type code
+        private_type (int): Private contact type code
+    """
+
+    def __init__(self, contacts: pd.DataFrame, value_col: str, type_col: str, value_key: str,
+                 business_type: int, private_type: int):
+        self.value_col = value_col
+        self.type_col = type_col
+        self.value_key = value_key
+        self.business_type = business_type
+        self.private_type = private_type
+        self.contacts = contacts if contacts is not None else pd.DataFrame()
+
+    @classmethod
+    def for_emails(cls, email_data: pd.DataFrame) -> "ContactDecisionEngine":
+        return cls(email_data, "emailaddress", "emailtype", "email",
+                   EmailValidator.BUSINESS_TYPE, EmailValidator.PRIVATE_TYPE)
+
+    @classmethod
+    def for_phones(cls, phone_data: pd.DataFrame) -> "ContactDecisionEngine":
+        return cls(phone_data, "phoneaddress", "phonetype", "phone",
+                   PhoneValidator.BUSINESS_TYPE, PhoneValidator.PRIVATE_TYPE)
+
+    def incoming_contacts(self, private, business, is_private_only: bool) -> dict:
+        """
+        Returns {type: value} for incoming contacts (same rules as the validators' _extract_incoming).
+        Missing values read from string columns (NaN / pd.NA instead of None) count as no contact.
+        """
+        private = private if isinstance(private, str) else None
+        business = business if isinstance(business, str) else None
+        incoming = {}
+        if private:
+            incoming[self.private_type] = private.lower()
+        # Only add business contact if it's different from the private one
+        if not is_private_only and business:
+            business_lower = business.lower()
+            private_lower = private.lower() if private else None
+            if business_lower != private_lower:
+                incoming[self.business_type] = business_lower
+        return incoming
+
+    @staticmethod
+    def _no_existing() -> pd.DataFrame:
+        """Empty _existing() frame, typed like a filled one so the merges in decide() keep int types."""
+        return pd.DataFrame({
+            "uid": pd.Series(dtype=object),
+            "value": pd.Series(dtype=object),
+            "type": pd.Series(dtype="int64"),
+            "is_primary": pd.Series(dtype=bool),
+            "pos": pd.Series(dtype="int64"),
+        })
+
+    def _existing(self, userids: set) -> pd.DataFrame:
+        """Normalized SAP rows of the given users: uid, value, type, is_primary, pos (SAP order)."""
+        if self.contacts.empty:
+            return self._no_existing()
+
+        # Handle both 'userid' and 'personidexternal' column names
+        id_col = 'personidexternal' if 'personidexternal' in self.contacts.columns else 'userid'
+        uids = self.contacts[id_col].str.lower()
+        matched = self.contacts[uids.isin(userids)]
+        if matched.empty:
+            return self._no_existing()
+
+        if "isprimary" in matched.columns:
+            is_primary = matched["isprimary"].astype(str).str.lower() == "true"
+        else:
+            is_primary = pd.Series(False, index=matched.index)
+        return pd.DataFrame({
+            "uid": uids[matched.index],
+            "value": matched[self.value_col].str.lower(),
+            "type": matched[self.type_col].astype(int),
+            "is_primary": is_primary,
+            "pos": range(len(matched)),
+        }).reset_index(drop=True)
+
+    def decide(self, incoming_by_user: dict) -> dict:
+        """
+        Args:
+            incoming_by_user (dict): {userid: {type: value}} as built by incoming_contacts()
+
+        Returns:
+            dict: {userid: {"insert": [...], "delete": [...], "update_type": [...],
+                            "primary": {"promote": ..., "demote": ...}}}
+        """
+        key = self.value_key
+        decisions = {
+            userid: {"insert": [], "delete": [], "update_type": [], "primary": {"promote": None, "demote": None}}
+            for userid in incoming_by_user
+        }
+        incoming = pd.DataFrame(
+            [
+                (userid, userid.strip().lower(), slot, typ, value)
+                for userid, contacts in incoming_by_user.items()
+                for slot, (typ, value) in enumerate(contacts.items())
+            ],
+            columns=["userid", "uid", "slot", "typ", "value"],
+        )
+        if incoming.empty:
+            return decisions
+
+        existing = self._existing(set(incoming["uid"]))
+
+        # First existing row with the incoming value / with the incoming type (SAP order)
+        by_value = (
+            existing.drop_duplicates(subset=["uid", "value"], keep="first")
+            [["uid", "value", "type", "is_primary"]]
+            .rename(columns={"type": "value_match_type", "is_primary": "value_match_primary"})
+        )
+        by_type = (
+            existing.drop_duplicates(subset=["uid", "type"], keep="first")
+            [["uid", "type", "value"]]
+            .rename(columns={"type": "typ", "value": "type_match_value"})
+        )
+        primary = (
+            existing[existing["is_primary"].astype(bool)]
+            .drop_duplicates(subset=["uid"], keep="first")
+            [["uid", "value"]]
+            .rename(columns={"value": "primary_value"})
+        )
+        has_business = set(existing.loc[existing["type"] == self.business_type, "uid"])
+
+        df = (
+            incoming
+            .merge(by_value, on=["uid", "value"], how="left")
+            .merge(by_type, on=["uid", "typ"], how="left")
+            .merge(primary, on="uid", how="left")
+            .sort_values(["userid", "slot"], kind="stable")
+        )
+        has_value_match = df["value_match_type"].notna()
+        value_match_other_type = has_value_match & (df["value_match_type"] != df["typ"])
+        has_primary = df["primary_value"].notna()
+
+        df["update_type"] = value_match_other_type
+        df["delete"] = df["type_match_value"].notna() & (df["type_match_value"] != df["value"])
+        df["insert"] = ~has_value_match | value_match_other_type
+
+        value_match_not_primary = ~has_value_match | ~(df["value_match_primary"].astype("boolean").fillna(False).astype(bool))
+        is_business = df["typ"] == self.business_type
+        is_private = (df["typ"] == self.private_type) & ~df["uid"].isin(has_business)
+        df["promote"] = (is_business | is_private) & value_match_not_primary
+        df["demote"] = df["promote"] & has_primary & (df["primary_value"] != df["value"])
+
+        for row in df.itertuples(index=False):
+            actions = decisions[row.userid]
+            typ = int(row.typ)
+            if row.update_type:
+                actions["update_type"].append(
+                    {key: row.value, "old_type": int(row.value_match_type), "new_type": typ}
+                )
+            if row.delete:
+                actions["delete"].append({key: row.type_match_value, "type": typ})
+            if row.insert:
+                actions["insert"].append({key: row.value, "type": typ})
+            # Later incoming contacts (business after private) override the primary decision
+            if row.promote:
+                actions["primary"]["promote"] = row.value
+            if row.demote:
+                actions["primary"]["demote"] = row.primary_value
+
+        return decisions
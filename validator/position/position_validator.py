@@ -1,8 +1,50 @@
 from utils.logger import get_logger
+from cache.sap_cache import SAPDataCache
+from orchestrator.user_context import is_position_claimed
 import pandas as pd
 
 logger = get_logger('position_validator')
 
+POSITION_MATCH_FIELDS = ('jobcode', 'location', 'costcenter', 'company')
+
+
+def position_match_key(record) -> tuple:
+    """
+    Build the (jobcode, location, costcenter, company) key of a PDM record,
+    normalized the same way as build_position_match_index.
+    """
+    return (
+        str(record.get('jobcode')).strip().lower(),
+        str(record.get('address_code')).strip().lower(),
+        str(record.get('cost_center')).strip().lower(),
+        str(record.get('company')).strip().lower(),
+    )
+
+
+def build_position_match_index(pos_data: pd.DataFrame) -> dict:
+    """
+    Map (jobcode, location, costcenter, company), lowercased, to the codes of the
+    non-critical positions having them, in positions cache order.
+    Critical positions (positionCriticality = 1) are excluded since they maybe belong to SCM.
+    """
+    if 'positioncriticality' in pos_data.columns:
+        is_critical = (
+            pd.to_numeric(pos_data['positioncriticality'], errors='coerce')
+            .fillna(0)
+            .astype(int)
+            == 1
+        )
+        candidates = pos_data[~is_critical]
+    else:
+        candidates = pos_data
+
+    keys = [candidates[field].astype(str).str.lower() for field in POSITION_MATCH_FIELDS]
+    match_index = {}
+    for *key, code in zip(*keys, candidates['code']):
+        match_index.setdefault(tuple(key), []).append(code)
+    return match_index
+
+
 class PositionValidator:
     """
     Validator class to check:
@@ -19,6 +61,7 @@ class PositionValidator:
         self.results = results
         self.required_fields = required_fields
         self.raise_if_missing = raise_if_missing
+        self.sap_cache = SAPDataCache()
 
     def position_code_exists_in_employees(self) -> str:
         """
@@ -27,9 +70,8 @@ class PositionValidator:
             str: The position code if it exists, else an empty string.
         """
         try:
-            mask = self.emp_data['userid'].astype(str).str.lower().eq(self.ec_user_id.lower())
-            result = self.emp_data[mask]
-            if not result.empty:
+            result = self.sap_cache.lookup('employees_df', 'userid', self.ec_user_id)
+            if result is not None and not result.empty:
                 position_code = result['position'].values[0]
                 return position_code
             return None
@@ -46,64 +88,16 @@ class PositionValidator:
         Returns the position code if it exists and is not assigned to another user.
         """
         try:
-            job_code = str(self.record.get('jobcode')).strip().lower()
-            location_code = str(self.record.get('address_code')).strip().lower()
-            cost_center = str(self.record.get('cost_center')).strip().lower()
-            company = str(self.record.get('company')).strip().lower()
-            if 'positioncriticality' in self.pos_data.columns:
-                self.pos_data['_is_critical'] = (
-                    pd.to_numeric(
-                        self.pos_data['positioncriticality'],
-                        errors='coerce'
-                    )
-                    .fillna(0)
-                    .astype(int)
-                    == 1
-                )
-            else:
-                self.pos_data['_is_critical'] = False
-            mask = (
-                (self.pos_data['jobcode'].astype(str).str.lower() == job_code) &
-                (self.pos_data['location'].astype(str).str.lower() == location_code) &
-                (self.pos_data['costcenter'].astype(str).str.lower() == cost_center) &
-                (self.pos_data['company'].astype(str).str.lower() == company) &
-                (~self.pos_data['_is_critical'])  # Exclude critical positions which belong maybe to SCM
-            )
-
-            result = self.pos_data[mask]
-
-            if not result.empty:
-                for code in result['code']:
-                    emp_mask = self.emp_data['position'].astype(str).str.lower().eq(code.lower())
-                    emp_result = self.emp_data[emp_mask]
-                    # Check if position is assigned to another user
-                    if not emp_result.empty:
-                        assigned_userid = emp_result['userid'].values[0]
-                        # Check if this position is assigned to a different user
-                        if assigned_userid.lower() != self.ec_user_id.lower():
-                            pass
-                    # Check if position code is assigned to another user in current batch
-                    in_batch = False
-                    results_df = pd.DataFrame.from_dict(
-                        {
-                            user_id: ctx.position_code
-                            for user_id, ctx in self.results.items()
-                            if ctx.position_code
-                        },
-                        orient="index",
-                        columns=["position_code"]
-                    ).reset_index(names="user_id")
-                    results_df["user_id"] = results_df["user_id"].astype(str).str.lower()
-                    results_df["position_code"] = results_df["position_code"].astype(str).str.lower()
-                    code_l = code.lower()
-                    in_batch = (
-                        (results_df["position_code"] == code_l) &
-                        (results_df["user_id"] != self.user_id.lower())
-                    ).any()
+            match_key = position_match_key(self.record)
+            match_index = self.sap_cache.get_derived(
+                'positions_df', 'position_match_index', build_position_match_index
+            ) or {}
 
-                    if in_batch:
-                        continue
-                    return code
+            for code in match_index.get(match_key, ()):
+                # Check if position code is assigned to another user in current batch
+                if is_position_claimed(self.results, code, exclude_user_id=self.user_id):
+                    continue
+                return code
 
             return None
 
@@ -124,9 +118,8 @@ class PositionValidator:
                   division (HR BU/FU), cust_subunit, and cust_geographicalscope.
         """
         try:
-            mask = self.pos_data['code'].astype(str).str.lower().eq(position_code.lower())
-            result = self.pos_data[mask]
-            if not result.empty:
+            result = self.sap_cache.lookup('positions_df', 'code', position_code)
+            if result is not None and not result.empty:
                 job_code = result['jobcode'].values[0]
                 cost_center = result['costcenter'].values[0]
                 company = result['company'].values[0]